@@ -2,8 +2,9 @@ import flet as ft
 from datetime import datetime
 
 # Centralized config and utilities
-from app.db import get_conn, init_db
-from app.config import Theme
+from app.db import init_db
+from app.repo import AlunoRepository, ExercicioRepository, PlanoRepository, SessaoRepository
+from app.config import ALUNO_PAGE_SIZE, REPORT_PAGE_SIZE, Theme
 from app.utils import validar_data_brasil, sqlite_para_brasileiro, calcular_imc
 
 
@@ -71,8 +72,10 @@ def main(page: ft.Page):
         # Escolhe uma tonalidade mais forte no tema claro e uma mais suave no escuro
         return color_dark if _is_dark() else color_light
 
-    conn = get_conn()
-    cur = conn.cursor()
+    alunos = AlunoRepository()
+    exercicios = ExercicioRepository()
+    planos = PlanoRepository()
+    sessoes = SessaoRepository()
 
     # ---------- Helper: Atualização global ao alternar tema ----------
     def refresh_theme():
@@ -192,9 +195,9 @@ def main(page: ft.Page):
         page.update()
 
     def contagem():
-        cur.execute("SELECT COUNT(*) FROM ALUNO;"); a = cur.fetchone()[0]
-        cur.execute("SELECT COUNT(*) FROM PLANO;"); p = cur.fetchone()[0]
-        cur.execute("SELECT COUNT(*) FROM SESSAO;"); s = cur.fetchone()[0]
+        a = alunos.count()
+        p = planos.count()
+        s = sessoes.count()
         return a, p, s
 
     # ---------------- Home ----------------
@@ -289,21 +292,25 @@ def main(page: ft.Page):
                 if alt is not None and alt <= 0: raise ValueError
             except Exception:
                 snack("Altura deve ser número positivo (ex.: 1.75).", error=True); altura.focus(); return
-            cur.execute("INSERT INTO ALUNO (NOME, DATA_NASC, ALTURA_M) VALUES (?,?,?)", (nome.value.strip(), iso, alt))
-            conn.commit()
+            alunos.insert(nome.value.strip(), iso, alt)
             snack("Aluno cadastrado!")
             nome.value = ""; data.value = ""; altura.value = ""; page.update()
             carregar(busca.value)
 
+        # Lista paginada (search_page): uma página por vez, "Carregar mais" busca a próxima
+        estado = {"filtro": "", "cursor": None}
+        mais_btn = ft.TextButton("Carregar mais", icon=ft.Icons.EXPAND_MORE, on_click=lambda e: mais())
+
         def carregar(filtro=""):
             lista.controls.clear()
-            if filtro:
-                cur.execute("SELECT ID_ALUNO, NOME, DATA_NASC, ALTURA_M FROM ALUNO WHERE NOME LIKE ? ORDER BY NOME", (f"%{filtro}%",))
-            else:
-                cur.execute("SELECT ID_ALUNO, NOME, DATA_NASC, ALTURA_M FROM ALUNO ORDER BY NOME")
-            rows = cur.fetchall()
-            status.value = f"Total: {len(rows)}" if rows else "Nenhum aluno."
-            for aid, anome, dn, alt in rows:
+            estado["filtro"], estado["cursor"] = filtro, None
+            mais()
+
+        def mais():
+            if mais_btn in lista.controls:
+                lista.controls.remove(mais_btn)
+            rows = alunos.search_page(estado["filtro"], estado["cursor"])
+            for aid, anome, dn, alt, _peso in rows:
                 data_br = sqlite_para_brasileiro(dn)
                 linha = ft.Card(
                     elevation=2,
@@ -323,12 +330,18 @@ def main(page: ft.Page):
                     ),
                 )
                 lista.controls.append(linha)
+            if rows:
+                estado["cursor"] = alunos.cursor(rows[-1])
+            if len(rows) >= ALUNO_PAGE_SIZE:
+                lista.controls.append(mais_btn)
+            n = len(lista.controls) - (mais_btn in lista.controls)
+            total = "" if (estado["filtro"] or "").strip() else f" de {alunos.count()}"
+            status.value = f"Exibindo {n}{total}" if n else "Nenhum aluno."
             page.update()
 
         def del_aluno(_id):
             try:
-                cur.execute("DELETE FROM ALUNO WHERE ID_ALUNO=?", (_id,))
-                conn.commit()
+                alunos.delete(_id)
                 snack("Aluno removido.")
                 carregar(busca.value)
             except Exception as ex:
@@ -374,19 +387,14 @@ def main(page: ft.Page):
         def salvar(_):
             if not (nome.value or "").strip() or not (grupo.value or "").strip():
                 snack("Preencha nome e grupo.", True); return
-            cur.execute("INSERT INTO EXERCICIO (NOME, GRUPO) VALUES (?,?)", (nome.value.strip(), grupo.value.strip()))
-            conn.commit(); snack("Exercício criado.")
+            exercicios.insert(nome.value.strip(), grupo.value.strip())
+            snack("Exercício criado.")
             nome.value = ""; grupo.value = ""; page.update()
             carregar(busca.value)
 
         def carregar(filtro=""):
             lista.controls.clear()
-            if filtro:
-                cur.execute("SELECT ID_EXERCICIO, NOME, GRUPO FROM EXERCICIO WHERE NOME LIKE ? OR GRUPO LIKE ? ORDER BY GRUPO, NOME",
-                            (f"%{filtro}%", f"%{filtro}%"))
-            else:
-                cur.execute("SELECT ID_EXERCICIO, NOME, GRUPO FROM EXERCICIO ORDER BY GRUPO, NOME")
-            rows = cur.fetchall()
+            rows = exercicios.search(filtro)
             status.value = f"Total: {len(rows)}" if rows else "Nenhum exercício."
             for eid, enome, egrupo in rows:
                 lista.controls.append(
@@ -410,8 +418,8 @@ def main(page: ft.Page):
 
         def del_exercicio(_id):
             try:
-                cur.execute("DELETE FROM EXERCICIO WHERE ID_EXERCICIO=?", (_id,))
-                conn.commit(); snack("Exercício removido."); carregar(busca.value)
+                exercicios.delete(_id)
+                snack("Exercício removido."); carregar(busca.value)
             except Exception as ex:
                 snack(f"Erro: {ex}", True)
 
@@ -455,8 +463,8 @@ def main(page: ft.Page):
             if not nome:
                 snack("Informe o nome do plano.", True); nome_plano.focus(); return
             try:
-                cur.execute("INSERT INTO PLANO (NOME) VALUES (?)", (nome,))
-                conn.commit(); snack("Plano criado.")
+                planos.insert(nome)
+                snack("Plano criado.")
                 nome_plano.value = ""; page.update()
                 carregar(busca.value)
             except Exception as ex:
@@ -464,11 +472,7 @@ def main(page: ft.Page):
 
         def carregar(filtro=""):
             lista.controls.clear()
-            if filtro:
-                cur.execute("SELECT ID_PLANO, NOME FROM PLANO WHERE NOME LIKE ? ORDER BY NOME", (f"%{filtro}%",))
-            else:
-                cur.execute("SELECT ID_PLANO, NOME FROM PLANO ORDER BY NOME")
-            rows = cur.fetchall()
+            rows = planos.search(filtro)
             status.value = f"Total: {len(rows)}" if rows else "Nenhum plano."
             for pid, pnome in rows:
                 lista.controls.append(
@@ -496,8 +500,8 @@ def main(page: ft.Page):
 
         def del_plano(_id):
             try:
-                cur.execute("DELETE FROM PLANO WHERE ID_PLANO=?", (_id,))
-                conn.commit(); snack("Plano removido."); carregar(busca.value)
+                planos.delete(_id)
+                snack("Plano removido."); carregar(busca.value)
             except Exception as ex:
                 snack(f"Erro: {ex}", True)
 
@@ -517,24 +521,17 @@ def main(page: ft.Page):
 
             def load_exercicios():
                 ex_dd.options.clear()
-                cur.execute("SELECT ID_EXERCICIO, NOME, GRUPO FROM EXERCICIO ORDER BY GRUPO, NOME")
-                for eid, en, gr in cur.fetchall():
+                for eid, en, gr in exercicios.list_all():
                     ex_dd.options.append(ft.dropdown.Option(key=str(eid), text=f"{gr} - {en}"))
                 page.update()
 
             def load_itens():
                 lista_itens.controls.clear()
-                cur.execute("""
-                    SELECT pe.ORDEM, e.NOME, e.GRUPO, pe.SERIES, pe.REPS, e.ID_EXERCICIO
-                    FROM PLANO_EXERCICIO pe
-                    JOIN EXERCICIO e ON e.ID_EXERCICIO = pe.ID_EXERCICIO
-                    WHERE pe.ID_PLANO=? ORDER BY pe.ORDEM
-                """, (_id_plano,))
-                rows = cur.fetchall()
+                rows = planos.items(_id_plano)
                 if not rows:
                     lista_itens.controls.append(ft.Text("Nenhum exercício no plano.", italic=True))
                 else:
-                    for ordem, enome, egrupo, series, reps, eid in rows:
+                    for ordem, eid, enome, egrupo, series, reps in rows:
                         lista_itens.controls.append(
                             ft.Card(
                                 elevation=1,
@@ -556,8 +553,8 @@ def main(page: ft.Page):
                 page.update()
 
             def rm_item(_eid):
-                cur.execute("DELETE FROM PLANO_EXERCICIO WHERE ID_PLANO=? AND ID_EXERCICIO=?", (_id_plano, _eid))
-                conn.commit(); load_itens()
+                planos.remove_item(_id_plano, _eid)
+                load_itens()
 
             def add_item(_):
                 if not ex_dd.value or not series_tf.value or not reps_tf.value or not ordem_tf.value:
@@ -567,11 +564,7 @@ def main(page: ft.Page):
                     if s <= 0 or r <= 0 or o <= 0: raise ValueError
                 except Exception:
                     snack("Use números positivos em séries/reps/ordem.", True); return
-                cur.execute("""
-                    INSERT OR REPLACE INTO PLANO_EXERCICIO (ID_PLANO, ID_EXERCICIO, ORDEM, SERIES, REPS)
-                    VALUES (?,?,?,?,?)
-                """, (_id_plano, eid, o, s, r))
-                conn.commit()
+                planos.add_item(_id_plano, eid, s, r, ordem=o)
                 series_tf.value = ""; reps_tf.value = ""; ordem_tf.value = ""; page.update()
                 load_itens()
 
@@ -639,11 +632,7 @@ def main(page: ft.Page):
         def load_alunos(f=""):
             """Carrega alunos e seleciona automaticamente o 1º resultado encontrado."""
             dd_aluno.options.clear()
-            if f:
-                cur.execute("SELECT ID_ALUNO, NOME FROM ALUNO WHERE NOME LIKE ? ORDER BY NOME", (f"%{f}%",))
-            else:
-                cur.execute("SELECT ID_ALUNO, NOME FROM ALUNO ORDER BY NOME")
-            rows = cur.fetchall()
+            rows = alunos.search_names(f)
             for aid, an in rows:
                 dd_aluno.options.append(ft.dropdown.Option(key=str(aid), text=f"{an} (ID {aid})"))
             dd_aluno.value = str(rows[0][0]) if rows else None
@@ -652,8 +641,7 @@ def main(page: ft.Page):
         def load_planos():
             """Carrega planos, seleciona o 1º e tenta carregar a checklist."""
             dd_plano.options.clear()
-            cur.execute("SELECT ID_PLANO, NOME FROM PLANO ORDER BY NOME")
-            rows = cur.fetchall()
+            rows = planos.list_all()
             for pid, pn in rows:
                 dd_plano.options.append(ft.dropdown.Option(key=str(pid), text=pn))
             dd_plano.value = str(rows[0][0]) if rows else None
@@ -673,13 +661,7 @@ def main(page: ft.Page):
                 page.update(); return
 
             pid = int(dd_plano.value)
-            cur.execute("""
-                SELECT pe.ORDEM, e.ID_EXERCICIO, e.NOME, e.GRUPO, pe.SERIES, pe.REPS
-                FROM PLANO_EXERCICIO pe
-                JOIN EXERCICIO e ON e.ID_EXERCICIO = pe.ID_EXERCICIO
-                WHERE pe.ID_PLANO=? ORDER BY pe.ORDEM
-            """, (pid,))
-            rows = cur.fetchall()
+            rows = planos.items(pid)
 
             if not rows:
                 status.value = "Este plano não possui exercícios. Adicione em 'Planos de Treino' (ícone de lista)."
@@ -718,12 +700,7 @@ def main(page: ft.Page):
             ok, iso = validar_data_brasil(data_tf.value)
             if not ok: snack("Data inválida.", True); return
 
-            # criar sessão
-            cur.execute("INSERT INTO SESSAO (ID_ALUNO, ID_PLANO, DATA_SESSAO) VALUES (?,?,?)",
-                        (int(dd_aluno.value), int(dd_plano.value), iso))
-            id_sessao = cur.lastrowid
-
-            total = 0
+            itens = []
             for card in lista_check.controls:
                 m = getattr(card, "_meta", None)
                 if not m: continue
@@ -735,15 +712,11 @@ def main(page: ft.Page):
                 except Exception:
                     snack("Valores numéricos inválidos (séries/reps/peso).", True); return
                 obs = (m["obs"].value or "").strip() or None
+                itens.append((m["id_exercicio"], feito, s, r, p, obs))
 
-                cur.execute("""
-                    INSERT INTO SESSAO_ITEM (ID_SESSAO, ID_EXERCICIO, FEITO, SERIES_FEITAS, REPS_MEDIA, PESO_MEDIA, OBS)
-                    VALUES (?,?,?,?,?,?,?)
-                """, (id_sessao, m["id_exercicio"], feito, s, r, p, obs))
-                total += 1
-
-            conn.commit()
-            snack(f"Sessão registrada com {total} exercícios.")
+            # criar sessão
+            sessoes.create(int(dd_aluno.value), int(dd_plano.value), iso, itens)
+            snack(f"Sessão registrada com {len(itens)} exercícios.")
             lista_check.controls.clear(); status.value = ""; page.update()
 
         def snack(msg, error=False):
@@ -788,27 +761,19 @@ def main(page: ft.Page):
         lista = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO)
         status = ft.Text("", color=tone(ft.Colors.BLUE_700, ft.Colors.BLUE_200))
 
+        # Relatório paginado (search_page): "Carregar mais" busca as sessões seguintes
+        estado = {"filtro": "", "cursor": None}
+        mais_btn = ft.TextButton("Carregar mais", icon=ft.Icons.EXPAND_MORE, on_click=lambda e: mais())
+
         def carregar(f=""):
             lista.controls.clear()
-            if f:
-                cur.execute("""
-                    SELECT s.ID_SESSAO, s.DATA_SESSAO, a.NOME, p.NOME
-                    FROM SESSAO s
-                    JOIN ALUNO a ON a.ID_ALUNO = s.ID_ALUNO
-                    JOIN PLANO p ON p.ID_PLANO = s.ID_PLANO
-                    WHERE a.NOME LIKE ?
-                    ORDER BY s.DATA_SESSAO DESC, s.ID_SESSAO DESC
-                """, (f"%{f}%",))
-            else:
-                cur.execute("""
-                    SELECT s.ID_SESSAO, s.DATA_SESSAO, a.NOME, p.NOME
-                    FROM SESSAO s
-                    JOIN ALUNO a ON a.ID_ALUNO = s.ID_ALUNO
-                    JOIN PLANO p ON p.ID_PLANO = s.ID_PLANO
-                    ORDER BY s.DATA_SESSAO DESC, s.ID_SESSAO DESC
-                """)
-            rows = cur.fetchall()
-            status.value = f"Total: {len(rows)}" if rows else "Nenhuma sessão."
+            estado["filtro"], estado["cursor"] = f, None
+            mais()
+
+        def mais():
+            if mais_btn in lista.controls:
+                lista.controls.remove(mais_btn)
+            rows = sessoes.search_page(estado["filtro"], estado["cursor"])
             for sid, d, an, pn in rows:
                 data_br = sqlite_para_brasileiro(d)
                 lista.controls.append(
@@ -833,6 +798,12 @@ def main(page: ft.Page):
                         ),
                     )
                 )
+            if rows:
+                estado["cursor"] = sessoes.cursor(rows[-1])
+            if len(rows) >= REPORT_PAGE_SIZE:
+                lista.controls.append(mais_btn)
+            n = len(lista.controls) - (mais_btn in lista.controls)
+            status.value = f"Exibindo {n}" if n else "Nenhuma sessão."
             page.update()
 
         def detalhar(_sid):
@@ -840,13 +811,7 @@ def main(page: ft.Page):
             page.overlay.append(dialog)
             corpo = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO, height=360)
 
-            cur.execute("""
-                SELECT e.NOME, e.GRUPO, si.FEITO, si.SERIES_FEITAS, si.REPS_MEDIA, si.PESO_MEDIA, si.OBS
-                FROM SESSAO_ITEM si
-                JOIN EXERCICIO e ON e.ID_EXERCICIO = si.ID_EXERCICIO
-                WHERE si.ID_SESSAO=? ORDER BY si.ID_ITEM
-            """, (_sid,))
-            rows = cur.fetchall()
+            rows = sessoes.items(_sid)
             if not rows:
                 corpo.controls.append(ft.Text("Sem itens."))
 
@@ -890,8 +855,7 @@ def main(page: ft.Page):
             dialog.open = True; page.update()
 
         def excluir(_sid):
-            cur.execute("DELETE FROM SESSAO WHERE ID_SESSAO=?", (_sid,))
-            conn.commit()
+            sessoes.delete(_sid)
             carregar(busca_aluno.value)
 
         busca_aluno.on_change = lambda e: carregar(busca_aluno.value)
@@ -0,0 +1,97 @@
+"""Consultor de índices: roda EXPLAIN QUERY PLAN nas consultas usadas pelas telas.
+
+Aponta consultas que fazem SCAN em tabelas grandes e chaves estrangeiras sem
+índice (que deixam CASCADE/RESTRICT varrendo a tabela filha inteira). As
+consultas vêm do catálogo dos repositórios (``app.repo.all_queries``), que
+concentra todo o SQL emitido pelas views.
+"""
+import re
+from collections import namedtuple
+
+from app.repo import all_queries
+
+# Tabelas abaixo deste tamanho (linhas estimadas) não são apontadas
+DEFAULT_MIN_ROWS = 5000
+
+Finding = namedtuple("Finding", "name sql table rows detail")
+
+_ALIAS_RE = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_SCAN_RE = re.compile(r"^SCAN (\w+)")
+_KEYWORDS = {"WHERE", "JOIN", "ON", "ORDER", "GROUP", "LEFT", "INNER", "SET", "VALUES", "LIMIT", "USING"}
+
+
+def _aliases(sql):
+    found = {}
+    for table, alias in _ALIAS_RE.findall(sql):
+        found[table.upper()] = table
+        if alias and alias.upper() not in _KEYWORDS:
+            found[alias.upper()] = table
+    return found
+
+
+def table_rows(conn, table):
+    """Estimativa barata do tamanho da tabela (MAX(rowid) percorre só a borda da árvore)."""
+    try:
+        return conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+    except Exception:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def explain(conn, sql, params=()):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+
+
+def analyze_queries(conn, queries=None, min_rows=DEFAULT_MIN_ROWS):
+    """Devolve um Finding para cada SCAN em tabela com pelo menos ``min_rows`` linhas."""
+    findings = []
+    sizes = {}
+    for name, sql, params in (queries if queries is not None else all_queries()):
+        aliases = _aliases(sql)
+        for detail in explain(conn, sql, params):
+            m = _SCAN_RE.match(detail)
+            # Tabelas virtuais (FTS5) usam o próprio índice; o plano sempre diz SCAN
+            if not m or detail.startswith("SCAN CONSTANT ROW") or "VIRTUAL TABLE" in detail:
+                continue
+            table = aliases.get(m.group(1).upper(), m.group(1))
+            if table not in sizes:
+                # Subconsulta materializada ("SCAN f" de um FROM (SELECT ...) f) não é tabela do banco
+                existe = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE", (table,)).fetchone()
+                sizes[table] = table_rows(conn, table) if existe else 0
+            if sizes[table] >= min_rows:
+                findings.append(Finding(name, sql, table, sizes[table], detail))
+    return findings
+
+
+def unindexed_foreign_keys(conn):
+    """Lista (tabela, coluna, tabela_pai) de FKs sem índice começando pela coluna."""
+    missing = []
+    tables = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()]
+    for table in tables:
+        leading = set()
+        for idx in conn.execute(f"PRAGMA index_list({table})").fetchall():
+            cols = conn.execute(f"PRAGMA index_info({idx[1]})").fetchall()
+            if cols:
+                leading.add(cols[0][2])
+        for fk in conn.execute(f"PRAGMA foreign_key_list({table})").fetchall():
+            parent, column = fk[2], fk[3]
+            if column not in leading:
+                missing.append((table, column, parent))
+    return missing
+
+
+def report(conn, queries=None, min_rows=DEFAULT_MIN_ROWS):
+    """Devolve (quantidade de problemas, linhas do relatório em texto)."""
+    lines = []
+    problems = 0
+    for table, column, parent in unindexed_foreign_keys(conn):
+        problems += 1
+        lines.append(f"[FK] {table}.{column} -> {parent} sem índice "
+                     f"(sugestão: CREATE INDEX idx_{table.lower()}_{column.lower()} ON {table} ({column});)")
+    for f in analyze_queries(conn, queries, min_rows):
+        problems += 1
+        lines.append(f"[SCAN] {f.name}: {f.detail} (~{f.rows} linhas em {f.table})")
+    if not problems:
+        lines.append(f"Nenhum problema encontrado (limite: {min_rows} linhas).")
+    return problems, lines
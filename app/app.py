@@ -1,8 +1,13 @@
 import flet as ft
 import traceback
 
-from app.config import Theme
-from app.db import init_db
+from app.backup import start_scheduler
+from app.config import (
+    Theme, ASYNC_VIEWS, BACKUP_DIR, BACKUP_INTERVAL_HOURS, DB_SLOW_MS, DB_TRACE, MAINT_INTERVAL_MINUTES,
+)
+from app.db import init_db, applied_pragmas, db_profile, start_maintenance
+from app.purge import start_purger
+from app.tracing import install_dump
 
 
 def main(page: ft.Page):
@@ -13,6 +18,15 @@ def main(page: ft.Page):
         print("[BOOT] Inicializando banco de dados...", flush=True)
         init_db()
         print("[BOOT] Banco OK", flush=True)
+        pragmas = ", ".join(f"{k}={v}" for k, v in applied_pragmas().items())
+        print(f"[BOOT] SQLite perfil '{db_profile()[0]}': {pragmas}", flush=True)
+        if DB_TRACE:
+            print(f"[BOOT] Consultas instrumentadas (lentas >= {DB_SLOW_MS:g}ms); relatório em {install_dump()}", flush=True)
+        start_purger()
+        if start_maintenance() is not None:
+            print(f"[BOOT] Manutenção do banco a cada {MAINT_INTERVAL_MINUTES:g}min (quando ocioso)", flush=True)
+        if start_scheduler() is not None:
+            print(f"[BOOT] Backup agendado a cada {BACKUP_INTERVAL_HOURS:g}h em {BACKUP_DIR}", flush=True)
 
         page.title = "Checklist de Treino (Academia)"
 
@@ -107,11 +121,12 @@ def main(page: ft.Page):
         print("[BOOT] Importando views...", flush=True)
         try:
             from app.ui.views.home import show_home  # type: ignore
-            from app.ui.views.alunos import show_alunos  # type: ignore
+            from app.ui.views.alunos import show_alunos, show_alunos_async  # type: ignore
             from app.ui.views.exercicios import show_exercicios  # type: ignore
             from app.ui.views.planos import show_planos  # type: ignore
-            from app.ui.views.treino import show_treino  # type: ignore
-            from app.ui.views.relatorios import show_relatorios  # type: ignore
+            from app.ui.views.treino import show_treino, show_treino_async  # type: ignore
+            from app.ui.views.relatorios import show_relatorios, show_relatorios_async  # type: ignore
+            from app.ui.views.progressao import show_progressao  # type: ignore
             print("[BOOT] Views importadas com sucesso", flush=True)
         except Exception:
             err_imp = traceback.format_exc()
@@ -142,6 +157,7 @@ def main(page: ft.Page):
                     on_go_planos=go_planos,
                     on_go_treino=go_treino,
                     on_go_relatorios=go_relatorios,
+                    on_go_progressao=go_progressao,
                 )
             render(_show)
             # Só após a primeira renderização anexamos o listener de resize
@@ -153,8 +169,14 @@ def main(page: ft.Page):
             except Exception:
                 pass
 
+        # Telas assíncronas: consultas fora do event loop, com indicador de carregamento
+        print(f"[BOOT] Telas assíncronas: {'sim' if ASYNC_VIEWS else 'não'}", flush=True)
+
         def go_alunos():
-            render(lambda: show_alunos(page, on_back=go_home))
+            if ASYNC_VIEWS:
+                render(lambda: page.run_task(show_alunos_async, page, on_back=go_home))
+            else:
+                render(lambda: show_alunos(page, on_back=go_home))
 
         def go_exercicios():
             render(lambda: show_exercicios(page, on_back=go_home))
@@ -163,10 +185,19 @@ def main(page: ft.Page):
             render(lambda: show_planos(page, on_back=go_home))
 
         def go_treino():
-            render(lambda: show_treino(page, on_back=go_home))
+            if ASYNC_VIEWS:
+                render(lambda: page.run_task(show_treino_async, page, on_back=go_home))
+            else:
+                render(lambda: show_treino(page, on_back=go_home))
 
         def go_relatorios():
-            render(lambda: show_relatorios(page, on_back=go_home))
+            if ASYNC_VIEWS:
+                render(lambda: page.run_task(show_relatorios_async, page, on_back=go_home))
+            else:
+                render(lambda: show_relatorios(page, on_back=go_home))
+
+        def go_progressao():
+            render(lambda: show_progressao(page, on_back=go_home))
 
         # Start at home
         print("[BOOT] Render inicial (Home)...", flush=True)
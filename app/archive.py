@@ -0,0 +1,301 @@
+"""Arquivo morto: sessões antigas saem do banco principal para ``arquivo_AAAA.db``.
+
+O job move as sessões em blocos, cada bloco um job da thread de escrita: o
+job lê sessão + itens do banco principal, grava e confirma no arquivo do ano
+(conexão própria) e apaga do principal na transação do lote. O lock de
+escrita do banco principal fica com o job durante a cópia, de propósito:
+nenhuma gravação das telas entra no meio de um bloco. A cópia é idempotente,
+então uma interrupção entre os dois commits só faz o bloco ser copiado de
+novo na próxima execução; nada se perde.
+
+Para consulta, ``ArchiveReader`` expõe a mesma API de paginação do
+``SessaoRepository`` percorrendo banco principal + arquivos anexados, com os
+nomes de aluno/plano/exercício vindos do banco principal.
+
+A tabela PROGRESSAO fica no banco principal e não muda ao arquivar: ela
+continua cobrindo o histórico inteiro sem precisar ler os arquivos.
+"""
+import glob
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+from app import db
+from app.config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH, REPORT_PAGE_SIZE
+from app.repo import SessaoItem, SessaoRepository, SessaoResumo, progressao
+from app.repo.base import match_expression
+from app.repo.sessoes import FIRST_PAGE
+
+# SQLite permite 10 bancos anexados por conexão por padrão; o principal não conta
+MAX_ATTACHED = 9
+
+_FILE_RE = re.compile(r"arquivo_(\d{4})\.db$")
+
+_ARCHIVE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS SESSAO (
+        ID_SESSAO       INTEGER PRIMARY KEY,
+        ID_ALUNO        INTEGER NOT NULL,
+        ID_PLANO        INTEGER NOT NULL,
+        DATA_SESSAO     TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS SESSAO_ITEM (
+        ID_ITEM         INTEGER PRIMARY KEY,
+        ID_SESSAO       INTEGER NOT NULL,
+        ID_EXERCICIO    INTEGER NOT NULL,
+        FEITO           INTEGER NOT NULL DEFAULT 0,
+        SERIES_FEITAS   INTEGER,
+        REPS_MEDIA      INTEGER,
+        PESO_MEDIA      REAL,
+        OBS             TEXT
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessao_data_id ON SESSAO (DATA_SESSAO DESC, ID_SESSAO DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_sessao_aluno ON SESSAO (ID_ALUNO, DATA_SESSAO);",
+    "CREATE INDEX IF NOT EXISTS idx_sessao_item_sessao ON SESSAO_ITEM (ID_SESSAO);",
+)
+
+_SQL_ANOS = "SELECT DISTINCT substr(DATA_SESSAO, 1, 4) FROM SESSAO WHERE DATA_SESSAO < ? ORDER BY 1"
+_SQL_LOTE = (
+    "SELECT ID_SESSAO FROM SESSAO WHERE DATA_SESSAO >= ? AND DATA_SESSAO < ? "
+    "ORDER BY DATA_SESSAO, ID_SESSAO LIMIT ?"
+)
+_SQL_LE_SESSOES = (
+    "SELECT ID_SESSAO, ID_ALUNO, ID_PLANO, DATA_SESSAO FROM SESSAO "
+    "WHERE ID_SESSAO IN (SELECT value FROM json_each(?))"
+)
+_SQL_LE_ITENS = (
+    "SELECT ID_ITEM, ID_SESSAO, ID_EXERCICIO, FEITO, SERIES_FEITAS, REPS_MEDIA, PESO_MEDIA, OBS "
+    "FROM SESSAO_ITEM WHERE ID_SESSAO IN (SELECT value FROM json_each(?))"
+)
+_SQL_COPIA_SESSOES = "INSERT OR IGNORE INTO SESSAO (ID_SESSAO, ID_ALUNO, ID_PLANO, DATA_SESSAO) VALUES (?,?,?,?)"
+_SQL_COPIA_ITENS = (
+    "INSERT OR IGNORE INTO SESSAO_ITEM "
+    "(ID_ITEM, ID_SESSAO, ID_EXERCICIO, FEITO, SERIES_FEITAS, REPS_MEDIA, PESO_MEDIA, OBS) "
+    "VALUES (?,?,?,?,?,?,?,?)"
+)
+# Itens saem pelo ON DELETE CASCADE; STATS guarda quantas sessões estão no arquivo
+_SQL_APAGA = "DELETE FROM SESSAO WHERE ID_SESSAO IN (SELECT value FROM json_each(?))"
+_SQL_CONTA_ARQUIVADAS = (
+    "INSERT INTO STATS (TABELA, TOTAL) VALUES ('SESSAO_ARQUIVO', ?) "
+    "ON CONFLICT (TABELA) DO UPDATE SET TOTAL = TOTAL + excluded.TOTAL"
+)
+
+
+def archive_dir():
+    return os.path.dirname(os.path.abspath(db.DB_PATH))
+
+
+def archive_path(ano):
+    return os.path.join(archive_dir(), f"arquivo_{ano}.db")
+
+
+def list_archives():
+    """Arquivos existentes como [(ano, caminho)], do mais recente para o mais antigo."""
+    found = []
+    for path in glob.glob(os.path.join(archive_dir(), "arquivo_*.db")):
+        m = _FILE_RE.search(path)
+        if m:
+            found.append((int(m.group(1)), path))
+    return sorted(found, reverse=True)
+
+
+def default_cutoff():
+    return (date.today() - timedelta(days=ARCHIVE_AFTER_DAYS)).isoformat()
+
+
+def _abrir_arquivo(path):
+    """Conexão com o arquivo do ano (criado se preciso); usada pela thread de escrita."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    for sql in _ARCHIVE_SCHEMA:
+        conn.execute(sql)
+    conn.commit()
+    return conn
+
+
+def archive_sessions(before=None, batch=ARCHIVE_BATCH, progress=None):
+    """Move para o arquivo do ano as sessões com ``DATA_SESSAO < before`` (AAAA-MM-DD).
+
+    Sem ``before``, usa hoje menos ``ARCHIVE_AFTER_DAYS``. ``progress(ano, movidas)``
+    é chamado a cada bloco. Devolve ``{ano: sessões movidas}``.
+    """
+    cutoff = before or default_cutoff()
+    date.fromisoformat(cutoff)
+    db.init_db()
+    movidas = {}
+    with db.connection() as conn:
+        anos = [int(r[0]) for r in conn.execute(_SQL_ANOS, (cutoff,)).fetchall() if r[0] and r[0].isdigit()]
+    for ano in anos:
+        inicio, fim = f"{ano:04d}-01-01", min(cutoff, f"{ano + 1:04d}-01-01")
+        arq = _abrir_arquivo(archive_path(ano))
+        try:
+            while True:
+                n = db.write(_mover, arq, inicio, fim, batch)
+                if not n:
+                    break
+                movidas[ano] = movidas.get(ano, 0) + n
+                if progress:
+                    progress(ano, movidas[ano])
+        finally:
+            arq.close()
+    if movidas:
+        _leitor.reset()
+    return movidas
+
+
+def _mover(conn, arq, inicio, fim, batch):
+    """Job da thread de escrita: copia um bloco para ``arq`` (commit lá) e apaga do principal."""
+    ids = [r[0] for r in conn.execute(_SQL_LOTE, (inicio, fim, batch)).fetchall()]
+    if not ids:
+        return 0
+    lote = json.dumps(ids)
+    try:
+        arq.executemany(_SQL_COPIA_SESSOES, conn.execute(_SQL_LE_SESSOES, (lote,)).fetchall())
+        arq.executemany(_SQL_COPIA_ITENS, conn.execute(_SQL_LE_ITENS, (lote,)).fetchall())
+        arq.commit()
+    except BaseException:
+        arq.rollback()
+        raise
+    # Só apaga depois do commit no arquivo: se o lote do principal falhar, a cópia é refeita depois
+    apagadas = conn.execute(_SQL_APAGA, (lote,)).rowcount
+    conn.execute(_SQL_CONTA_ARQUIVADAS, (apagadas,))
+    return apagadas
+
+
+# ---- Leitura: banco principal + arquivos anexados
+
+def _sql_pagina(schema, filtrado):
+    # Mesma regra do banco principal (sessoes._SQL_PAGE): sessões de aluno ou plano
+    # excluído (ou já purgado) somem no join
+    filtro = "s.ID_ALUNO IN (SELECT rowid FROM main.ALUNO_FTS WHERE ALUNO_FTS MATCH ?) AND " if filtrado else ""
+    return (
+        "SELECT s.ID_SESSAO, s.DATA_SESSAO, a.NOME, p.NOME "
+        f"FROM {schema}.SESSAO s JOIN main.ALUNO a ON a.ID_ALUNO = s.ID_ALUNO AND a.DELETADO = 0 "
+        "JOIN main.PLANO p ON p.ID_PLANO = s.ID_PLANO AND p.DELETADO = 0 "
+        f"WHERE {filtro}(s.DATA_SESSAO, s.ID_SESSAO) < (?, ?) "
+        "ORDER BY s.DATA_SESSAO DESC, s.ID_SESSAO DESC LIMIT ?"
+    )
+
+
+def _sql_itens(schema):
+    return (
+        "SELECT COALESCE(e.NOME, '?'), COALESCE(e.GRUPO, '?'), si.FEITO, si.SERIES_FEITAS, si.REPS_MEDIA, "
+        f"si.PESO_MEDIA, si.OBS FROM {schema}.SESSAO_ITEM si "
+        "LEFT JOIN main.EXERCICIO e ON e.ID_EXERCICIO = si.ID_EXERCICIO "
+        "WHERE si.ID_SESSAO = ? ORDER BY si.ID_ITEM"
+    )
+
+
+class _Leitor:
+    """Conexões de leitura com os arquivos anexados (até ``MAX_ATTACHED`` por conexão)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._grupos = None  # [(conn, [schemas])]
+        self._arquivos = None
+
+    def reset(self):
+        with self._lock:
+            for conn, _ in self._grupos or ():
+                conn.close()
+            self._grupos = None
+            self._arquivos = None
+
+    def _abrir(self):
+        arquivos = list_archives()
+        if arquivos == self._arquivos and self._grupos is not None:
+            return
+        for conn, _ in self._grupos or ():
+            conn.close()
+        grupos = []
+        for i in range(0, len(arquivos), MAX_ATTACHED):
+            conn = db.get_conn()
+            schemas = []
+            for ano, path in arquivos[i:i + MAX_ATTACHED]:
+                conn.execute("ATTACH DATABASE ? AS ?", (path, f"arq{ano}"))
+                schemas.append(f"arq{ano}")
+            grupos.append((conn, schemas))
+        self._grupos, self._arquivos = grupos, arquivos
+
+    def consultar(self, fn):
+        """Roda ``fn(conn, schema)`` em cada arquivo e devolve a lista dos resultados."""
+        with self._lock:
+            self._abrir()
+            return [fn(conn, schema) for conn, schemas in self._grupos for schema in schemas]
+
+
+_leitor = _Leitor()
+db.on_database_change(_leitor.reset)
+
+
+class ArchiveReader(SessaoRepository):
+    """``SessaoRepository`` que enxerga também o arquivo morto (consulta sob demanda)."""
+
+    def search_page(self, text="", after=None, limit=REPORT_PAGE_SIZE):
+        after = after or FIRST_PAGE
+        expr = match_expression(text)
+        quentes = super().search_page(text, after, limit)
+
+        def pagina(conn, schema):
+            params = ((expr,) if expr else ()) + (*after, limit)
+            return [SessaoResumo._make(r) for r in conn.execute(_sql_pagina(schema, bool(expr)), params).fetchall()]
+
+        fontes = [quentes] + _leitor.consultar(pagina)
+        # Cada fonte já vem ordenada pela chave do relatório: basta intercalar
+        chave = lambda r: (r.data_sessao, r.id_sessao)
+        # Sessão já copiada para o arquivo mas ainda não apagada do principal aparece nas
+        # duas fontes com a mesma chave: as cópias saem em sequência no merge
+        vistos, pagina_final = set(), []
+        for r in heapq.merge(*fontes, key=chave, reverse=True):
+            if r.id_sessao in vistos:
+                continue
+            vistos.add(r.id_sessao)
+            pagina_final.append(r)
+            if len(pagina_final) == limit:
+                break
+        return pagina_final
+
+    def items(self, id_sessao):
+        rows = super().items(id_sessao)
+        if rows:
+            return rows
+        for found in _leitor.consultar(
+            lambda conn, schema: conn.execute(_sql_itens(schema), (id_sessao,)).fetchall()
+        ):
+            if found:
+                return [SessaoItem._make(r) for r in found]
+        return []
+
+    def delete(self, id_sessao):
+        super().delete(id_sessao)
+        keys = []
+
+        def apagar(conn, schema):
+            keys.extend(progressao.chaves(conn, [id_sessao], schema))
+            with conn:
+                conn.execute(f"DELETE FROM {schema}.SESSAO_ITEM WHERE ID_SESSAO = ?", (id_sessao,))
+                n = conn.execute(f"DELETE FROM {schema}.SESSAO WHERE ID_SESSAO = ?", (id_sessao,)).rowcount
+            return n
+
+        if sum(_leitor.consultar(apagar)):
+            # O dia pode ter itens no principal e em outros arquivos: recalcula com todos
+            restantes = [r for rows in _leitor.consultar(
+                lambda conn, schema: progressao.agregados(conn, keys, schema)) for r in rows]
+
+            def _ajustar(conn):
+                conn.execute(_SQL_CONTA_ARQUIVADAS, (-1,))
+                progressao.recalcular(conn, keys, restantes)
+            db.write(_ajustar)
+
+
+def rebuild_progression():
+    """Refaz PROGRESSAO a partir do banco principal e de todos os arquivos; devolve o nº de linhas."""
+    db.init_db()
+    extra = [r for rows in _leitor.consultar(progressao.agregados_todos) for r in rows]
+    return db.write(progressao.reconstruir, extra)
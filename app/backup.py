@@ -0,0 +1,151 @@
+"""Backup online do banco com ``sqlite3.Connection.backup``.
+
+A cópia anda em passos de ``BACKUP_PAGES_PER_STEP`` páginas com uma pausa
+entre eles. A conexão de origem mantém uma transação de leitura aberta do
+começo ao fim: em WAL isso não bloqueia quem grava e garante uma cópia
+consistente, sem que cada gravação concorrente reinicie o backup.
+
+Cada arquivo é gerado como ``.part``, conferido com ``PRAGMA quick_check`` e
+só então renomeado; os mais antigos além de ``BACKUP_KEEP`` são apagados.
+"""
+import glob
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from app import db
+from app.config import (
+    BACKUP_DIR, BACKUP_INTERVAL_HOURS, BACKUP_KEEP, BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP,
+)
+
+BackupResult = namedtuple("BackupResult", "caminho paginas segundos verificado removidos")
+
+
+def list_backups(dest=BACKUP_DIR):
+    """Backups prontos (sem ``.part``), do mais recente para o mais antigo."""
+    return sorted(glob.glob(os.path.join(dest, "academia_*.db")), reverse=True)
+
+
+def verify(path):
+    """Roda ``PRAGMA quick_check`` no arquivo; devolve a mensagem ("ok" quando íntegro)."""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("PRAGMA quick_check;").fetchall()
+    finally:
+        conn.close()
+    return "; ".join(r[0] for r in rows)
+
+
+def rotate(dest=BACKUP_DIR, keep=BACKUP_KEEP):
+    removidos = []
+    for path in list_backups(dest)[keep:]:
+        os.remove(path)
+        removidos.append(path)
+    return removidos
+
+
+def backup_now(dest=BACKUP_DIR, keep=BACKUP_KEEP, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP):
+    """Faz um backup completo em ``dest`` e devolve um ``BackupResult``.
+
+    Levanta ``RuntimeError`` se a verificação falhar (o arquivo ruim é apagado).
+    """
+    os.makedirs(dest, exist_ok=True)
+    final = os.path.join(dest, f"academia_{datetime.now():%Y%m%d_%H%M%S}.db")
+    parcial = final + ".part"
+    inicio = time.perf_counter()
+    copiadas = {"total": 0}
+
+    def passo(status, restantes, total):
+        copiadas["total"] = total
+        if restantes and sleep:
+            time.sleep(sleep)
+
+    src = db.get_conn()
+    dst = sqlite3.connect(parcial)
+    try:
+        # Snapshot de leitura fixo durante toda a cópia (ver docstring do módulo)
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        src.backup(dst, pages=pages, progress=passo)
+        src.rollback()
+        # A cópia herda o modo WAL da origem; como arquivo avulso, journal comum é mais prático
+        dst.execute("PRAGMA journal_mode = DELETE;")
+    finally:
+        dst.close()
+        src.close()
+
+    resultado = verify(parcial)
+    if resultado != "ok":
+        os.remove(parcial)
+        raise RuntimeError(f"backup reprovado no quick_check: {resultado}")
+    os.replace(parcial, final)
+    removidos = rotate(dest, keep)
+    return BackupResult(final, copiadas["total"], time.perf_counter() - inicio, resultado, removidos)
+
+
+class BackupScheduler:
+    """Thread em segundo plano que faz um backup a cada ``interval`` segundos.
+
+    O primeiro backup sai quando o mais recente em ``dest`` completar o
+    intervalo, então reiniciar o app não gera um backup por boot.
+    """
+
+    def __init__(self, interval, dest=BACKUP_DIR, keep=BACKUP_KEEP):
+        self.interval = interval
+        self.dest = dest
+        self.keep = keep
+        self.last = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def next_due(self):
+        existentes = list_backups(self.dest)
+        if not existentes:
+            return time.time()
+        return os.path.getmtime(existentes[0]) + self.interval
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="db-backup", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(max(0.0, self.next_due() - time.time())):
+            try:
+                self.last = backup_now(self.dest, self.keep)
+                print(f"[BACKUP] {self.last.caminho} ({self.last.paginas} páginas, "
+                      f"{self.last.segundos:.1f}s, quick_check ok)", flush=True)
+            except Exception as ex:
+                print(f"[ERRO] Backup falhou: {ex}", flush=True)
+                # Sem isso, um erro persistente viraria um laço de tentativas
+                if self._stop.wait(min(self.interval, 600)):
+                    break
+
+
+_scheduler = None
+
+
+def start_scheduler(interval_hours=BACKUP_INTERVAL_HOURS):
+    """Liga o backup agendado do processo (uma vez só); ``interval_hours <= 0`` desliga."""
+    global _scheduler
+    if _scheduler is None and interval_hours > 0:
+        _scheduler = BackupScheduler(interval_hours * 3600).start()
+    return _scheduler
+
+
+@db.on_database_change
+def stop_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
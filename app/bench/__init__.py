@@ -0,0 +1,187 @@
+"""Benchmarks locais (sem serviços externos): medição, resultados em JSON e comparação com baseline.
+
+Cada suíte (``app.bench.db``, ``app.bench.ui``) produz uma lista de ``Medida``; aqui
+ficam as partes comuns: o laço de medição, os bancos sintéticos de cada
+tamanho (``app.datagen``, gerados uma vez e reaproveitados), o arquivo de
+resultados e a comparação com um baseline gravado antes.
+
+Uso: ``python -m app bench db --tamanhos 1000,10000 --gravar-baseline`` grava o
+baseline; rodadas seguintes comparam com ele (ou com ``--baseline arquivo.json``).
+"""
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from app.config import (
+    BASE_DIR, BENCH_DATE, BENCH_DIR, BENCH_MIN_DIFF_MS, BENCH_SEED, BENCH_TIME, BENCH_TOLERANCE, DB_TRACE,
+)
+
+FORMATO = 1  # versão do arquivo de resultados
+
+Medida = namedtuple("Medida", "suite caso tela tamanho reps min_ms mediana_ms p95_ms media_ms extras")
+Comparacao = namedtuple("Comparacao", "suite caso tamanho base_ms atual_ms razao status")
+
+
+def medir(fn, preparar=None, tempo=BENCH_TIME, min_reps=5, max_reps=1000, aquecimento=2):
+    """Tempos (ms) de ``fn()``: repete até gastar ``tempo`` segundos, entre ``min_reps`` e ``max_reps`` vezes.
+
+    ``preparar()`` roda antes de cada repetição, fora da medição.
+    """
+    for _ in range(aquecimento):
+        if preparar:
+            preparar()
+        fn()
+    tempos = []
+    limite = time.perf_counter() + tempo
+    while len(tempos) < max_reps and (len(tempos) < min_reps or time.perf_counter() < limite):
+        if preparar:
+            preparar()
+        t0 = time.perf_counter_ns()
+        fn()
+        tempos.append((time.perf_counter_ns() - t0) / 1e6)
+    return tempos
+
+
+def resumir(suite, caso, tela, tamanho, tempos, **extras):
+    ordenados = sorted(tempos)
+    n = len(ordenados)
+    return Medida(
+        suite, caso, tela, tamanho, n, round(ordenados[0], 4), round(ordenados[n // 2], 4),
+        round(ordenados[min(n - 1, int(n * 0.95))], 4), round(sum(ordenados) / n, 4), extras,
+    )
+
+
+def dataset(alunos, sessoes=24, seed=BENCH_SEED, progress=None):
+    """Caminho do banco sintético com ``alunos`` alunos; gera na primeira vez e reaproveita depois."""
+    from app.datagen import generate
+
+    path = os.path.join(BENCH_DIR, f"carga_{alunos}_{sessoes:g}_{seed}.db")
+    if not os.path.exists(path):
+        parcial = path + ".gerando"
+        generate(parcial, alunos=alunos, sessoes=sessoes, seed=seed, ate=BENCH_DATE, replace=True,
+                 progress=progress)
+        os.replace(parcial, path)
+    return path
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                             text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def ambiente():
+    """O que muda os números entre máquinas/execuções; vai junto no arquivo de resultados."""
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "db_trace": DB_TRACE,
+        "commit": _commit(),
+    }
+
+
+def salvar(path, suite, medidas, parametros=None):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    doc = {
+        "formato": FORMATO,
+        "suite": suite,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": ambiente(),
+        "parametros": parametros or {},
+        "resultados": [m._asdict() for m in medidas],
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+def carregar(path):
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    doc["resultados"] = [Medida(**r) for r in doc.get("resultados", [])]
+    return doc
+
+
+def comparar(medidas, base, tolerancia=BENCH_TOLERANCE, min_diff_ms=BENCH_MIN_DIFF_MS):
+    """Compara medianas com o baseline (``carregar``); ``status``: regressão, melhora, ok, novo.
+
+    Só é regressão/melhora se a diferença passar de ``tolerancia`` (relativa)
+    e de ``min_diff_ms`` (absoluta), e se o melhor tempo (``min_ms``) andar no
+    mesmo sentido: uma mediana puxada por ruído da máquina não vira alarme.
+    """
+    anteriores = {(m.suite, m.caso, m.tamanho): m for m in base["resultados"]}
+    saida = []
+    for m in medidas:
+        b = anteriores.get((m.suite, m.caso, m.tamanho))
+        if b is None:
+            saida.append(Comparacao(m.suite, m.caso, m.tamanho, None, m.mediana_ms, None, "novo"))
+            continue
+        razao = m.mediana_ms / b.mediana_ms if b.mediana_ms else None
+        razao_min = m.min_ms / b.min_ms if b.min_ms else razao
+        relevante = razao is not None and abs(m.mediana_ms - b.mediana_ms) >= min_diff_ms
+        if relevante and razao > 1 + tolerancia and razao_min > 1 + tolerancia:
+            status = "regressão"
+        elif relevante and razao < 1 / (1 + tolerancia) and razao_min < 1 / (1 + tolerancia):
+            status = "melhora"
+        else:
+            status = "ok"
+        saida.append(Comparacao(m.suite, m.caso, m.tamanho, b.mediana_ms, m.mediana_ms, razao, status))
+    return saida
+
+
+def diferencas_ambiente(base):
+    """Campos do ambiente que mudaram desde o baseline (comparação menos confiável)."""
+    atual = ambiente()
+    return {k: (v, atual.get(k)) for k, v in base.get("ambiente", {}).items()
+            if k != "commit" and atual.get(k) != v}
+
+
+def acima_do_alvo(medidas):
+    """Medidas cujo p95 passou do ``alvo_ms`` do caso (metas absolutas, independentes do baseline)."""
+    return [m for m in medidas if m.extras.get("alvo_ms") is not None and m.p95_ms > m.extras["alvo_ms"]]
+
+
+def tabela(medidas, colunas_extras=()):
+    """Linhas de texto com as medidas, agrupadas por tamanho."""
+    linhas = []
+    largura = max([32] + [len(m.caso) for m in medidas])
+    for m in medidas:
+        extras = "".join(f"  {k}={m.extras[k]}" for k in colunas_extras if k in m.extras)
+        linhas.append(f"{m.tamanho:>8}  {m.caso:<{largura}}  mediana {m.mediana_ms:9.3f} ms  "
+                      f"p95 {m.p95_ms:9.3f} ms  ({m.reps} reps){extras}")
+    return linhas
+
+
+def tabela_comparacao(comparacoes):
+    linhas = []
+    largura = max([32] + [len(c.caso) for c in comparacoes])
+    for c in comparacoes:
+        if c.base_ms is None:
+            linhas.append(f"{c.tamanho:>8}  {c.caso:<{largura}}  {'':>10}    {c.atual_ms:9.3f} ms  novo")
+            continue
+        marca = {"regressão": "  <<< REGRESSÃO", "melhora": "  melhora"}.get(c.status, "")
+        razao = f"{c.razao:5.2f}x" if c.razao is not None else "    -"
+        linhas.append(f"{c.tamanho:>8}  {c.caso:<{largura}}  {c.base_ms:9.3f} -> {c.atual_ms:9.3f} ms  {razao}{marca}")
+    return linhas
+
+
+def caminho_padrao(suite, baseline=False):
+    return os.path.join(BENCH_DIR, f"{suite}_baseline.json" if baseline else f"{suite}.json")
+
+
+def progresso_padrao(nome, linhas):
+    print(f"[BENCH] gerando banco sintético: {nome} {linhas:,}", file=sys.stderr, flush=True)
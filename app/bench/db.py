@@ -0,0 +1,321 @@
+"""Suíte de benchmark da camada de dados: cada consulta/gravação que as telas fazem.
+
+Os casos chamam os repositórios exatamente como as views (``show_alunos``,
+``show_exercicios``, ``show_planos``, ``show_treino``, ``show_relatorios``
+e a progressão), com pool, thread de escrita e group commit no caminho, sobre
+uma cópia descartável do banco sintético de cada tamanho. Leituras com cache
+de resultados são medidas a frio (cache limpo antes de cada repetição) e, em
+casos separados, com o cache quente.
+"""
+import os
+import random
+import shutil
+import tempfile
+from collections import namedtuple
+from datetime import date, timedelta
+
+from app import db
+from app.bench import dataset, medir, resumir
+from app.config import BENCH_DATE, BENCH_SEED, BENCH_TIME, SEARCH_LIMIT
+from app.repo import (
+    AlunoRepository, ExercicioRepository, PlanoRepository, ProgressaoRepository, SessaoRepository, StatsRepository,
+)
+from app.repo.cache import get_cache
+
+SUITE = "db"
+EXTRAS = ("alvo_ms",)  # colunas extras na saída da CLI
+# Alunos nos bancos sintéticos; 100000 gera ~11M itens (alguns minutos na 1ª vez, depois reaproveitado)
+TAMANHOS = (1000, 10000, 100000)
+
+# ``fazer(ctx)`` devolve a função medida; ``frio`` limpa o cache de resultados antes de cada
+# repetição; ``max_reps`` limita casos que consomem linhas (exclusões); ``alvo_ms``, se houver, é o
+# p95 máximo aceito em qualquer tamanho (a CLI sai com erro acima dele)
+Caso = namedtuple("Caso", "nome tela fazer frio max_reps alvo_ms")
+
+_CASOS = []
+_MAX_EXCLUSOES = 200
+# Nomes digitados letra a letra nos casos de busca (sobrenomes comuns e prefixos de 1-2 letras)
+_DIGITADOS = ("ana silva", "jose santos", "maria", "e", "m")
+
+
+def caso(nome, tela, frio=False, max_reps=1000, alvo_ms=None):
+    def registrar(fazer):
+        _CASOS.append(Caso(nome, tela, fazer, frio, max_reps, alvo_ms))
+        return fazer
+    return registrar
+
+
+def casos():
+    return list(_CASOS)
+
+
+class _Contexto:
+    """Repositórios e amostras de IDs (determinísticas) do banco em teste."""
+
+    def __init__(self, seed=BENCH_SEED):
+        self.rng = random.Random(seed)
+        self.alunos = AlunoRepository()
+        self.exercicios = ExercicioRepository()
+        self.planos = PlanoRepository()
+        self.sessoes = SessaoRepository()
+        self.progressao = ProgressaoRepository()
+        self.stats = StatsRepository()
+        with db.connection() as conn:
+            self.ids_aluno = [r[0] for r in conn.execute("SELECT ID_ALUNO FROM ALUNO WHERE DELETADO = 0")]
+            self.ids_plano = [r[0] for r in conn.execute("SELECT ID_PLANO FROM PLANO WHERE DELETADO = 0")]
+            self.ids_exercicio = [r[0] for r in conn.execute("SELECT ID_EXERCICIO FROM EXERCICIO WHERE DELETADO = 0")]
+            self.max_sessao = conn.execute("SELECT COALESCE(MAX(ID_SESSAO), 0) FROM SESSAO").fetchone()[0]
+            # Aluno com mais histórico: pior caso da tela de progressão
+            self.aluno_ativo, self.exercicio_ativo = conn.execute(
+                "SELECT ID_ALUNO, ID_EXERCICIO FROM PROGRESSAO GROUP BY ID_ALUNO, ID_EXERCICIO "
+                "ORDER BY COUNT(*) DESC LIMIT 1"
+            ).fetchone() or (1, 1)
+        self.rng.shuffle(self.ids_aluno)
+
+    def algum(self, ids):
+        return ids[self.rng.randrange(len(ids))]
+
+    def sessao(self):
+        """Uma sessão existente qualquer (IDs são densos no banco gerado)."""
+        return self.rng.randint(1, max(1, self.max_sessao))
+
+    def teclas(self):
+        """Cada chamada devolve o próximo texto da busca, como se fosse digitado (``_DIGITADOS``)."""
+        textos = [nome[:i] for nome in _DIGITADOS for i in range(1, len(nome) + 1) if not nome[:i].endswith(" ")]
+        return lambda: textos[self.rng.randrange(len(textos))]
+
+    def apagaveis(self, inserir):
+        """Linhas criadas só para os casos de exclusão (o aquecimento também consome)."""
+        return [inserir(i) for i in range(_MAX_EXCLUSOES + 5)]
+
+
+# ---- Home
+
+@caso("stats.totals", "home")
+def _(ctx):
+    return ctx.stats.totals
+
+
+# ---- show_alunos
+
+@caso("alunos.search (lista)", "alunos")
+def _(ctx):
+    return lambda: ctx.alunos.search("")
+
+
+@caso("alunos.search (filtro)", "alunos")
+def _(ctx):
+    return lambda: ctx.alunos.search("ana sil")
+
+
+@caso("alunos.search (digitação)", "alunos", alvo_ms=5.0)
+def _(ctx):
+    # Uma tecla por repetição: o p95 é a tecla mais lenta, não a média da palavra
+    tecla = ctx.teclas()
+    return lambda: ctx.alunos.search(tecla())
+
+
+@caso("alunos.search_page (primeira)", "alunos")
+def _(ctx):
+    return lambda: ctx.alunos.search_page("")
+
+
+@caso("alunos.search_page (meio)", "alunos")
+def _(ctx):
+    # Cursor na metade do cadastro: a página custa o mesmo que a primeira
+    nomes = ctx.alunos.search_names("")
+    meio = nomes[len(nomes) // 2] if nomes else None
+    cursor = (meio.nome, meio.id_aluno) if meio else None
+    return lambda: ctx.alunos.search_page("", cursor)
+
+
+@caso("alunos.insert", "alunos")
+def _(ctx):
+    return lambda: ctx.alunos.insert("Aluno Benchmark", "1990-01-01", 1.75, 78.0)
+
+
+@caso("alunos.delete", "alunos", max_reps=_MAX_EXCLUSOES)
+def _(ctx):
+    # Saem da amostra: sessoes.create recusa aluno excluído
+    ids = [ctx.ids_aluno.pop() for _ in range(min(len(ctx.ids_aluno) - 1, _MAX_EXCLUSOES + 5))]
+    return lambda: ctx.alunos.delete(ids.pop())
+
+
+# ---- show_exercicios
+
+@caso("exercicios.search (lista)", "exercicios", frio=True)
+def _(ctx):
+    return lambda: ctx.exercicios.search("")
+
+
+@caso("exercicios.search (filtro)", "exercicios")
+def _(ctx):
+    return lambda: ctx.exercicios.search("supino")
+
+
+@caso("exercicios.insert", "exercicios")
+def _(ctx):
+    return lambda: ctx.exercicios.insert("Exercício Benchmark", "Core")
+
+
+@caso("exercicios.delete", "exercicios", max_reps=_MAX_EXCLUSOES)
+def _(ctx):
+    ids = ctx.apagaveis(lambda i: ctx.exercicios.insert(f"Apagar {i}", "Core"))
+    return lambda: ctx.exercicios.delete(ids.pop())
+
+
+# ---- show_planos
+
+@caso("planos.search (lista)", "planos", frio=True)
+def _(ctx):
+    return lambda: ctx.planos.search("")
+
+
+@caso("planos.search (filtro)", "planos")
+def _(ctx):
+    return lambda: ctx.planos.search("Pernas")
+
+
+@caso("planos.items", "planos", frio=True)
+def _(ctx):
+    return lambda: ctx.planos.items(ctx.algum(ctx.ids_plano))
+
+
+@caso("planos.add_item + remove_item", "planos")
+def _(ctx):
+    def fn():
+        pid, eid = ctx.algum(ctx.ids_plano), ctx.algum(ctx.ids_exercicio)
+        ctx.planos.add_item(pid, eid, 3, 10)
+        ctx.planos.remove_item(pid, eid)
+    return fn
+
+
+@caso("planos.insert", "planos")
+def _(ctx):
+    return lambda: ctx.planos.insert("Plano Benchmark")
+
+
+@caso("planos.delete", "planos", max_reps=_MAX_EXCLUSOES)
+def _(ctx):
+    ids = ctx.apagaveis(lambda i: ctx.planos.insert(f"Apagar {i}"))
+    return lambda: ctx.planos.delete(ids.pop())
+
+
+# ---- show_treino
+
+@caso("alunos.search_names (filtro)", "treino")
+def _(ctx):
+    return lambda: ctx.alunos.search_names("jo")
+
+
+@caso("alunos.search_names (digitação)", "treino", alvo_ms=5.0)
+def _(ctx):
+    tecla = ctx.teclas()
+    return lambda: ctx.alunos.search_names(tecla())
+
+
+@caso("planos.list_all", "treino", frio=True)
+def _(ctx):
+    return lambda: ctx.planos.list_all(SEARCH_LIMIT)
+
+
+@caso("planos.list_all (cache)", "treino")
+def _(ctx):
+    return lambda: ctx.planos.list_all(SEARCH_LIMIT)
+
+
+@caso("planos.items (cache)", "treino")
+def _(ctx):
+    pid = ctx.algum(ctx.ids_plano)
+    return lambda: ctx.planos.items(pid)
+
+
+@caso("sessoes.create (6 itens)", "treino")
+def _(ctx):
+    dia = date.fromisoformat(BENCH_DATE)
+    itens = [(e, 1, 3, 10, 20.0 + i, None) for i, e in enumerate(ctx.ids_exercicio[:6])]
+
+    def fn():
+        ctx.sessoes.create(ctx.algum(ctx.ids_aluno), ctx.algum(ctx.ids_plano),
+                           (dia - timedelta(days=ctx.rng.randint(0, 365))).isoformat(), itens)
+    return fn
+
+
+# ---- show_relatorios
+
+@caso("sessoes.search_page (primeira)", "relatorios")
+def _(ctx):
+    return lambda: ctx.sessoes.search_page("")
+
+
+@caso("sessoes.search_page (página 20)", "relatorios")
+def _(ctx):
+    cursor = None
+    for _ in range(19):
+        rows = ctx.sessoes.search_page("", cursor)
+        if not rows:
+            break
+        cursor = ctx.sessoes.cursor(rows[-1])
+    return lambda: ctx.sessoes.search_page("", cursor)
+
+
+@caso("sessoes.search_page (filtro)", "relatorios")
+def _(ctx):
+    return lambda: ctx.sessoes.search_page("mariana")
+
+
+@caso("sessoes.items", "relatorios")
+def _(ctx):
+    return lambda: ctx.sessoes.items(ctx.sessao())
+
+
+@caso("sessoes.delete", "relatorios", max_reps=_MAX_EXCLUSOES)
+def _(ctx):
+    # Sessões reais do histórico, com itens: a exclusão recalcula a progressão
+    ids = ctx.rng.sample(range(1, ctx.max_sessao + 1), min(ctx.max_sessao, _MAX_EXCLUSOES + 5))
+    return lambda: ctx.sessoes.delete(ids.pop())
+
+
+# ---- Progressão
+
+@caso("progressao.exercises", "progressao")
+def _(ctx):
+    return lambda: ctx.progressao.exercises(ctx.aluno_ativo)
+
+
+@caso("progressao.series", "progressao")
+def _(ctx):
+    return lambda: ctx.progressao.series(ctx.aluno_ativo, ctx.exercicio_ativo)
+
+
+def run(tamanhos=TAMANHOS, filtro=None, tempo=BENCH_TIME, sessoes=24, progress=None, log=None):
+    """Roda os casos (``filtro``: trecho do nome ou da tela) em cada tamanho e devolve a lista de ``Medida``.
+
+    Cada tamanho usa uma cópia temporária do banco sintético; o original,
+    reaproveitado entre execuções, nunca é alterado.
+    """
+    selecionados = [c for c in _CASOS if not filtro or filtro in c.nome or filtro == c.tela]
+    medidas = []
+    anterior = db.DB_PATH
+    for tamanho in tamanhos:
+        origem = dataset(tamanho, sessoes=sessoes, progress=progress)
+        tmp = tempfile.mkdtemp(prefix="bench_")
+        try:
+            copia = os.path.join(tmp, "bench.db")
+            shutil.copyfile(origem, copia)
+            db.use_database(copia)
+            db.init_db()
+            ctx = _Contexto()
+            cache = get_cache()
+            for c in selecionados:
+                fn = c.fazer(ctx)
+                tempos = medir(fn, preparar=cache.clear if c.frio else None, tempo=tempo, max_reps=c.max_reps)
+                m = resumir(SUITE, c.nome, c.tela, tamanho, tempos,
+                            **({"alvo_ms": c.alvo_ms} if c.alvo_ms is not None else {}))
+                medidas.append(m)
+                if log:
+                    log(m)
+        finally:
+            db.use_database(anterior)
+            shutil.rmtree(tmp, ignore_errors=True)
+    return medidas
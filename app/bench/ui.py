@@ -0,0 +1,180 @@
+"""Suíte de benchmark das telas: monta cada ``show_*`` numa página Flet sem cliente.
+
+A página é um ``ft.Page`` de verdade ligado a uma conexão falsa, que processa
+os comandos como o servidor do Flet (ids, árvore de controles) e, em vez de
+mandar pela rede, só conta os bytes do JSON. Cada repetição abre uma página
+nova e mede o primeiro render completo da tela: consultas, montagem dos
+``ft.Card``/``ft.Row``/``ft.Text`` e serialização. Junto do tempo vão o número
+de controles enviados ao cliente e o tamanho do payload.
+
+``tamanho`` é o número de linhas da tabela que a tela lista (alunos,
+exercícios e planos); o tempo das consultas sozinhas está na suíte ``db``.
+"""
+import asyncio
+import gc
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+
+import flet as ft
+from flet.core.local_connection import LocalConnection
+from flet.core.protocol import (
+    ClientActions, ClientMessage, CommandEncoder, PageCommandResponsePayload, PageCommandsBatchResponsePayload,
+)
+
+from app import db
+from app.bench import dataset, medir, resumir
+from app.config import BENCH_TIME, Theme
+from app.repo.cache import get_cache
+
+SUITE = "ui"
+EXTRAS = ("controles", "payload_kb")
+# Linhas listadas. Cada controle custa ~3,5 KB no processo: com 100000, telas que listam
+# tudo passam de 1M de controles (minutos por render e alguns GB de memória)
+TAMANHOS = (100, 10000, 100000)
+SESSOES = 1  # sessões por aluno no banco sintético: só a primeira página do relatório aparece
+
+# ``mostrar(page)`` abre a tela como o app.py faz (versões síncronas das telas)
+Tela = namedtuple("Tela", "nome mostrar")
+
+
+def _nada(*_args, **_kwargs):
+    pass
+
+
+def _telas():
+    # Importadas aqui: as views puxam o Flet inteiro e a CLI não precisa disso para a suíte db
+    from app.ui.views.alunos import show_alunos
+    from app.ui.views.exercicios import show_exercicios
+    from app.ui.views.home import show_home
+    from app.ui.views.planos import show_planos
+    from app.ui.views.progressao import show_progressao
+    from app.ui.views.relatorios import show_relatorios
+    from app.ui.views.treino import show_treino
+
+    return [
+        Tela("home", lambda p: show_home(p, _nada, _nada, _nada, _nada, _nada, _nada)),
+        Tela("alunos", lambda p: show_alunos(p, _nada)),
+        Tela("exercicios", lambda p: show_exercicios(p, _nada)),
+        Tela("planos", lambda p: show_planos(p, _nada)),
+        Tela("treino", lambda p: show_treino(p, _nada)),
+        Tela("relatorios", lambda p: show_relatorios(p, _nada)),
+        Tela("progressao", lambda p: show_progressao(p, _nada)),
+    ]
+
+
+class _Conexao(LocalConnection):
+    """Conexão sem cliente: faz o que o servidor do Flet faz com os comandos, menos enviar."""
+
+    def __init__(self):
+        super().__init__()
+        self.controles = 0
+        self.bytes = 0
+
+    def send_command(self, session_id, command):
+        result, message = self._process_command(command)
+        if message:
+            self._enviar(message)
+        return PageCommandResponsePayload(result=result, error="")
+
+    def send_commands(self, session_id, commands):
+        results, messages = [], []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ("add", "get"):
+                results.append(result)
+            if command.name == "add":
+                self.controles += len(result.split())
+            if message:
+                messages.append(message)
+        if messages:
+            self._enviar(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages))
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+    def _enviar(self, message):
+        self.bytes += len(json.dumps(message, cls=CommandEncoder, separators=(",", ":")).encode("utf-8"))
+
+
+def _pagina(loop):
+    conn = _Conexao()
+    page = ft.Page(conn, "bench", loop)
+    # Tamanho da janela do desktop (Theme.WINDOW_*): layout "grande" das telas
+    page._set_attr("width", Theme.WINDOW_WIDTH, False)
+    page._set_attr("height", Theme.WINDOW_HEIGHT, False)
+    page.theme_mode = Theme.THEME_MODE
+    page.update()
+    conn.controles = conn.bytes = 0  # só o render da tela conta
+    return page, conn
+
+
+def _repeticoes(tamanho):
+    """(mínimo de repetições, aquecimento): renders grandes levam segundos, os enormes minutos."""
+    if tamanho >= 100000:
+        return 1, 0
+    return (5, 1) if tamanho < 10000 else (3, 1)
+
+
+def _completar(tabela, sql, total):
+    """Completa ``tabela`` até ``total`` linhas (o banco sintético tem catálogo de academia real)."""
+    def fn(conn):
+        atual = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+        if atual < total:
+            conn.execute(sql, (atual + 1, total))
+    db.write(fn)
+
+
+_SQL_EXERCICIOS = (
+    "WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+    "INSERT INTO EXERCICIO (NOME, GRUPO) SELECT 'Exercício ' || i, 'Grupo ' || (i % 12) FROM n"
+)
+_SQL_PLANOS = (
+    "WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+    "INSERT INTO PLANO (NOME) SELECT 'Plano ' || i FROM n"
+)
+
+
+def run(tamanhos=TAMANHOS, filtro=None, tempo=BENCH_TIME, sessoes=SESSOES, progress=None, log=None):
+    """Mede o primeiro render de cada tela (``filtro``: nome da tela) em cada tamanho; devolve ``Medida``s."""
+    telas = [t for t in _telas() if not filtro or filtro in t.nome]
+    medidas = []
+    anterior = db.DB_PATH
+    loop = asyncio.new_event_loop()  # exigido pelo ft.Page; as telas síncronas não agendam nada nele
+    try:
+        for tamanho in tamanhos:
+            origem = dataset(tamanho, sessoes=sessoes, progress=progress)
+            tmp = tempfile.mkdtemp(prefix="bench_")
+            try:
+                copia = os.path.join(tmp, "bench.db")
+                shutil.copyfile(origem, copia)
+                db.use_database(copia)
+                db.init_db()
+                _completar("EXERCICIO", _SQL_EXERCICIOS, tamanho)
+                _completar("PLANO", _SQL_PLANOS, tamanho)
+                get_cache().clear()
+                for t in telas:
+                    atual = {}
+
+                    def preparar():
+                        atual.clear()
+                        gc.collect()  # árvore do render anterior (pais e filhos se referenciam)
+                        atual["page"], atual["conn"] = _pagina(loop)
+
+                    min_reps, aquecimento = _repeticoes(tamanho)
+                    tempos = medir(lambda: t.mostrar(atual["page"]), preparar=preparar, tempo=tempo,
+                                   min_reps=min_reps, aquecimento=aquecimento)
+                    conn = atual["conn"]
+                    m = resumir(SUITE, t.nome, t.nome, tamanho, tempos,
+                                controles=conn.controles, payload_kb=round(conn.bytes / 1024, 1))
+                    medidas.append(m)
+                    if log:
+                        log(m)
+                    atual.clear()
+                    gc.collect()
+            finally:
+                db.use_database(anterior)
+                shutil.rmtree(tmp, ignore_errors=True)
+    finally:
+        loop.close()
+    return medidas
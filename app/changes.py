@@ -0,0 +1,96 @@
+"""Feed de alterações: "a tabela X mudou desde a versão N?" em tempo constante.
+
+Cada tabela de ``TABELAS_VERSIONADAS`` tem um contador ``STATS.VERSAO`` que
+os gatilhos da migração 008 incrementam a cada linha inserida, alterada ou
+apagada. Para não ler STATS a cada pergunta, o feed guarda os contadores e
+só os relê quando ``PRAGMA data_version`` da sua conexão muda, o que o
+SQLite garante acontecer a cada commit de qualquer outra conexão (inclusive
+de outro processo). Todas as gravações do app passam pela thread de escrita,
+então nenhuma escapa do feed.
+
+Uso típico num cache::
+
+    marca = changes.snapshot("PLANO", "PLANO_EXERCICIO")
+    ...
+    if changes.changed(marca):
+        recarregar()
+"""
+import threading
+
+from app import db
+
+_SQL_VERSOES = "SELECT TABELA, VERSAO FROM STATS"
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self._data_version = None
+        self._versoes = {}
+
+    def _atualizar(self):
+        # Chamado com o lock: um PRAGMA barato; STATS só é relida quando houve commit
+        if self._conn is None:
+            self._conn = db.get_conn()
+        dv = self._conn.execute("PRAGMA data_version;").fetchone()[0]
+        if dv != self._data_version:
+            self._versoes = dict(self._conn.execute(_SQL_VERSOES).fetchall())
+            self._data_version = dv
+        return self._versoes
+
+    def version(self, tabela):
+        """Versão atual de ``tabela`` (0 se a tabela não é versionada)."""
+        with self._lock:
+            return self._atualizar().get(tabela, 0)
+
+    def snapshot(self, *tabelas):
+        """Tupla com as versões atuais das tabelas pedidas, para guardar junto do dado em cache."""
+        with self._lock:
+            versoes = self._atualizar()
+            return tuple((t, versoes.get(t, 0)) for t in tabelas)
+
+    def changed(self, snapshot):
+        """True se alguma tabela de ``snapshot`` mudou desde que ele foi tirado."""
+        with self._lock:
+            versoes = self._atualizar()
+            return any(versoes.get(t, 0) != v for t, v in snapshot)
+
+    def changed_since(self, tabela, versao):
+        return self.version(tabela) != versao
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._data_version = None
+            self._versoes = {}
+
+
+_feed = ChangeFeed()
+
+
+def get_feed():
+    return _feed
+
+
+def version(tabela):
+    return _feed.version(tabela)
+
+
+def snapshot(*tabelas):
+    return _feed.snapshot(*tabelas)
+
+
+def changed(marca):
+    return _feed.changed(marca)
+
+
+def changed_since(tabela, versao):
+    return _feed.changed_since(tabela, versao)
+
+
+@db.on_database_change
+def _fechar():
+    _feed.close()
@@ -0,0 +1,308 @@
+"""Ferramentas de linha de comando do app: ``python -m app <comando>``."""
+import argparse
+import importlib
+import os
+import sqlite3
+import sys
+
+from app import db
+from app.config import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH, BACKUP_DIR, BACKUP_KEEP, BENCH_TIME, BENCH_TOLERANCE, DATAGEN_SEED, DB_TRACE_DUMP, EXPORT_BATCH_SIZE,
+    IMPORT_CHUNK_SIZE, MAINT_VACUUM_PAGES, PURGE_BATCH,
+)
+
+
+def _cmd_advisor(args):
+    from app.advisor import report
+
+    db.init_db()
+    with db.connection() as conn:
+        problems, lines = report(conn, min_rows=args.min_rows)
+    for line in lines:
+        print(line)
+    return 1 if problems else 0
+
+
+def _cmd_importar(args):
+    from app.importer import import_csv, summary
+
+    db.init_db()
+
+    def progresso(lidas, inseridas, erros):
+        print(f"[IMPORT] {lidas} lidas, {inseridas} gravadas, {erros} com erro", flush=True)
+
+    try:
+        result = import_csv(args.arquivo, args.tipo, chunk_size=args.chunk, encoding=args.encoding, progress=progresso)
+    except (OSError, UnicodeDecodeError, ValueError) as ex:
+        print(f"[ERRO] {ex}", file=sys.stderr)
+        return 2
+    for linha, msg in result.erros:
+        print(f"linha {linha}: {msg}")
+    if result.total_erros > len(result.erros):
+        print(f"... mais {result.total_erros - len(result.erros)} erros")
+    print(summary(result))
+    return 1 if result.total_erros else 0
+
+
+def _cmd_exportar(args):
+    from app.exporter import export_sessions, summary
+
+    db.init_db()
+    compress = True if args.gzip else None
+    try:
+        result = export_sessions(args.arquivo, fmt=args.formato, compress=compress, text=args.aluno or "",
+                                 batch_size=args.batch)
+    except (OSError, ValueError) as ex:
+        print(f"[ERRO] {ex}", file=sys.stderr)
+        return 2
+    print(summary(result))
+    return 0
+
+
+def _cmd_arquivar(args):
+    from app.archive import archive_sessions, archive_path, default_cutoff
+
+    antes = args.antes or default_cutoff()
+    if args.dias is not None:
+        from datetime import date, timedelta
+        antes = (date.today() - timedelta(days=args.dias)).isoformat()
+    try:
+        movidas = archive_sessions(antes, batch=args.lote)
+    except ValueError as ex:
+        print(f"[ERRO] {ex}", file=sys.stderr)
+        return 2
+    if not movidas:
+        print(f"Nenhuma sessão anterior a {antes}.")
+    for ano, n in sorted(movidas.items()):
+        print(f"{ano}: {n} sessões -> {archive_path(ano)}")
+    return 0
+
+
+def _cmd_backup(args):
+    from app.backup import backup_now
+
+    db.init_db()
+    try:
+        result = backup_now(args.destino, keep=args.manter)
+    except (OSError, RuntimeError, sqlite3.Error) as ex:
+        print(f"[ERRO] {ex}", file=sys.stderr)
+        return 2
+    print(f"{result.caminho}: {result.paginas} páginas em {result.segundos:.2f}s, quick_check {result.verificado}")
+    for path in result.removidos:
+        print(f"removido (rotação): {path}")
+    return 0
+
+
+def _cmd_manutencao(args):
+    db.init_db()
+    if args.historico:
+        for data, tarefa, alvo, linhas, segundos in db.maintenance_history(args.historico):
+            print(f"{data}  {tarefa:<18} {alvo or '-':<16} {'-' if linhas is None else linhas:>10}  {segundos * 1000:8.1f} ms")
+        return 0
+    for t in db.run_maintenance(vacuum_pages=args.paginas):
+        print(f"{t.tarefa:<18} {t.alvo or '-':<16} {'-' if t.linhas is None else t.linhas:>10}  {t.segundos * 1000:8.1f} ms")
+    return 0
+
+
+def _cmd_consultas(args):
+    import json
+
+    try:
+        with open(args.arquivo, encoding="utf-8") as fh:
+            dados = json.load(fh)
+    except (OSError, ValueError) as ex:
+        print(f"[ERRO] {ex}", file=sys.stderr)
+        return 2
+    consultas = dados["consultas"][: args.top]
+    print(f"Relatório de {dados['gerado_em']} ({len(dados['consultas'])} statements)")
+    print(f"{'chamadas':>9} {'linhas':>9} {'total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'máx':>8}  statement")
+    for q in consultas:
+        print(
+            f"{q['calls']:>9} {q['rows']:>9} {q['total_ms']:>10.1f} {q['p50_ms']:>8.2f} {q['p95_ms']:>8.2f} "
+            f"{q['p99_ms']:>8.2f} {q['max_ms']:>8.1f}  {q['sql'][:100]}"
+        )
+        print(f"{'':>66}  <- {', '.join(q['callers'][:3])}")
+    if "cache" in dados:
+        print("Cache de consultas: " + ", ".join(f"{k}={v}" for k, v in dados["cache"].items()))
+    return 0
+
+
+def _cmd_purgar(args):
+    from app.purge import pending, purge_pending
+
+    db.init_db()
+    pendentes = pending()
+    if not pendentes:
+        print("Nada a purgar.")
+        return 0
+    print(f"{len(pendentes)} exclusões pendentes")
+
+    def progresso(tabela, chave, n):
+        if n:
+            print(f"  {tabela} {chave}: {n} sessões apagadas", flush=True)
+
+    removidos = purge_pending(batch=args.lote, progress=progresso)
+    print(", ".join(f"{t}: {n}" for t, n in removidos.items()))
+    return 0
+
+
+def _cmd_progressao(args):
+    from app.archive import rebuild_progression
+
+    if args.reconstruir:
+        print(f"PROGRESSAO reconstruída: {rebuild_progression()} linhas")
+        return 0
+    db.init_db()
+    with db.connection() as conn:
+        linhas, alunos = conn.execute("SELECT COUNT(*), COUNT(DISTINCT ID_ALUNO) FROM PROGRESSAO").fetchone()
+    print(f"PROGRESSAO: {linhas} linhas de {alunos} alunos")
+    return 0
+
+
+def _cmd_gerar(args):
+    from app.datagen import generate, summary
+
+    def progresso(tabela, linhas):
+        print(f"[GERAR] {tabela}: {linhas:,}", flush=True)
+
+    try:
+        result = generate(
+            args.destino, alunos=args.alunos, sessoes=args.sessoes, exercicios=args.exercicios, planos=args.planos,
+            anos=args.anos, max_itens=args.max_itens, seed=args.semente, ate=args.ate, replace=args.substituir,
+            progress=progresso,
+        )
+    except (OSError, ValueError) as ex:
+        print(f"[ERRO] {ex}", file=sys.stderr)
+        return 2
+    print(summary(result))
+    return 0
+
+
+def _cmd_bench(args):
+    from app import bench
+
+    suite = importlib.import_module(f"app.bench.{args.suite}")
+    tamanhos = [int(t) for t in args.tamanhos.split(",")] if args.tamanhos else list(suite.TAMANHOS)
+    medidas = suite.run(
+        tamanhos, filtro=args.casos, tempo=args.tempo, progress=bench.progresso_padrao,
+        log=lambda m: print(bench.tabela([m], suite.EXTRAS)[0], flush=True),
+    )
+    if not medidas:
+        print("Nenhum caso selecionado.")
+        return 2
+    parametros = {"tamanhos": tamanhos, "tempo": args.tempo, "casos": args.casos}
+    print(f"Resultados em {bench.salvar(args.saida or bench.caminho_padrao(args.suite), args.suite, medidas, parametros)}")
+    fora = bench.acima_do_alvo(medidas)
+    for m in fora:
+        print(f"[ALVO] {m.caso} ({m.tamanho}): p95 {m.p95_ms:.3f} ms > {m.extras['alvo_ms']} ms")
+
+    baseline = args.baseline or bench.caminho_padrao(args.suite, baseline=True)
+    if args.gravar_baseline:
+        print(f"Baseline gravado em {bench.salvar(baseline, args.suite, medidas, parametros)}")
+        return 1 if fora else 0
+    if not os.path.exists(baseline):
+        print(f"Sem baseline em {baseline}; grave um com --gravar-baseline.")
+        return 1 if fora else 0
+    base = bench.carregar(baseline)
+    print(f"\nComparação com {baseline} ({base.get('gerado_em')}, commit {base['ambiente'].get('commit')}):")
+    for campo, (antes, agora) in bench.diferencas_ambiente(base).items():
+        print(f"  [aviso] {campo} mudou: {antes} -> {agora}")
+    comparacoes = bench.comparar(medidas, base, tolerancia=args.tolerancia)
+    for linha in bench.tabela_comparacao(comparacoes):
+        print(linha)
+    regressoes = [c for c in comparacoes if c.status == "regressão"]
+    print(f"{len(regressoes)} regressões (tolerância {args.tolerancia:.0%})")
+    return 1 if regressoes or fora else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m app", description="Ferramentas do Checklist de Treino")
+    parser.add_argument("--db", help="arquivo do banco (padrão: bd/academia.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("advisor", help="EXPLAIN QUERY PLAN das consultas das telas e FKs sem índice")
+    p.add_argument("--min-rows", type=int, default=5000, help="tamanho mínimo de tabela para apontar SCAN")
+    p.set_defaults(func=_cmd_advisor)
+
+    p = sub.add_parser("importar", help="importa alunos ou exercícios de um CSV")
+    p.add_argument("tipo", choices=["alunos", "exercicios"])
+    p.add_argument("arquivo", help="CSV com cabeçalho (alunos: nome, data_nasc, altura_m, peso_kg; exercicios: nome, grupo)")
+    p.add_argument("--chunk", type=int, default=IMPORT_CHUNK_SIZE, help="linhas por transação")
+    p.add_argument("--encoding", default="utf-8-sig", help="codificação do arquivo (ex.: cp1252 para CSV do Excel)")
+    p.set_defaults(func=_cmd_importar)
+
+    p = sub.add_parser("exportar", help="exporta o histórico de sessões (com itens) em CSV ou JSON Lines")
+    p.add_argument("arquivo", help="destino; formato pela extensão (.csv, .jsonl, + .gz para compactar)")
+    p.add_argument("--formato", choices=["csv", "jsonl"], help="força o formato em vez de deduzir da extensão")
+    p.add_argument("--gzip", action="store_true", help="compacta com gzip mesmo sem extensão .gz")
+    p.add_argument("--aluno", help="exporta só sessões de alunos que casam com este nome")
+    p.add_argument("--batch", type=int, default=EXPORT_BATCH_SIZE, help="linhas por fetchmany")
+    p.set_defaults(func=_cmd_exportar)
+
+    p = sub.add_parser("gerar", help="cria um banco sintético grande para testes de carga")
+    p.add_argument("destino", help="arquivo do banco a criar (ex.: bd/carga_100k.db)")
+    p.add_argument("--alunos", type=int, default=1000, help="quantidade de alunos (1k a 1M)")
+    p.add_argument("--sessoes", type=float, default=24, help="média de sessões por aluno ativo")
+    p.add_argument("--exercicios", type=int, default=60, help="tamanho do catálogo de exercícios")
+    p.add_argument("--planos", type=int, help="quantidade de planos (padrão: 1 a cada 50 alunos, mínimo 10)")
+    p.add_argument("--anos", type=float, default=3, help="anos de histórico até --ate")
+    p.add_argument("--max-itens", type=int, default=50_000_000, help="teto de itens de sessão")
+    p.add_argument("--semente", type=int, default=DATAGEN_SEED, help="semente do gerador")
+    p.add_argument("--ate", help="data da sessão mais recente, AAAA-MM-DD (padrão: hoje)")
+    p.add_argument("--substituir", action="store_true", help="apaga o destino se ele já existir")
+    p.set_defaults(func=_cmd_gerar)
+
+    p = sub.add_parser("bench", help="benchmark das consultas e das telas, com comparação ao baseline")
+    p.add_argument("suite", choices=["db", "ui"],
+                   help="db: consultas e gravações dos repositórios; ui: primeiro render de cada tela (sem cliente)")
+    p.add_argument("--tamanhos", help="linhas nos bancos sintéticos (alunos), separadas por vírgula (ex.: 1000,10000,100000)")
+    p.add_argument("--casos", help="só os casos cujo nome contém este trecho, ou desta tela (ex.: relatorios)")
+    p.add_argument("--tempo", type=float, default=BENCH_TIME, help="segundos medindo cada caso")
+    p.add_argument("--saida", help="arquivo JSON de resultados (padrão: bd/bench/<suite>.json)")
+    p.add_argument("--baseline", help="baseline para comparar (padrão: bd/bench/<suite>_baseline.json)")
+    p.add_argument("--gravar-baseline", action="store_true", help="grava estes resultados como o novo baseline")
+    p.add_argument("--tolerancia", type=float, default=BENCH_TOLERANCE, help="piora relativa aceita (0.2 = 20%%)")
+    p.set_defaults(func=_cmd_bench)
+
+    p = sub.add_parser("arquivar", help="move sessões antigas para bd/arquivo_AAAA.db")
+    g = p.add_mutually_exclusive_group()
+    g.add_argument("--antes", help="arquiva sessões anteriores a esta data (AAAA-MM-DD)")
+    g.add_argument("--dias", type=int, help=f"arquiva sessões com mais de N dias (padrão: {ARCHIVE_AFTER_DAYS})")
+    p.add_argument("--lote", type=int, default=ARCHIVE_BATCH, help="sessões por transação")
+    p.set_defaults(func=_cmd_arquivar)
+
+    p = sub.add_parser("purgar", help="apaga de vez alunos, planos e exercícios excluídos (e suas sessões)")
+    p.add_argument("--lote", type=int, default=PURGE_BATCH, help="sessões por transação")
+    p.set_defaults(func=_cmd_purgar)
+
+    p = sub.add_parser("progressao", help="resumo da tabela de progressão de carga")
+    p.add_argument("--reconstruir", action="store_true", help="refaz a tabela a partir do banco e do arquivo morto")
+    p.set_defaults(func=_cmd_progressao)
+
+    p = sub.add_parser("backup", help="backup online do banco, verificado com quick_check")
+    p.add_argument("--destino", default=BACKUP_DIR, help="pasta dos backups")
+    p.add_argument("--manter", type=int, default=BACKUP_KEEP, help="quantos backups manter")
+    p.set_defaults(func=_cmd_backup)
+
+    p = sub.add_parser("manutencao", help="optimize, ANALYZE, incremental_vacuum e checkpoint agora")
+    p.add_argument("--paginas", type=int, default=MAINT_VACUUM_PAGES, help="máximo de páginas do incremental_vacuum")
+    p.add_argument("--historico", type=int, metavar="N", help="só mostra as últimas N tarefas registradas")
+    p.set_defaults(func=_cmd_manutencao)
+
+    p = sub.add_parser("consultas", help="mostra o relatório p50/p95/p99 gravado pelo app")
+    p.add_argument("arquivo", nargs="?", default=DB_TRACE_DUMP, help="JSON gravado ao sair ou com SIGUSR1")
+    p.add_argument("--top", type=int, default=20, help="statements mostrados (maior tempo total primeiro)")
+    p.set_defaults(func=_cmd_consultas)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.use_database(args.db)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,104 @@ DB_DIR = os.path.join(BASE_DIR, "bd")
 DB_PATH = os.path.join(DB_DIR, "academia.db")
 os.makedirs(DB_DIR, exist_ok=True)
 
+# Pool de conexões do processo (compartilhado por todas as sessões/páginas)
+DB_POOL_SIZE = 4
+DB_POOL_TIMEOUT = 10.0   # segundos aguardando uma conexão livre
+DB_LEAK_SECONDS = 30.0   # checkout mais longo que isso é reportado como vazamento
+DB_CACHED_STATEMENTS = 256  # statements preparados mantidos por conexão (SQL dos repositórios)
+DB_ASYNC_WORKERS = 8     # threads que atendem as chamadas assíncronas das telas
+# Instrumentação das consultas (app/tracing.py); ACADEMIA_DB_TRACE=0 desliga
+DB_TRACE = os.environ.get("ACADEMIA_DB_TRACE", "1") != "0"
+DB_SLOW_MS = float(os.environ.get("ACADEMIA_DB_SLOW_MS", "100"))  # acima disso vai para o log de lentas
+DB_SLOW_LOG = os.path.join(DB_DIR, "consultas_lentas.log")
+DB_TRACE_DUMP = os.path.join(DB_DIR, "consultas.json")  # relatório p50/p95/p99 gravado ao sair ou com SIGUSR1
+QUERY_CACHE_ENTRIES = 256  # resultados guardados pelo cache de consultas (app/repo/cache.py)
+QUERY_CACHE_ROWS = 20000   # total de linhas em cache; 0 desliga
+SEARCH_LIMIT = 100       # máximo de resultados de uma busca por nome (FTS)
+SEARCH_RANK_WINDOW = 500  # casamentos por palavra inteira ordenados por relevância (bm25) numa busca
+REPORT_PAGE_SIZE = 50    # sessões por página no relatório (rolagem infinita)
+ALUNO_PAGE_SIZE = 50     # alunos buscados por vez na lista da tela de alunos (rolagem nos dois sentidos)
+ALUNO_LIST_WINDOW = 150  # linhas montadas na lista; as que saem da janela são buscadas de novo ao voltar
+IMPORT_CHUNK_SIZE = 5000  # linhas de CSV por executemany/transação na importação
+IMPORT_DIR = os.path.join(BASE_DIR, "imports")  # modo web: CSVs enviados pela tela e únicos que ela importa
+EXPORT_BATCH_SIZE = 2000  # linhas por fetchmany na exportação do histórico
+EXPORT_DIR = os.path.join(BASE_DIR, "exports")  # destino padrão das exportações feitas pelo app
+
+# Arquivo morto: sessões mais antigas que isso saem do banco principal para bd/arquivo_AAAA.db
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ACADEMIA_ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_BATCH = 2000      # sessões movidas por transação
+
+# Exclusão lógica: o purgador apaga dependentes em lotes, fora da tela
+PURGE_BATCH = 500           # sessões apagadas por transação
+PURGE_PAUSE = 0.02          # pausa entre lotes (s), abre espaço para as gravações dos usuários
+PURGE_INTERVAL_SECONDS = 300  # varredura periódica (exclusões de outros processos/execuções)
+
+# Backup online (Connection.backup em passos, sem parar o app)
+BACKUP_DIR = os.path.join(BASE_DIR, "backups")
+BACKUP_INTERVAL_HOURS = float(os.environ.get("ACADEMIA_BACKUP_HOURS", "24"))  # 0 desliga o agendamento
+BACKUP_KEEP = 7             # backups mantidos; os mais antigos são apagados
+BACKUP_PAGES_PER_STEP = 512  # páginas copiadas por passo
+BACKUP_STEP_SLEEP = 0.05    # pausa entre passos (s), deixa o disco livre para as gravações
+
+# Manutenção automática (optimize, ANALYZE, incremental_vacuum, checkpoint) quando o app está ocioso
+MAINT_INTERVAL_MINUTES = float(os.environ.get("ACADEMIA_MAINT_MINUTES", "60"))  # 0 desliga
+MAINT_IDLE_SECONDS = 30       # sem gravações há pelo menos isso para rodar
+MAINT_ANALYZE_DRIFT = 0.10    # reanalisa a tabela quando a contagem varia mais que 10%
+MAINT_ANALYSIS_LIMIT = 1000   # PRAGMA analysis_limit: ANALYZE por amostragem em tabelas grandes
+MAINT_VACUUM_PAGES = 2000     # páginas devolvidas ao sistema por execução (lock de escrita curto)
+MAINT_LOG_KEEP_DAYS = 90      # histórico mantido na tabela MANUTENCAO
+
+# Telas com carregamento assíncrono (não bloqueiam o event loop do Flet).
+# ACADEMIA_ASYNC_VIEWS=0 volta para as versões síncronas.
+ASYNC_VIEWS = os.environ.get("ACADEMIA_ASYNC_VIEWS", "1") != "0"
+
+# Thread única de escrita: agrupa gravações de vários clientes numa transação
+WRITER_BATCH_MAX = 64     # jobs por transação
+WRITER_MAX_WAIT_MS = 2    # espera extra por mais jobs antes de gravar o lote
+
+# Gerador de dados sintéticos (app/datagen.py, "python -m app gerar")
+DATAGEN_SEED = 20240101   # semente padrão: mesma semente + mesmos parâmetros = mesmo banco
+DATAGEN_BATCH = 100000    # linhas (alunos + itens) por transação na carga
+
+# Benchmarks (app/bench, "python -m app bench"): bancos sintéticos e resultados ficam em BENCH_DIR
+BENCH_DIR = os.path.join(DB_DIR, "bench")
+BENCH_SEED = 7            # semente dos bancos sintéticos e das amostras de IDs
+BENCH_DATE = "2025-06-30"  # "hoje" dos bancos sintéticos: mesma data = mesmos dados
+BENCH_TIME = 1.0          # segundos medindo cada caso (mínimo de 5 repetições)
+BENCH_TOLERANCE = 0.20    # mediana 20% acima do baseline = regressão
+BENCH_MIN_DIFF_MS = 0.05  # diferenças menores que isso são ruído
+
+# Perfis de desempenho do SQLite, aplicados em toda conexão aberta pelo app.
+# Escolha com a variável de ambiente ACADEMIA_DB_PROFILE (padrão: desktop).
+# cache_size negativo = KiB; mmap_size em bytes; busy_timeout em ms.
+DB_PROFILES = {
+    "desktop": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,        # ~32 MB por conexão
+        "mmap_size": 134217728,      # 128 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "lan-server": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,        # ~64 MB por conexão
+        "mmap_size": 268435456,      # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 15000,       # vários celulares gravando ao mesmo tempo
+    },
+    "low-memory-android": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -4096,         # ~4 MB por conexão
+        "mmap_size": 0,              # sem mmap: memória do aparelho é escassa
+        "temp_store": "FILE",
+        "busy_timeout": 5000,
+    },
+}
+DB_PROFILE = os.environ.get("ACADEMIA_DB_PROFILE", "desktop")
+
 
 # Paleta de cores do Tema Gym
 class GymColors:
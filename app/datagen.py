@@ -0,0 +1,282 @@
+"""Gerador determinístico de dados sintéticos para testes de carga e escala.
+
+Cria um banco novo com o schema do app (todas as migrações) e o enche com
+alunos, exercícios, planos e o histórico de sessões em escala configurável,
+de mil a um milhão de alunos e dezenas de milhões de itens. A mesma semente
+com os mesmos parâmetros (inclusive ``ate``) gera sempre o mesmo banco.
+
+Distribuições, pensadas para parecer uma academia de verdade:
+
+- idade concentrada entre 20 e 35 anos; altura e IMC normais, ~8% sem medida;
+- planos de 4 a 8 exercícios de 1 a 3 grupos; cada aluno segue de 1 a 3;
+- sessões por aluno exponenciais em torno de ``sessoes`` (poucos alunos
+  assíduos, muitos eventuais, ~15% que nunca treinaram), a cada 1 a 7 dias
+  a partir da matrícula;
+- carga por aluno/exercício com progressão lenta e ruído, arredondada em
+  0,5 kg; exercícios de core sem peso; ~10% dos itens não feitos.
+
+Gravação em modo de carga: conexão própria com ``journal_mode = OFF`` e
+``synchronous = OFF``, índices secundários e gatilhos removidos durante a
+carga e recriados no fim, seguidos de FTS, STATS, PROGRESSAO e ``ANALYZE``.
+O banco resultante é um banco normal do app (``--db`` na CLI).
+"""
+import os
+import random
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+from app import db
+from app.config import DATAGEN_BATCH, DATAGEN_SEED
+from app.migrations import TABELAS_EXCLUSAO_LOGICA, TABELAS_VERSIONADAS
+from app.repo import progressao
+
+GenResult = namedtuple("GenResult", "caminho alunos exercicios planos sessoes itens segundos")
+
+# Tabelas carregadas: índices secundários e gatilhos delas saem durante a carga
+_TABELAS = ("ALUNO", "EXERCICIO", "PLANO", "PLANO_EXERCICIO", "SESSAO", "SESSAO_ITEM")
+
+_NOMES = (
+    "Ana", "Beatriz", "Bruna", "Camila", "Carla", "Daniela", "Fernanda", "Gabriela", "Isabela", "Juliana",
+    "Larissa", "Letícia", "Mariana", "Natália", "Patrícia", "Rafaela", "Sofia", "Tatiane", "Vanessa", "Yasmin",
+    "André", "Bruno", "Carlos", "Daniel", "Eduardo", "Felipe", "Gabriel", "Gustavo", "Henrique", "João",
+    "José", "Leonardo", "Lucas", "Marcelo", "Mateus", "Pedro", "Rafael", "Rodrigo", "Thiago", "Vinícius",
+)
+_SOBRENOMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+    "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques", "Machado", "Mendes", "Freitas",
+    "Cardoso", "Ramos", "Gonçalves", "Santana", "Teixeira", "Araújo", "Pinto", "Correia", "Moura", "Cavalcanti",
+)
+# Exercícios além do seed da migração 002, por grupo
+_EXERCICIOS = {
+    "Peito": ("Supino inclinado", "Supino declinado", "Crossover", "Peck deck", "Flexão de braço"),
+    "Costas": ("Remada baixa", "Remada unilateral", "Puxada supinada", "Pulldown", "Levantamento terra"),
+    "Pernas": ("Cadeira extensora", "Mesa flexora", "Stiff", "Afundo", "Agachamento búlgaro",
+               "Panturrilha em pé", "Cadeira abdutora", "Elevação pélvica"),
+    "Ombros": ("Desenvolvimento Arnold", "Elevação frontal", "Crucifixo invertido", "Encolhimento"),
+    "Bíceps": ("Rosca alternada", "Rosca martelo", "Rosca Scott", "Rosca concentrada"),
+    "Tríceps": ("Tríceps testa", "Tríceps francês", "Mergulho no banco", "Tríceps coice"),
+    "Core": ("Prancha", "Abdominal oblíquo", "Abdominal supra", "Elevação de pernas"),
+}
+_EQUIPAMENTOS = ("halteres", "barra", "máquina", "cabo", "smith")
+# Carga típica (kg) de um aluno mediano em cada grupo; core é feito sem peso
+_CARGA_BASE = {"Peito": 30.0, "Costas": 35.0, "Pernas": 55.0, "Ombros": 12.0, "Bíceps": 10.0, "Tríceps": 14.0}
+_FOCOS = ("Peito e Tríceps", "Costas e Bíceps", "Pernas", "Ombros e Core", "Full body", "Superiores", "Inferiores")
+_OBS = ("aumentar carga", "dor no ombro", "cansado", "ótimo treino", "reduzir peso", "amplitude curta")
+
+_SQL_ALUNO = "INSERT INTO ALUNO (ID_ALUNO, NOME, DATA_NASC, ALTURA_M, PESO_KG) VALUES (?,?,?,?,?)"
+_SQL_EXERCICIO = "INSERT INTO EXERCICIO (ID_EXERCICIO, NOME, GRUPO) VALUES (?,?,?)"
+_SQL_PLANO = "INSERT INTO PLANO (ID_PLANO, NOME) VALUES (?,?)"
+_SQL_PLANO_EXERCICIO = "INSERT INTO PLANO_EXERCICIO (ID_PLANO, ID_EXERCICIO, ORDEM, SERIES, REPS) VALUES (?,?,?,?,?)"
+_SQL_SESSAO = "INSERT INTO SESSAO (ID_SESSAO, ID_ALUNO, ID_PLANO, DATA_SESSAO) VALUES (?,?,?,?)"
+_SQL_ITEM = (
+    "INSERT INTO SESSAO_ITEM (ID_ITEM, ID_SESSAO, ID_EXERCICIO, FEITO, SERIES_FEITAS, REPS_MEDIA, PESO_MEDIA, OBS) "
+    "VALUES (?,?,?,?,?,?,?,?)"
+)
+
+
+def _carga(conn):
+    # Sem journal nem fsync: se a carga cair no meio, o arquivo é descartado e gerado de novo
+    for pragma in ("journal_mode = OFF", "synchronous = OFF", "locking_mode = EXCLUSIVE",
+                   "cache_size = -262144", "foreign_keys = OFF"):
+        conn.execute(f"PRAGMA {pragma};")
+
+
+def _remover_auxiliares(conn):
+    """Remove índices secundários e gatilhos das tabelas carregadas; devolve o SQL para recriá-los."""
+    marcas = ",".join("?" * len(_TABELAS))
+    objetos = conn.execute(
+        f"SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+        f"AND tbl_name IN ({marcas}) AND sql IS NOT NULL", _TABELAS,
+    ).fetchall()
+    for tipo, nome, _sql in objetos:
+        conn.execute(f"DROP {tipo.upper()} {nome};")
+    return [sql for _tipo, _nome, sql in objetos]
+
+
+def _recriar_auxiliares(conn, objetos):
+    for sql in objetos:
+        conn.execute(sql)
+    for fts in ("ALUNO_FTS", "EXERCICIO_FTS"):
+        conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild');")
+    for tabela in TABELAS_VERSIONADAS:
+        ativos = " WHERE DELETADO = 0" if tabela in TABELAS_EXCLUSAO_LOGICA else ""
+        conn.execute(
+            f"UPDATE STATS SET TOTAL = (SELECT COUNT(*) FROM {tabela}{ativos}), VERSAO = VERSAO + 1 "
+            f"WHERE TABELA = ?", (tabela,),
+        )
+
+
+class _Gerador:
+    def __init__(self, seed, ate, anos, max_itens):
+        self.rng = random.Random(seed)
+        self.max_itens = max_itens
+        self.ate = ate
+        self.inicio = ate - timedelta(days=int(365 * anos))
+
+    def aluno(self, id_aluno):
+        rng = self.rng
+        nome = f"{rng.choice(_NOMES)} {rng.choice(_SOBRENOMES)} {rng.choice(_SOBRENOMES)}"
+        idade = rng.triangular(15, 75, 24)
+        nasc = self.ate - timedelta(days=int(idade * 365.25))
+        altura = peso = None
+        if rng.random() >= 0.08:
+            altura = round(min(2.05, max(1.45, rng.gauss(1.70, 0.09))), 2)
+            peso = round(min(45.0, max(17.0, rng.gauss(25.0, 4.0))) * altura * altura, 1)
+        return (id_aluno, nome, nasc.isoformat(), altura, peso)
+
+    def exercicios(self, total):
+        """Linhas novas de EXERCICIO até chegar a ``total`` (os 11 do seed já existem)."""
+        nomes = [(n, g) for g, lista in _EXERCICIOS.items() for n in lista]
+        extras = [(f"{n} ({eq})", g) for eq in _EQUIPAMENTOS for n, g in nomes]
+        return [(i, n, g) for i, (n, g) in enumerate((nomes + extras)[:max(0, total - 11)], 12)]
+
+    def plano(self, id_plano, por_grupo):
+        rng = self.rng
+        grupos = rng.sample(sorted(por_grupo), rng.randint(1, 3))
+        candidatos = [e for g in grupos for e in por_grupo[g]]
+        escolhidos = rng.sample(candidatos, min(len(candidatos), rng.randint(4, 8)))
+        nome = f"Treino {'ABCDE'[id_plano % 5]} – {rng.choice(_FOCOS)} #{id_plano}"
+        itens = [(id_plano, e, ordem, rng.choice((3, 3, 4, 4, 5)), rng.choice((8, 10, 10, 12, 12, 15)))
+                 for ordem, e in enumerate(escolhidos, 1)]
+        return (id_plano, nome), itens
+
+    def historico(self, id_aluno, media, planos, forca, ids):
+        """Sessões e itens de um aluno; ``ids`` é ``[próx. sessão, próx. item]``."""
+        rng = self.rng
+        rnd = rng.random  # laço de itens: uma chamada de random() por sorteio
+        if rng.random() < 0.15:
+            return [], []
+        n = int(rng.expovariate(1.0 / media)) + 1
+        meus = rng.sample(planos, min(len(planos), rng.randint(1, 3)))
+        dias = (self.ate - self.inicio).days
+        dia = self.inicio + timedelta(days=rng.randint(0, max(0, dias - 1)))
+        sessoes, itens = [], []
+        for k in range(n):
+            id_plano, exercicios = meus[k % len(meus)]
+            if dia > self.ate or ids[1] + len(exercicios) - 1 > self.max_itens:
+                break
+            id_sessao = ids[0]
+            ids[0] += 1
+            sessoes.append((id_sessao, id_aluno, id_plano, dia.isoformat()))
+            progresso = 1.0 + 0.004 * k
+            for id_ex, series, reps, base in exercicios:
+                feito = 1 if rnd() < 0.9 else 0
+                peso = None
+                if feito and base is not None:
+                    peso = round(base * forca * progresso * (0.92 + 0.16 * rnd()) * 2) / 2
+                itens.append((
+                    ids[1], id_sessao, id_ex, feito,
+                    (series - (rnd() < 0.15)) if feito else None,
+                    max(1, reps + int(rnd() * 5) - 2) if feito else None,
+                    peso,
+                    rng.choice(_OBS) if rnd() < 0.02 else None,
+                ))
+                ids[1] += 1
+            dia += timedelta(days=rng.choice((1, 2, 2, 3, 3, 3, 4, 7)))
+        return sessoes, itens
+
+
+def generate(path, alunos=1000, sessoes=24, exercicios=60, planos=None, anos=3.0, max_itens=50_000_000,
+             seed=DATAGEN_SEED, ate=None, replace=False, batch=DATAGEN_BATCH, progress=None):
+    """Gera um banco sintético em ``path`` e devolve um ``GenResult``.
+
+    ``sessoes`` é a média de sessões por aluno que treina; ``planos`` padrão
+    é um plano para cada 50 alunos (mínimo 10). A geração para ao atingir
+    ``max_itens`` itens de sessão. ``ate`` (``date`` ou AAAA-MM-DD, padrão
+    hoje) é o dia mais recente do histórico. ``progress(tabela, linhas)`` é
+    chamado a cada bloco gravado.
+    """
+    if alunos < 1:
+        raise ValueError("alunos deve ser pelo menos 1")
+    ate = date.fromisoformat(ate) if isinstance(ate, str) else (ate or date.today())
+    planos = planos or max(10, alunos // 50)
+    if os.path.exists(path):
+        if not replace:
+            raise FileExistsError(f"{path} já existe (use replace=True / --substituir)")
+        for sufixo in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + sufixo):
+                os.remove(path + sufixo)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    inicio = time.perf_counter()
+
+    # Schema pelas migrações do app, como num banco novo de verdade
+    anterior = db.DB_PATH
+    db.use_database(path)
+    try:
+        db.init_db()
+    finally:
+        db.use_database(anterior)
+
+    gen = _Gerador(seed, ate, anos, max_itens)
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        _carga(conn)
+        conn.execute("BEGIN")
+        objetos = _remover_auxiliares(conn)
+
+        conn.executemany(_SQL_EXERCICIO, gen.exercicios(exercicios))
+        catalogo = conn.execute("SELECT ID_EXERCICIO, GRUPO FROM EXERCICIO ORDER BY ID_EXERCICIO").fetchall()
+        por_grupo = {}
+        for id_ex, grupo in catalogo:
+            por_grupo.setdefault(grupo, []).append(id_ex)
+        fator = {id_ex: gen.rng.uniform(0.6, 1.6) for id_ex, _ in catalogo}
+        grupo_de = dict(catalogo)
+
+        lista_planos = []
+        for id_plano in range(1, planos + 1):
+            linha, itens = gen.plano(id_plano, por_grupo)
+            conn.execute(_SQL_PLANO, linha)
+            conn.executemany(_SQL_PLANO_EXERCICIO, itens)
+            base = lambda e: (_CARGA_BASE[grupo_de[e]] * fator[e]) if grupo_de[e] in _CARGA_BASE else None
+            lista_planos.append((id_plano, [(e, s, r, base(e)) for _p, e, _o, s, r in itens]))
+        if progress:
+            progress("PLANO", planos)
+
+        ids = [1, 1]
+        feitos = {"ALUNO": 0, "SESSAO": 0, "SESSAO_ITEM": 0}
+        lote_alunos, lote_sessoes, lote_itens = [], [], []
+
+        def gravar():
+            conn.executemany(_SQL_ALUNO, lote_alunos)
+            conn.executemany(_SQL_SESSAO, lote_sessoes)
+            conn.executemany(_SQL_ITEM, lote_itens)
+            feitos["ALUNO"] += len(lote_alunos)
+            feitos["SESSAO"] += len(lote_sessoes)
+            feitos["SESSAO_ITEM"] += len(lote_itens)
+            lote_alunos.clear(); lote_sessoes.clear(); lote_itens.clear()
+            conn.execute("COMMIT")
+            conn.execute("BEGIN")
+            if progress:
+                progress("SESSAO_ITEM", feitos["SESSAO_ITEM"])
+
+        for id_aluno in range(1, alunos + 1):
+            lote_alunos.append(gen.aluno(id_aluno))
+            forca = max(0.4, gen.rng.gauss(1.0, 0.25))
+            s, i = gen.historico(id_aluno, sessoes, lista_planos, forca, ids)
+            lote_sessoes.extend(s)
+            lote_itens.extend(i)
+            if len(lote_itens) + len(lote_alunos) >= batch:
+                gravar()
+        gravar()
+
+        _recriar_auxiliares(conn, objetos)
+        progressao.reconstruir(conn)
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE;")
+        # Volta ao modo do app: WAL é persistente no arquivo
+        conn.execute("PRAGMA journal_mode = WAL;")
+    finally:
+        conn.close()
+    return GenResult(path, feitos["ALUNO"], len(catalogo), planos, feitos["SESSAO"], feitos["SESSAO_ITEM"],
+                     time.perf_counter() - inicio)
+
+
+def summary(result):
+    """Resumo de uma linha para a CLI."""
+    tamanho = os.path.getsize(result.caminho) / 1e6
+    return (f"{result.alunos:,} alunos, {result.exercicios} exercícios, {result.planos:,} planos, "
+            f"{result.sessoes:,} sessões, {result.itens:,} itens em {result.segundos:.1f}s "
+            f"({tamanho:,.0f} MB) -> {result.caminho}")
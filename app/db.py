@@ -1,120 +1,646 @@
+import atexit
+import queue
 import sqlite3
-from .config import DB_PATH
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
 
+from .config import (
+    DB_PATH, DB_CACHED_STATEMENTS, DB_POOL_SIZE, DB_TRACE, DB_POOL_TIMEOUT, DB_LEAK_SECONDS, DB_PROFILE, DB_PROFILES,
+    WRITER_BATCH_MAX, WRITER_MAX_WAIT_MS,
+    MAINT_ANALYSIS_LIMIT, MAINT_ANALYZE_DRIFT, MAINT_IDLE_SECONDS, MAINT_INTERVAL_MINUTES, MAINT_LOG_KEEP_DAYS,
+    MAINT_VACUUM_PAGES,
+)
+from .migrations import LATEST_VERSION, TABELAS_CONTADAS, migrate, schema_version
+from .tracing import TracingConnection
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+# busy_timeout primeiro: trocar o journal_mode pode precisar esperar um lock
+_PRAGMA_ORDER = ("busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store")
+
+# Valores numéricos devolvidos pelo SQLite -> nomes usados nos perfis
+_PRAGMA_NAMES = {
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+}
+
+_applied_pragmas = {}
+
+
+def db_profile(name=None):
+    """Retorna (nome, pragmas) do perfil pedido; perfil desconhecido cai no desktop."""
+    name = name or DB_PROFILE
+    if name not in DB_PROFILES:
+        print(f"[DB] Perfil '{name}' desconhecido; usando 'desktop'.", flush=True)
+        name = "desktop"
+    return name, DB_PROFILES[name]
+
+
+def apply_profile(conn, name=None):
+    """Aplica os PRAGMAs do perfil em ``conn`` e devolve os valores efetivos."""
+    _name, pragmas = db_profile(name)
+    applied = {}
+    for key in _PRAGMA_ORDER:
+        if key not in pragmas:
+            continue
+        try:
+            conn.execute(f"PRAGMA {key} = {pragmas[key]};")
+            value = conn.execute(f"PRAGMA {key};").fetchone()[0]
+            applied[key] = _PRAGMA_NAMES.get(key, {}).get(value, value)
+        except sqlite3.OperationalError as ex:
+            # Ex.: banco bloqueado ao trocar para WAL; segue com o modo atual
+            applied[key] = f"erro: {ex}"
+    return applied
+
+
+def applied_pragmas():
+    """PRAGMAs efetivos da última conexão aberta (para o log de boot)."""
+    return dict(_applied_pragmas)
+
+
+def _connect():
+    conn = sqlite3.connect(
+        DB_PATH, check_same_thread=False, cached_statements=DB_CACHED_STATEMENTS,
+        factory=TracingConnection if DB_TRACE else sqlite3.Connection,
+    )
     conn.execute("PRAGMA foreign_keys = ON;")
+    applied = apply_profile(conn)
+    if applied != _applied_pragmas:
+        _applied_pragmas.clear()
+        _applied_pragmas.update(applied)
     return conn
 
 
-def init_db():
-    conn = get_conn()
-    cur = conn.cursor()
-
-    # ---- Núcleo
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS ALUNO (
-            ID_ALUNO        INTEGER PRIMARY KEY AUTOINCREMENT,
-            NOME            TEXT NOT NULL,
-            DATA_NASC       TEXT NOT NULL,
-            ALTURA_M        REAL,
-            PESO_KG         REAL
-        );
+def get_conn():
+    # Conexão avulsa, fora do pool (Gym.py legado e scripts). Quem abre fecha.
+    return _connect()
+
+
+def get_readonly_conn():
+    """Conexão avulsa só de leitura (``query_only``), para varreduras longas fora do pool. Quem abre fecha."""
+    conn = _connect()
+    conn.execute("PRAGMA query_only = ON;")
+    return conn
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Nenhuma conexão do pool ficou livre dentro do tempo limite."""
+
+
+class _Checkout:
+    __slots__ = ("thread", "since", "caller", "reported")
+
+    def __init__(self, thread, caller):
+        self.thread = thread
+        self.since = time.monotonic()
+        self.caller = caller
+        self.reported = False
+
+
+def _caller():
+    # Primeiro frame fora deste módulo e do contextlib: quem pediu a conexão
+    f = sys._getframe(1)
+    while f is not None and (f.f_code.co_filename == __file__ or f.f_code.co_filename.endswith("contextlib.py")):
+        f = f.f_back
+    if f is None:
+        return "?"
+    return f"{f.f_globals.get('__name__', '?')}:{f.f_code.co_name}:{f.f_lineno}"
+
+
+class ConnectionPool:
+    """Pool de conexões SQLite de tamanho fixo, compartilhado pelo processo.
+
+    Cada thread tenta reaproveitar a última conexão que usou (afinidade) e
+    checkouts aninhados na mesma thread recebem a mesma conexão. Conexões
+    presas por mais de ``leak_seconds`` são reportadas no console; as que
+    pertencem a threads já encerradas voltam para o pool.
     """
-    )
 
-    # Migração: adicionar coluna PESO_KG se não existir
-    try:
-        cur.execute("SELECT PESO_KG FROM ALUNO LIMIT 1")
-    except Exception:
-        # Coluna não existe, adicionar
-        cur.execute("ALTER TABLE ALUNO ADD COLUMN PESO_KG REAL")
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS EXERCICIO (
-            ID_EXERCICIO    INTEGER PRIMARY KEY AUTOINCREMENT,
-            NOME            TEXT NOT NULL,
-            GRUPO           TEXT NOT NULL
-        );
+    def __init__(self, factory, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, leak_seconds=DB_LEAK_SECONDS):
+        self._factory = factory
+        self._size = max(1, int(size))
+        self._timeout = timeout
+        self._leak_seconds = leak_seconds
+        self._cond = threading.Condition()
+        self._idle = []
+        self._all = []
+        self._out = {}
+        self._local = threading.local()
+        self._closed = False
+
+    @property
+    def size(self):
+        return self._size
+
+    def stats(self):
+        with self._cond:
+            return {"size": self._size, "open": len(self._all), "idle": len(self._idle), "in_use": len(self._out)}
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _acquire(self):
+        local = self._local
+        held = getattr(local, "held", None)
+        if held is not None:
+            local.depth += 1
+            return held
+        deadline = time.monotonic() + self._timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Pool de conexões fechado.")
+                self._check_leaks()
+                conn = self._take_idle(getattr(local, "last", None))
+                if conn is None and len(self._all) < self._size:
+                    conn = self._factory()
+                    self._all.append(conn)
+                if conn is not None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"Nenhuma conexão livre após {self._timeout:.0f}s "
+                        f"(em uso: {', '.join(c.caller for c in self._out.values())})"
+                    )
+                self._cond.wait(remaining)
+            self._out[id(conn)] = _Checkout(threading.current_thread(), _caller())
+        local.held = conn
+        local.depth = 1
+        local.last = conn
+        return conn
+
+    def _release(self, conn):
+        local = self._local
+        local.depth -= 1
+        if local.depth > 0:
+            return
+        local.held = None
+        if conn.in_transaction:
+            # Transação esquecida aberta: desfaz para não contaminar o próximo uso
+            co = self._out.get(id(conn))
+            print(f"[DB] Transação não finalizada devolvida ao pool por {co.caller if co else '?'}; rollback.", flush=True)
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+        with self._cond:
+            self._out.pop(id(conn), None)
+            if self._closed:
+                conn.close()
+                self._all = [c for c in self._all if c is not conn]
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def _take_idle(self, preferred):
+        if not self._idle:
+            return None
+        if preferred is not None:
+            for i, c in enumerate(self._idle):
+                if c is preferred:
+                    return self._idle.pop(i)
+        # LIFO: a conexão usada mais recentemente tem o cache de páginas mais quente
+        return self._idle.pop()
+
+    def _check_leaks(self):
+        # Chamado com o lock adquirido; custo proporcional ao tamanho do pool
+        now = time.monotonic()
+        for key, co in list(self._out.items()):
+            if not co.thread.is_alive():
+                conn = next((c for c in self._all if id(c) == key), None)
+                print(f"[DB] Conexão de thread encerrada ({co.caller}) recuperada pelo pool.", flush=True)
+                del self._out[key]
+                if conn is not None:
+                    try:
+                        conn.rollback()
+                    except sqlite3.Error:
+                        pass
+                    self._idle.append(conn)
+            elif not co.reported and now - co.since > self._leak_seconds:
+                co.reported = True
+                print(
+                    f"[DB] Possível vazamento: conexão em uso há {now - co.since:.0f}s "
+                    f"por {co.caller} (thread {co.thread.name})",
+                    flush=True,
+                )
+
+    def leaks(self):
+        """Lista (caller, thread, segundos) dos checkouts acima do limite de vazamento."""
+        now = time.monotonic()
+        with self._cond:
+            return [
+                (co.caller, co.thread.name, now - co.since)
+                for co in self._out.values()
+                if now - co.since > self._leak_seconds
+            ]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+            self._all = [c for c in self._all if id(c) in self._out]
+            self._cond.notify_all()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(_connect)
+    return _pool
+
+
+def connection():
+    """Empresta uma conexão do pool do processo: ``with connection() as conn: ...``"""
+    return get_pool().connection()
+
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Thread única de escrita com commit em grupo.
+
+    Jobs são funções ``fn(conn, *args)`` executadas na conexão exclusiva da
+    thread. Os jobs que chegam juntos (até ``batch_max``, esperando no máximo
+    ``max_wait`` segundos) entram na mesma transação, cada um no seu
+    SAVEPOINT: o erro de um job volta só para quem o enviou. O resultado é
+    entregue depois do COMMIT, então quem recebe já enxerga o dado gravado.
     """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS PLANO (
-            ID_PLANO        INTEGER PRIMARY KEY AUTOINCREMENT,
-            NOME            TEXT NOT NULL
-        );
+
+    def __init__(self, factory, batch_max=WRITER_BATCH_MAX, max_wait=WRITER_MAX_WAIT_MS / 1000.0):
+        self._factory = factory
+        self._batch_max = max(1, int(batch_max))
+        self._max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._jobs = 0
+        self._last_batch = time.monotonic()
+
+    def stats(self):
+        return {"batches": self._batches, "jobs": self._jobs, "pending": self._queue.qsize()}
+
+    def idle_seconds(self):
+        """Segundos desde o último lote gravado (0 se há jobs na fila)."""
+        if self._queue.qsize():
+            return 0.0
+        return time.monotonic() - self._last_batch
+
+    def submit(self, fn, *args, **kwargs):
+        fut = Future()
+        self._ensure_started()
+        self._queue.put((fut, fn, args, kwargs))
+        return fut
+
+    def run(self, fn, *args, **kwargs):
+        """Envia o job e espera o resultado (ou relança a exceção do job)."""
+        if threading.current_thread() is self._thread:
+            # Job chamando outro job: já estamos dentro da transação do lote
+            return fn(self._conn, *args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def close(self, timeout=10.0):
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        try:
+            self._conn = self._factory()
+        except Exception as ex:
+            print(f"[DB] Thread de escrita sem conexão: {ex}", flush=True)
+            self._thread = None
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+                if job is not _STOP:
+                    job[0].set_exception(ex)
+        stop = False
+        while not stop:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            batch = [job]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._batch_max:
+                try:
+                    # Primeiro drena o que já está na fila; depois espera um pouco
+                    remaining = deadline - time.monotonic()
+                    nxt = self._queue.get_nowait() if remaining <= 0 else self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._run_batch(batch)
+        self._conn.close()
+        self._conn = None
+
+    def _run_batch(self, batch):
+        conn = self._conn
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            for fut, fn, args, kwargs in batch:
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT job;")
+                try:
+                    result = fn(conn, *args, **kwargs)
+                    conn.execute("RELEASE job;")
+                    outcomes.append((fut, result, None))
+                except Exception as ex:
+                    conn.execute("ROLLBACK TO job;")
+                    conn.execute("RELEASE job;")
+                    outcomes.append((fut, None, ex))
+            conn.commit()
+        except Exception as ex:
+            # BEGIN/COMMIT falhou: nada do lote foi gravado
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            for fut, _fn, _args, _kwargs in batch:
+                if not fut.done():
+                    fut.set_exception(ex)
+            return
+        self._batches += 1
+        self._jobs += len(outcomes)
+        self._last_batch = time.monotonic()
+        for fut, result, ex in outcomes:
+            if ex is None:
+                fut.set_result(result)
+            else:
+                fut.set_exception(ex)
+
+
+_writer = None
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _pool_lock:
+            if _writer is None:
+                _writer = WriteQueue(_connect)
+    return _writer
+
+
+def write(fn, *args, **kwargs):
+    """Executa ``fn(conn, *args)`` na thread de escrita e devolve o resultado."""
+    return get_writer().run(fn, *args, **kwargs)
+
+
+@atexit.register
+def _flush_writer():
+    # Grava o que ainda estiver na fila antes do processo terminar
+    if _writer is not None:
+        _writer.close()
+
+
+_schema_version = 0
+_schema_lock = threading.Lock()
+
+
+def init_db():
+    """Leva o schema até a última migração.
+
+    Só a primeira chamada do processo toca o banco; as seguintes (uma por
+    página conectada no modo web) saem na comparação de um inteiro.
     """
+    global _schema_version
+    if _schema_version == LATEST_VERSION:
+        return
+    with _schema_lock:
+        if _schema_version == LATEST_VERSION:
+            return
+        with connection() as conn:
+            if schema_version(conn) < LATEST_VERSION:
+                for m in migrate(conn):
+                    print(f"[DB] Migração {m.version:03d} aplicada: {m.description}", flush=True)
+        _schema_version = LATEST_VERSION
+
+
+# ---- Manutenção em segundo plano
+
+Tarefa = namedtuple("Tarefa", "tarefa alvo linhas segundos")
+
+# Tabelas sem contador em STATS: são analisadas junto com a tabela-mãe
+_ANALISAR_JUNTO = {"SESSAO": ("SESSAO_ITEM",), "PLANO": ("PLANO_EXERCICIO",)}
+
+
+def _optimize(conn):
+    conn.execute("PRAGMA optimize;")
+
+
+def _tabelas_alteradas(conn, drift=MAINT_ANALYZE_DRIFT):
+    """(tabela, contagem atual) das tabelas contadas que mudaram mais que ``drift`` desde a última ANALYZE."""
+    alteradas = []
+    for tabela, total in conn.execute(
+        f"SELECT TABELA, TOTAL FROM STATS WHERE TABELA IN ({','.join('?' * len(TABELAS_CONTADAS))});",
+        TABELAS_CONTADAS,
+    ):
+        row = conn.execute(
+            "SELECT LINHAS FROM MANUTENCAO WHERE TAREFA = 'analyze' AND ALVO = ? "
+            "ORDER BY ID_MANUTENCAO DESC LIMIT 1;",
+            (tabela,),
+        ).fetchone()
+        if row is None or abs(total - row[0]) > drift * max(row[0], 1):
+            alteradas.append((tabela, total))
+    return alteradas
+
+
+def _analyze(conn, tabela, linhas=None):
+    conn.execute(f"PRAGMA analysis_limit = {int(MAINT_ANALYSIS_LIMIT)};")
+    conn.execute(f"ANALYZE {tabela};")
+    return linhas
+
+
+def _incremental_vacuum(conn, pages):
+    livres = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+    # Cada passo do statement libera uma página, mas o sqlite3 do Python só dá
+    # o primeiro: o pragma não tem colunas, então nem fetchall() o faz andar (e
+    # o statement pendente impediria o COMMIT do lote). Um execute por página,
+    # com o statement já preparado no cache, custa ~10 µs.
+    for _ in range(min(livres, int(pages))):
+        conn.execute("PRAGMA incremental_vacuum;")
+    return livres - conn.execute("PRAGMA freelist_count;").fetchone()[0]
+
+
+def _registrar(conn, tarefas):
+    conn.executemany(
+        "INSERT INTO MANUTENCAO (TAREFA, ALVO, LINHAS, SEGUNDOS) VALUES (?, ?, ?, ?);",
+        tarefas,
     )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS PLANO_EXERCICIO (
-            ID_PLANO        INTEGER NOT NULL,
-            ID_EXERCICIO    INTEGER NOT NULL,
-            ORDEM           INTEGER NOT NULL,
-            SERIES          INTEGER NOT NULL,
-            REPS            INTEGER NOT NULL,
-            PRIMARY KEY (ID_PLANO, ID_EXERCICIO),
-            FOREIGN KEY (ID_PLANO) REFERENCES PLANO(ID_PLANO) ON DELETE CASCADE,
-            FOREIGN KEY (ID_EXERCICIO) REFERENCES EXERCICIO(ID_EXERCICIO) ON DELETE RESTRICT
-        );
-    """
+    conn.execute(
+        "DELETE FROM MANUTENCAO WHERE DATA < datetime('now', 'localtime', ?) "
+        "AND ID_MANUTENCAO NOT IN (SELECT MAX(ID_MANUTENCAO) FROM MANUTENCAO WHERE TAREFA = 'analyze' GROUP BY ALVO);",
+        (f"-{int(MAINT_LOG_KEEP_DAYS)} days",),
     )
-    # ---- Sessão (treino do dia)
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS SESSAO (
-            ID_SESSAO       INTEGER PRIMARY KEY AUTOINCREMENT,
-            ID_ALUNO        INTEGER NOT NULL,
-            ID_PLANO        INTEGER NOT NULL,
-            DATA_SESSAO     TEXT NOT NULL,
-            FOREIGN KEY (ID_ALUNO) REFERENCES ALUNO(ID_ALUNO) ON DELETE CASCADE,
-            FOREIGN KEY (ID_PLANO) REFERENCES PLANO(ID_PLANO) ON DELETE CASCADE
-        );
+
+
+def checkpoint(mode="TRUNCATE"):
+    """Checkpoint do WAL numa conexão avulsa; devolve (busy, páginas no log, páginas copiadas)."""
+    conn = _connect()
+    try:
+        return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode});").fetchone())
+    finally:
+        conn.close()
+
+
+def run_maintenance(vacuum_pages=MAINT_VACUUM_PAGES, checkpoint_mode="TRUNCATE"):
+    """Roda optimize, ANALYZE do que mudou, incremental_vacuum e checkpoint.
+
+    Cada passo é um job separado na thread de escrita, então gravações dos
+    usuários entram entre eles. Duração de cada passo vai para MANUTENCAO
+    e volta como lista de ``Tarefa``.
     """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS SESSAO_ITEM (
-            ID_ITEM         INTEGER PRIMARY KEY AUTOINCREMENT,
-            ID_SESSAO       INTEGER NOT NULL,
-            ID_EXERCICIO    INTEGER NOT NULL,
-            FEITO           INTEGER NOT NULL DEFAULT 0,
-            SERIES_FEITAS   INTEGER,
-            REPS_MEDIA      INTEGER,
-            PESO_MEDIA      REAL,
-            OBS             TEXT,
-            FOREIGN KEY (ID_SESSAO) REFERENCES SESSAO(ID_SESSAO) ON DELETE CASCADE,
-            FOREIGN KEY (ID_EXERCICIO) REFERENCES EXERCICIO(ID_EXERCICIO) ON DELETE RESTRICT
-        );
+    tarefas = []
+
+    def medir(tarefa, alvo, fn, *args):
+        inicio = time.perf_counter()
+        linhas = fn(*args)
+        tarefas.append(Tarefa(tarefa, alvo, linhas, time.perf_counter() - inicio))
+
+    medir("optimize", None, write, _optimize)
+    for tabela, total in write(_tabelas_alteradas):
+        medir("analyze", tabela, write, _analyze, tabela, total)
+        for dependente in _ANALISAR_JUNTO.get(tabela, ()):
+            medir("analyze", dependente, write, _analyze, dependente)
+    medir("incremental_vacuum", None, write, _incremental_vacuum, vacuum_pages)
+    if checkpoint_mode:
+        medir("checkpoint", None, lambda: checkpoint(checkpoint_mode)[2])
+    write(_registrar, tarefas)
+    return tarefas
+
+
+def maintenance_history(limit=50):
+    """Últimas execuções registradas: (data, tarefa, alvo, linhas, segundos)."""
+    with connection() as conn:
+        return conn.execute(
+            "SELECT DATA, TAREFA, ALVO, LINHAS, SEGUNDOS FROM MANUTENCAO ORDER BY ID_MANUTENCAO DESC LIMIT ?;",
+            (limit,),
+        ).fetchall()
+
+
+class MaintenanceScheduler:
+    """Thread que roda ``run_maintenance`` a cada ``interval`` segundos, só com o app ocioso.
+
+    Ocioso = nenhuma gravação há ``idle`` segundos e nenhuma conexão do pool
+    emprestada. Enquanto houver movimento, a execução é adiada.
     """
-    )
 
-    # Índices úteis
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_aluno_nome ON ALUNO (NOME);")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_exercicio_nome ON EXERCICIO (NOME);")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_plano_nome ON PLANO (NOME);")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessao_data ON SESSAO (DATA_SESSAO DESC);")
-
-    # Seed mínimo de exercícios se tabela estiver vazia
-    cur.execute("SELECT COUNT(*) FROM EXERCICIO;")
-    if cur.fetchone()[0] == 0:
-        base_ex = [
-            ("Supino reto", "Peito"),
-            ("Crucifixo (halteres)", "Peito"),
-            ("Remada curvada", "Costas"),
-            ("Puxada na frente", "Costas"),
-            ("Agachamento livre", "Pernas"),
-            ("Leg press", "Pernas"),
-            ("Desenvolvimento ombro", "Ombros"),
-            ("Elevação lateral", "Ombros"),
-            ("Rosca direta", "Bíceps"),
-            ("Tríceps corda", "Tríceps"),
-            ("Abdominal infra", "Core"),
-        ]
-        cur.executemany("INSERT INTO EXERCICIO (NOME, GRUPO) VALUES (?,?)", base_ex)
-
-    conn.commit()
-    conn.close()
+    def __init__(self, interval, idle=MAINT_IDLE_SECONDS):
+        self.interval = interval
+        self.idle = idle
+        self.last = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="db-maintenance", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def ocioso(self):
+        return get_writer().idle_seconds() >= self.idle and not get_pool().stats()["in_use"]
+
+    def _loop(self):
+        proxima = time.monotonic() + self.interval
+        while not self._stop.wait(max(1.0, min(self.idle, proxima - time.monotonic()))):
+            if time.monotonic() < proxima or not self.ocioso():
+                continue
+            try:
+                self.last = run_maintenance()
+                total = sum(t.segundos for t in self.last)
+                print(
+                    f"[DB] Manutenção em {total:.2f}s: "
+                    + ", ".join(f"{t.tarefa}{'(' + t.alvo + ')' if t.alvo else ''} {t.segundos * 1000:.0f}ms" for t in self.last),
+                    flush=True,
+                )
+            except Exception as ex:
+                print(f"[ERRO] Manutenção falhou: {ex}", flush=True)
+            proxima = time.monotonic() + self.interval
+
+
+_maintenance = None
+
+
+def start_maintenance(interval_minutes=MAINT_INTERVAL_MINUTES):
+    """Liga a manutenção agendada do processo (uma vez só); ``interval_minutes <= 0`` desliga."""
+    global _maintenance
+    if _maintenance is None and interval_minutes > 0:
+        _maintenance = MaintenanceScheduler(interval_minutes * 60).start()
+    return _maintenance
+
+
+def _stop_maintenance():
+    global _maintenance
+    if _maintenance is not None:
+        _maintenance.stop()
+        _maintenance = None
+
+
+_reset_hooks = [_stop_maintenance]
+
+
+def on_database_change(fn):
+    """Registra ``fn()`` para descartar estado ligado ao banco atual quando ``use_database`` troca o arquivo."""
+    _reset_hooks.append(fn)
+    return fn
+
+
+def use_database(path):
+    """Aponta o app para outro arquivo de banco (CLI, ferramentas, testes de carga)."""
+    global DB_PATH, _pool, _writer, _schema_version
+    for hook in _reset_hooks:
+        hook()
+    with _pool_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        DB_PATH = path
+        _schema_version = 0
+
@@ -0,0 +1,75 @@
+"""Exportação em streaming do histórico de sessões (sessão + itens) para CSV ou JSON Lines.
+
+As linhas saem de um único cursor com ``fetchmany`` e são escritas bloco a
+bloco, opcionalmente com gzip; a memória usada não depende do tamanho do
+histórico.
+"""
+import csv
+import gzip
+import json
+import os
+import time
+from collections import namedtuple
+
+from app.config import EXPORT_BATCH_SIZE
+from app.repo import SessaoRepository
+from app.repo.sessoes import EXPORT_COLUMNS
+
+FORMATS = ("csv", "jsonl")
+
+ExportResult = namedtuple("ExportResult", "caminho linhas bytes segundos")
+
+
+def detect_format(path):
+    """Deduz (formato, gzip) pela extensão: .csv, .jsonl, com ou sem .gz."""
+    base, ext = os.path.splitext(path.lower())
+    compress = ext == ".gz"
+    if compress:
+        ext = os.path.splitext(base)[1]
+    fmt = "jsonl" if ext in (".jsonl", ".json", ".ndjson") else "csv"
+    return fmt, compress
+
+
+def _abrir(path, compress):
+    if compress:
+        # Nível 6: quase o tamanho do 9 (padrão do gzip.open) com bem menos CPU
+        return gzip.open(path, "wt", compresslevel=6, encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def export_sessions(path, fmt=None, compress=None, text="", batch_size=EXPORT_BATCH_SIZE, progress=None):
+    """Escreve o histórico em ``path`` e devolve um ``ExportResult``.
+
+    ``fmt``/``compress`` omitidos são deduzidos da extensão. ``text`` filtra por
+    nome do aluno como no relatório. ``progress(linhas)`` é chamado a cada bloco.
+    """
+    auto_fmt, auto_gz = detect_format(path)
+    fmt = fmt or auto_fmt
+    compress = auto_gz if compress is None else compress
+    if fmt not in FORMATS:
+        raise ValueError(f"formato desconhecido: {fmt!r} (use {', '.join(FORMATS)})")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    inicio = time.perf_counter()
+    linhas = 0
+    with _abrir(path, compress) as out:
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(EXPORT_COLUMNS)
+            escrever = writer.writerows
+        else:
+            def escrever(rows):
+                out.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, r)), ensure_ascii=False) + "\n" for r in rows)
+        for rows in SessaoRepository().iter_export(text, batch_size):
+            escrever(rows)
+            linhas += len(rows)
+            if progress:
+                progress(linhas)
+    return ExportResult(path, linhas, os.path.getsize(path), time.perf_counter() - inicio)
+
+
+def summary(result):
+    """Resumo de uma linha, usado pela CLI e pela tela de relatório."""
+    mb = result.bytes / 1048576
+    taxa = result.linhas / result.segundos if result.segundos > 0 else float(result.linhas)
+    return f"{result.linhas} linhas exportadas para {result.caminho} ({mb:.1f} MB) em {result.segundos:.2f}s ({taxa:,.0f} linhas/s)"
@@ -0,0 +1,164 @@
+"""Importação em massa de alunos e exercícios a partir de CSV.
+
+O arquivo é lido em streaming, validado linha a linha e gravado em blocos de
+``IMPORT_CHUNK_SIZE`` linhas, cada bloco num único ``executemany`` pela thread
+de escrita. Linhas inválidas viram erros com o número da linha e não
+interrompem a importação.
+"""
+import csv
+import sqlite3
+import time
+import unicodedata
+from collections import namedtuple
+
+from app.config import IMPORT_CHUNK_SIZE
+from app.repo import AlunoRepository, ExercicioRepository
+from app.utils import validar_data_brasil
+
+# Erros guardados para exibição; os demais só entram na contagem
+MAX_ERRORS_KEPT = 1000
+
+ImportResult = namedtuple("ImportResult", "lidas inseridas erros total_erros segundos")
+
+# Cabeçalhos aceitos (sem acento, minúsculos) -> campo
+_ALUNO_HEADERS = {
+    "nome": "nome", "aluno": "nome",
+    "data_nasc": "data_nasc", "nascimento": "data_nasc", "data_nascimento": "data_nasc", "data": "data_nasc",
+    "altura_m": "altura_m", "altura": "altura_m",
+    "peso_kg": "peso_kg", "peso": "peso_kg",
+}
+_EXERCICIO_HEADERS = {
+    "nome": "nome", "exercicio": "nome",
+    "grupo": "grupo", "grupo_muscular": "grupo",
+}
+
+
+def _normalizar(header):
+    texto = unicodedata.normalize("NFKD", (header or "").strip().lower())
+    texto = "".join(ch for ch in texto if not unicodedata.combining(ch))
+    return texto.replace(" ", "_").replace("(", "").replace(")", "")
+
+
+def _numero_positivo(valor, campo):
+    valor = (valor or "").strip()
+    if not valor:
+        return None
+    try:
+        numero = float(valor.replace(",", "."))
+    except ValueError:
+        raise ValueError(f"{campo} inválido: {valor!r}")
+    if numero <= 0:
+        raise ValueError(f"{campo} deve ser positivo: {valor!r}")
+    return numero
+
+
+def _linha_aluno(reg):
+    nome = (reg.get("nome") or "").strip()
+    if not nome:
+        raise ValueError("nome vazio")
+    data = (reg.get("data_nasc") or "").strip()
+    ok, iso = validar_data_brasil(data)
+    if not ok:
+        raise ValueError(f"data de nascimento inválida (DD/MM/AAAA): {data!r}")
+    return (nome, iso, _numero_positivo(reg.get("altura_m"), "altura"), _numero_positivo(reg.get("peso_kg"), "peso"))
+
+
+def _linha_exercicio(reg):
+    nome = (reg.get("nome") or "").strip()
+    grupo = (reg.get("grupo") or "").strip()
+    if not nome:
+        raise ValueError("nome vazio")
+    if not grupo:
+        raise ValueError("grupo vazio")
+    return (nome, grupo)
+
+
+# tipo -> (cabeçalhos, campos obrigatórios, conversor, repositório)
+KINDS = {
+    "alunos": (_ALUNO_HEADERS, ("nome", "data_nasc"), _linha_aluno, AlunoRepository),
+    "exercicios": (_EXERCICIO_HEADERS, ("nome", "grupo"), _linha_exercicio, ExercicioRepository),
+}
+
+
+def _leitor(arquivo):
+    amostra = arquivo.read(8192)
+    arquivo.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+    except csv.Error:
+        dialeto = csv.excel
+    return csv.reader(arquivo, dialeto)
+
+
+def import_csv(path, kind, chunk_size=IMPORT_CHUNK_SIZE, encoding="utf-8-sig", progress=None):
+    """Importa o CSV ``path`` como ``kind`` ("alunos" ou "exercicios").
+
+    ``progress(lidas, inseridas, total_erros)`` é chamado a cada bloco gravado.
+    Devolve um ``ImportResult``; ``erros`` traz até ``MAX_ERRORS_KEPT`` pares
+    ``(linha, mensagem)``.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"tipo de importação desconhecido: {kind!r}")
+    headers, obrigatorios, converter, repo_cls = KINDS[kind]
+    repo = repo_cls()
+    erros = []
+    estado = {"lidas": 0, "inseridas": 0, "erros": 0}
+    inicio = time.perf_counter()
+
+    def erro(linha, msg):
+        estado["erros"] += 1
+        if len(erros) < MAX_ERRORS_KEPT:
+            erros.append((linha, msg))
+
+    def gravar(bloco):
+        if not bloco:
+            return
+        try:
+            estado["inseridas"] += repo.insert_many([reg for _, reg in bloco])
+        except sqlite3.DatabaseError:
+            # Bloco recusado pelo banco: regrava linha a linha para achar as culpadas
+            for linha, reg in bloco:
+                try:
+                    estado["inseridas"] += repo.insert_many([reg])
+                except sqlite3.DatabaseError as ex:
+                    erro(linha, str(ex))
+        if progress:
+            progress(estado["lidas"], estado["inseridas"], estado["erros"])
+
+    with open(path, newline="", encoding=encoding) as arquivo:
+        leitor = _leitor(arquivo)
+        cabecalho = next(leitor, None)
+        if cabecalho is None:
+            raise ValueError("arquivo vazio")
+        campos = [headers.get(_normalizar(h)) for h in cabecalho]
+        faltando = [c for c in obrigatorios if c not in campos]
+        if faltando:
+            raise ValueError(f"colunas obrigatórias ausentes: {', '.join(faltando)}")
+
+        bloco = []
+        for valores in leitor:
+            linha = leitor.line_num
+            if not any(v.strip() for v in valores):
+                continue
+            estado["lidas"] += 1
+            reg = {c: v for c, v in zip(campos, valores) if c}
+            try:
+                bloco.append((linha, converter(reg)))
+            except ValueError as ex:
+                erro(linha, str(ex))
+            if len(bloco) >= chunk_size:
+                gravar(bloco)
+                bloco = []
+        gravar(bloco)
+
+    return ImportResult(estado["lidas"], estado["inseridas"], erros, estado["erros"], time.perf_counter() - inicio)
+
+
+def rows_per_second(result):
+    return result.lidas / result.segundos if result.segundos > 0 else float(result.lidas)
+
+
+def summary(result):
+    """Resumo de uma linha, usado pela CLI e pelo diálogo."""
+    return (f"{result.inseridas} de {result.lidas} linhas importadas em {result.segundos:.2f}s "
+            f"({rows_per_second(result):,.0f} linhas/s), {result.total_erros} com erro")
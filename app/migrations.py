@@ -0,0 +1,356 @@
+"""Migrações versionadas do schema, controladas por ``PRAGMA user_version``.
+
+Cada passo recebe um cursor e roda dentro da própria transação junto com a
+atualização do ``user_version``. Passos novos entram sempre no fim de
+``MIGRATIONS`` com o próximo número; passos já publicados não mudam.
+"""
+from collections import namedtuple
+
+Migration = namedtuple("Migration", "version description apply transactional")
+
+
+def _m001_schema_inicial(cur):
+    # ---- Núcleo
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ALUNO (
+            ID_ALUNO        INTEGER PRIMARY KEY AUTOINCREMENT,
+            NOME            TEXT NOT NULL,
+            DATA_NASC       TEXT NOT NULL,
+            ALTURA_M        REAL,
+            PESO_KG         REAL
+        );
+    """
+    )
+
+    # Migração: adicionar coluna PESO_KG se não existir
+    try:
+        cur.execute("SELECT PESO_KG FROM ALUNO LIMIT 1")
+    except Exception:
+        # Coluna não existe, adicionar
+        cur.execute("ALTER TABLE ALUNO ADD COLUMN PESO_KG REAL")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS EXERCICIO (
+            ID_EXERCICIO    INTEGER PRIMARY KEY AUTOINCREMENT,
+            NOME            TEXT NOT NULL,
+            GRUPO           TEXT NOT NULL
+        );
+    """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS PLANO (
+            ID_PLANO        INTEGER PRIMARY KEY AUTOINCREMENT,
+            NOME            TEXT NOT NULL
+        );
+    """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS PLANO_EXERCICIO (
+            ID_PLANO        INTEGER NOT NULL,
+            ID_EXERCICIO    INTEGER NOT NULL,
+            ORDEM           INTEGER NOT NULL,
+            SERIES          INTEGER NOT NULL,
+            REPS            INTEGER NOT NULL,
+            PRIMARY KEY (ID_PLANO, ID_EXERCICIO),
+            FOREIGN KEY (ID_PLANO) REFERENCES PLANO(ID_PLANO) ON DELETE CASCADE,
+            FOREIGN KEY (ID_EXERCICIO) REFERENCES EXERCICIO(ID_EXERCICIO) ON DELETE RESTRICT
+        );
+    """
+    )
+    # ---- Sessão (treino do dia)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS SESSAO (
+            ID_SESSAO       INTEGER PRIMARY KEY AUTOINCREMENT,
+            ID_ALUNO        INTEGER NOT NULL,
+            ID_PLANO        INTEGER NOT NULL,
+            DATA_SESSAO     TEXT NOT NULL,
+            FOREIGN KEY (ID_ALUNO) REFERENCES ALUNO(ID_ALUNO) ON DELETE CASCADE,
+            FOREIGN KEY (ID_PLANO) REFERENCES PLANO(ID_PLANO) ON DELETE CASCADE
+        );
+    """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS SESSAO_ITEM (
+            ID_ITEM         INTEGER PRIMARY KEY AUTOINCREMENT,
+            ID_SESSAO       INTEGER NOT NULL,
+            ID_EXERCICIO    INTEGER NOT NULL,
+            FEITO           INTEGER NOT NULL DEFAULT 0,
+            SERIES_FEITAS   INTEGER,
+            REPS_MEDIA      INTEGER,
+            PESO_MEDIA      REAL,
+            OBS             TEXT,
+            FOREIGN KEY (ID_SESSAO) REFERENCES SESSAO(ID_SESSAO) ON DELETE CASCADE,
+            FOREIGN KEY (ID_EXERCICIO) REFERENCES EXERCICIO(ID_EXERCICIO) ON DELETE RESTRICT
+        );
+    """
+    )
+
+    # Índices úteis
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_aluno_nome ON ALUNO (NOME);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_exercicio_nome ON EXERCICIO (NOME);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_plano_nome ON PLANO (NOME);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessao_data ON SESSAO (DATA_SESSAO DESC);")
+
+
+def _m002_seed_exercicios(cur):
+    # Seed mínimo de exercícios se tabela estiver vazia
+    cur.execute("SELECT COUNT(*) FROM EXERCICIO;")
+    if cur.fetchone()[0] == 0:
+        base_ex = [
+            ("Supino reto", "Peito"),
+            ("Crucifixo (halteres)", "Peito"),
+            ("Remada curvada", "Costas"),
+            ("Puxada na frente", "Costas"),
+            ("Agachamento livre", "Pernas"),
+            ("Leg press", "Pernas"),
+            ("Desenvolvimento ombro", "Ombros"),
+            ("Elevação lateral", "Ombros"),
+            ("Rosca direta", "Bíceps"),
+            ("Tríceps corda", "Tríceps"),
+            ("Abdominal infra", "Core"),
+        ]
+        cur.executemany("INSERT INTO EXERCICIO (NOME, GRUPO) VALUES (?,?)", base_ex)
+
+
+def _m003_indices_fk(cur):
+    # Sem estes índices, CASCADE/RESTRICT e o detalhe da sessão varrem tabelas inteiras
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessao_aluno ON SESSAO (ID_ALUNO, DATA_SESSAO);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessao_plano ON SESSAO (ID_PLANO);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessao_item_sessao ON SESSAO_ITEM (ID_SESSAO);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessao_item_exercicio ON SESSAO_ITEM (ID_EXERCICIO);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_plano_exercicio_exercicio ON PLANO_EXERCICIO (ID_EXERCICIO);")
+
+
+def _fts_sincronizado(cur, tabela, chave, colunas):
+    # Índice FTS5 de conteúdo externo + gatilhos que o mantêm igual à tabela
+    fts = f"{tabela}_FTS"
+    cols = ", ".join(colunas)
+    novos = ", ".join(f"new.{c}" for c in colunas)
+    velhos = ", ".join(f"old.{c}" for c in colunas)
+    pref = tabela.lower()
+    cur.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{tabela}', content_rowid='{chave}', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='1 2 3');"
+    )
+    cur.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{pref}_fts_ai AFTER INSERT ON {tabela} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{chave}, {novos}); END;"
+    )
+    cur.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{pref}_fts_ad AFTER DELETE ON {tabela} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{chave}, {velhos}); END;"
+    )
+    cur.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{pref}_fts_au AFTER UPDATE OF {cols} ON {tabela} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{chave}, {velhos}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{chave}, {novos}); END;"
+    )
+    cur.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild');")
+
+
+def _m004_busca_fts(cur):
+    # Busca sem acento ("Jose" acha "José") e por prefixo de palavra, usando o índice
+    _fts_sincronizado(cur, "ALUNO", "ID_ALUNO", ["NOME"])
+    _fts_sincronizado(cur, "EXERCICIO", "ID_EXERCICIO", ["NOME", "GRUPO"])
+    # Nome pesa mais que o grupo muscular na ordenação
+    cur.execute("INSERT INTO EXERCICIO_FTS(EXERCICIO_FTS, rank) VALUES ('rank', 'bm25(2.0, 1.0)');")
+
+
+# Tabelas com contador mantido por gatilho em STATS (lido pela Home em O(1))
+TABELAS_CONTADAS = ("ALUNO", "EXERCICIO", "PLANO", "SESSAO")
+
+
+def _m005_stats(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS STATS (
+            TABELA          TEXT PRIMARY KEY,
+            TOTAL           INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+    )
+    for tabela in TABELAS_CONTADAS:
+        pref = tabela.lower()
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{pref}_stats_ai AFTER INSERT ON {tabela} BEGIN "
+            f"UPDATE STATS SET TOTAL = TOTAL + 1 WHERE TABELA = '{tabela}'; END;"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{pref}_stats_ad AFTER DELETE ON {tabela} BEGIN "
+            f"UPDATE STATS SET TOTAL = TOTAL - 1 WHERE TABELA = '{tabela}'; END;"
+        )
+        # Backfill: um único COUNT(*) por tabela, feito aqui e nunca mais
+        cur.execute(
+            f"INSERT OR REPLACE INTO STATS (TABELA, TOTAL) SELECT '{tabela}', COUNT(*) FROM {tabela};"
+        )
+
+
+def _m006_indice_relatorio(cur):
+    # Paginação do relatório por (DATA_SESSAO DESC, ID_SESSAO DESC) sem ordenar em memória;
+    # cobre também os usos de idx_sessao_data, que fica redundante
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessao_data_id ON SESSAO (DATA_SESSAO DESC, ID_SESSAO DESC);")
+    cur.execute("DROP INDEX IF EXISTS idx_sessao_data;")
+
+
+def _m007_manutencao(cur):
+    # Fora de transação: trocar o auto_vacuum de um banco existente exige VACUUM
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS MANUTENCAO (
+            ID_MANUTENCAO   INTEGER PRIMARY KEY,
+            DATA            TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+            TAREFA          TEXT NOT NULL,
+            ALVO            TEXT,
+            LINHAS          INTEGER,
+            SEGUNDOS        REAL NOT NULL
+        );
+    """
+    )
+    # Última contagem analisada por tabela: a manutenção só reanalisa o que mudou
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_manutencao_tarefa ON MANUTENCAO (TAREFA, ALVO, ID_MANUTENCAO);")
+    if cur.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+        cur.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+        cur.execute("VACUUM;")
+
+
+# Tabelas com contador de alterações (STATS.VERSAO), lido pelo app/changes.py
+TABELAS_VERSIONADAS = TABELAS_CONTADAS + ("PLANO_EXERCICIO", "SESSAO_ITEM")
+
+
+def _m008_versoes(cur):
+    # VERSAO sobe a cada linha inserida, alterada ou apagada. INSERT/DELETE
+    # reaproveitam o UPDATE que já mantinha TOTAL, então não custam nada a mais
+    colunas = [r[1] for r in cur.execute("PRAGMA table_info(STATS);")]
+    if "VERSAO" not in colunas:
+        cur.execute("ALTER TABLE STATS ADD COLUMN VERSAO INTEGER NOT NULL DEFAULT 0;")
+    for tabela in TABELAS_VERSIONADAS:
+        pref = tabela.lower()
+        cur.execute(f"INSERT OR IGNORE INTO STATS (TABELA, TOTAL) SELECT '{tabela}', COUNT(*) FROM {tabela};")
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_{pref}_stats_ai;")
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_{pref}_stats_ad;")
+        cur.execute(
+            f"CREATE TRIGGER trg_{pref}_stats_ai AFTER INSERT ON {tabela} BEGIN "
+            f"UPDATE STATS SET TOTAL = TOTAL + 1, VERSAO = VERSAO + 1 WHERE TABELA = '{tabela}'; END;"
+        )
+        cur.execute(
+            f"CREATE TRIGGER trg_{pref}_stats_ad AFTER DELETE ON {tabela} BEGIN "
+            f"UPDATE STATS SET TOTAL = TOTAL - 1, VERSAO = VERSAO + 1 WHERE TABELA = '{tabela}'; END;"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{pref}_stats_au AFTER UPDATE ON {tabela} BEGIN "
+            f"UPDATE STATS SET VERSAO = VERSAO + 1 WHERE TABELA = '{tabela}'; END;"
+        )
+
+
+# Exclusão lógica: 0 = ativo, 1 = excluído aguardando o purgador (app/purge.py),
+# 2 = excluído mas mantido porque o histórico de sessões ainda o referencia
+TABELAS_EXCLUSAO_LOGICA = {"ALUNO": "ID_ALUNO", "PLANO": "ID_PLANO", "EXERCICIO": "ID_EXERCICIO"}
+
+
+def _m009_exclusao_logica(cur):
+    for tabela, chave in TABELAS_EXCLUSAO_LOGICA.items():
+        pref = tabela.lower()
+        colunas = [r[1] for r in cur.execute(f"PRAGMA table_info({tabela});")]
+        if "DELETADO" not in colunas:
+            cur.execute(f"ALTER TABLE {tabela} ADD COLUMN DELETADO INTEGER NOT NULL DEFAULT 0;")
+        # Fila do purgador: só as linhas excluídas entram no índice
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{pref}_excluido ON {tabela} ({chave}) WHERE DELETADO = 1;")
+        # STATS conta só as linhas ativas: excluir/restaurar ajusta TOTAL, e a
+        # remoção física de uma linha já excluída não desconta de novo
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_{pref}_stats_au;")
+        cur.execute(
+            f"CREATE TRIGGER trg_{pref}_stats_au AFTER UPDATE ON {tabela} BEGIN "
+            f"UPDATE STATS SET TOTAL = TOTAL + (NEW.DELETADO = 0) - (OLD.DELETADO = 0), VERSAO = VERSAO + 1 "
+            f"WHERE TABELA = '{tabela}'; END;"
+        )
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_{pref}_stats_ad;")
+        cur.execute(
+            f"CREATE TRIGGER trg_{pref}_stats_ad AFTER DELETE ON {tabela} BEGIN "
+            f"UPDATE STATS SET TOTAL = TOTAL - (OLD.DELETADO = 0), VERSAO = VERSAO + 1 "
+            f"WHERE TABELA = '{tabela}'; END;"
+        )
+    # Listagens das telas: ordenadas pelo índice parcial, sem ler as excluídas
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_aluno_nome_ativo ON ALUNO (NOME) WHERE DELETADO = 0;")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_plano_nome_ativo ON PLANO (NOME) WHERE DELETADO = 0;")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_exercicio_grupo_nome_ativo ON EXERCICIO (GRUPO, NOME) WHERE DELETADO = 0;")
+
+
+def _m010_progressao(cur):
+    # Uma linha por aluno/exercício/dia; mantida pelo app (app/repo/progressao.py)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS PROGRESSAO (
+            ID_ALUNO        INTEGER NOT NULL,
+            ID_EXERCICIO    INTEGER NOT NULL,
+            DATA_SESSAO     TEXT NOT NULL,
+            PESO_MAX        REAL NOT NULL,
+            VOLUME          REAL NOT NULL,
+            RM_ESTIMADO     REAL NOT NULL,
+            PRIMARY KEY (ID_ALUNO, ID_EXERCICIO, DATA_SESSAO)
+        ) WITHOUT ROWID;
+        """
+    )
+    # Carga inicial com o histórico do banco principal; o arquivo morto entra
+    # com "python -m app.cli progressao --reconstruir"
+    cur.execute(
+        "INSERT OR REPLACE INTO PROGRESSAO (ID_ALUNO, ID_EXERCICIO, DATA_SESSAO, PESO_MAX, VOLUME, RM_ESTIMADO) "
+        "SELECT s.ID_ALUNO, si.ID_EXERCICIO, s.DATA_SESSAO, MAX(si.PESO_MEDIA), "
+        "SUM(COALESCE(si.SERIES_FEITAS, 0) * COALESCE(si.REPS_MEDIA, 0) * si.PESO_MEDIA), "
+        "MAX(CASE WHEN si.REPS_MEDIA > 1 THEN si.PESO_MEDIA * (1 + si.REPS_MEDIA / 30.0) ELSE si.PESO_MEDIA END) "
+        "FROM SESSAO s JOIN SESSAO_ITEM si ON si.ID_SESSAO = s.ID_SESSAO "
+        "WHERE si.FEITO = 1 AND si.PESO_MEDIA IS NOT NULL "
+        "GROUP BY s.ID_ALUNO, si.ID_EXERCICIO, s.DATA_SESSAO;"
+    )
+
+
+MIGRATIONS = [
+    Migration(1, "schema inicial", _m001_schema_inicial, True),
+    Migration(2, "seed de exercícios", _m002_seed_exercicios, True),
+    Migration(3, "índices de chaves estrangeiras", _m003_indices_fk, True),
+    Migration(4, "busca FTS5 de alunos e exercícios", _m004_busca_fts, True),
+    Migration(5, "contadores em STATS", _m005_stats, True),
+    Migration(6, "índice do relatório paginado", _m006_indice_relatorio, True),
+    Migration(7, "auto_vacuum incremental e log de manutenção", _m007_manutencao, False),
+    Migration(8, "versão por tabela em STATS", _m008_versoes, True),
+    Migration(9, "exclusão lógica de alunos, planos e exercícios", _m009_exclusao_logica, True),
+    Migration(10, "tabela de progressão de carga", _m010_progressao, True),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def migrate(conn):
+    """Aplica em ordem os passos pendentes e devolve a lista dos aplicados."""
+    applied = []
+    for m in MIGRATIONS:
+        if m.version <= schema_version(conn):
+            continue
+        if not m.transactional:
+            # Passos que não podem rodar em transação (ex.: VACUUM)
+            m.apply(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {m.version};")
+            applied.append(m)
+            continue
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            # Outro processo pode ter migrado enquanto esperávamos o lock
+            if schema_version(conn) >= m.version:
+                conn.rollback()
+                continue
+            m.apply(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {m.version};")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(m)
+    return applied
@@ -0,0 +1,164 @@
+"""Purgador da exclusão lógica: remove de fato o que as telas marcaram como excluído.
+
+Excluir um aluno, plano ou exercício só marca ``DELETADO = 1`` (as telas
+filtram por ``DELETADO = 0``), então a exclusão volta na hora mesmo para um
+plano com milhares de sessões. Este módulo apaga os dependentes depois, em
+lotes de ``PURGE_BATCH`` sessões, cada lote um job da thread de escrita com
+uma pausa entre eles: as gravações dos professores entram entre os lotes.
+
+- aluno/plano: sessões e itens em lotes; por fim vínculos do plano e a linha.
+  A progressão (PROGRESSAO) do plano é recalculada a cada lote; a do aluno
+  sai inteira no fim, inclusive a que vinha do arquivo morto.
+- exercício: só é excluído fora de planos ativos (``ExercicioEmUso``); sai dos
+  vínculos de planos já excluídos e, se o histórico de sessões ainda o cita, a
+  linha fica com ``DELETADO = 2`` (o relatório continua mostrando o nome).
+"""
+import threading
+import time
+
+from app import db
+from app.config import PURGE_BATCH, PURGE_INTERVAL_SECONDS, PURGE_PAUSE
+from app.repo import progressao
+
+_SQL_PENDENTES = (
+    "SELECT 'ALUNO', ID_ALUNO FROM ALUNO WHERE DELETADO = 1 "
+    "UNION ALL SELECT 'PLANO', ID_PLANO FROM PLANO WHERE DELETADO = 1 "
+    "UNION ALL SELECT 'EXERCICIO', ID_EXERCICIO FROM EXERCICIO WHERE DELETADO = 1"
+)
+# Coluna de SESSAO que aponta para a entidade excluída
+_SESSAO_FK = {"ALUNO": "ID_ALUNO", "PLANO": "ID_PLANO"}
+_SQL_LOTE = "SELECT ID_SESSAO FROM SESSAO WHERE {fk} = ? LIMIT ?"
+# Itens apagados explicitamente: bancos antigos podem não ter o ON DELETE CASCADE
+_SQL_APAGA_ITENS = "DELETE FROM SESSAO_ITEM WHERE ID_SESSAO IN (SELECT value FROM json_each(?))"
+_SQL_APAGA_SESSOES = "DELETE FROM SESSAO WHERE ID_SESSAO IN (SELECT value FROM json_each(?))"
+_SQL_APAGA_ALUNO = "DELETE FROM ALUNO WHERE ID_ALUNO = ? AND DELETADO = 1"
+_SQL_APAGA_VINCULOS_PLANO = "DELETE FROM PLANO_EXERCICIO WHERE ID_PLANO = ?"
+_SQL_APAGA_PLANO = "DELETE FROM PLANO WHERE ID_PLANO = ? AND DELETADO = 1"
+_SQL_APAGA_VINCULOS_EXERCICIO = "DELETE FROM PLANO_EXERCICIO WHERE ID_EXERCICIO = ?"
+_SQL_EXERCICIO_NO_HISTORICO = "SELECT 1 FROM SESSAO_ITEM WHERE ID_EXERCICIO = ? LIMIT 1"
+_SQL_MANTEM_EXERCICIO = "UPDATE EXERCICIO SET DELETADO = 2 WHERE ID_EXERCICIO = ? AND DELETADO = 1"
+_SQL_APAGA_EXERCICIO = "DELETE FROM EXERCICIO WHERE ID_EXERCICIO = ? AND DELETADO = 1"
+
+
+def _lote_sessoes(conn, tabela, chave, batch):
+    ids = [r[0] for r in conn.execute(_SQL_LOTE.format(fk=_SESSAO_FK[tabela]), (chave, batch)).fetchall()]
+    if ids:
+        lote = "[" + ",".join(map(str, ids)) + "]"
+        # Aluno excluído perde a progressão inteira em _finalizar; plano excluído só os dias dele
+        keys = progressao.chaves(conn, ids) if tabela == "PLANO" else ()
+        conn.execute(_SQL_APAGA_ITENS, (lote,))
+        conn.execute(_SQL_APAGA_SESSOES, (lote,))
+        progressao.recalcular(conn, keys)
+    return len(ids)
+
+
+def _finalizar(conn, tabela, chave):
+    if tabela in _SESSAO_FK:
+        # Sessão gravada depois do último lote: sai aqui, com a progressão refeita, e não pelo CASCADE
+        while _lote_sessoes(conn, tabela, chave, PURGE_BATCH):
+            pass
+    if tabela == "ALUNO":
+        progressao.remover_aluno(conn, chave)
+        conn.execute(_SQL_APAGA_ALUNO, (chave,))
+    elif tabela == "PLANO":
+        conn.execute(_SQL_APAGA_VINCULOS_PLANO, (chave,))
+        conn.execute(_SQL_APAGA_PLANO, (chave,))
+    else:
+        conn.execute(_SQL_APAGA_VINCULOS_EXERCICIO, (chave,))
+        if conn.execute(_SQL_EXERCICIO_NO_HISTORICO, (chave,)).fetchone():
+            conn.execute(_SQL_MANTEM_EXERCICIO, (chave,))
+        else:
+            conn.execute(_SQL_APAGA_EXERCICIO, (chave,))
+
+
+def pending():
+    """(tabela, id) de tudo que está marcado como excluído e ainda não foi purgado."""
+    with db.connection() as conn:
+        return conn.execute(_SQL_PENDENTES).fetchall()
+
+
+def purge_pending(batch=PURGE_BATCH, pause=PURGE_PAUSE, stop=None, progress=None):
+    """Purga tudo que está pendente e devolve ``{tabela: linhas removidas}`` (inclui SESSAO).
+
+    ``stop`` (um ``threading.Event``) interrompe entre lotes; o que faltar
+    fica para a próxima execução. ``progress(tabela, id, sessoes)`` é chamado
+    a cada lote.
+    """
+    removidos = {"ALUNO": 0, "PLANO": 0, "EXERCICIO": 0, "SESSAO": 0}
+    for tabela, chave in pending():
+        if tabela in _SESSAO_FK:
+            while True:
+                if stop is not None and stop.is_set():
+                    return removidos
+                n = db.write(_lote_sessoes, tabela, chave, batch)
+                removidos["SESSAO"] += n
+                if progress is not None:
+                    progress(tabela, chave, n)
+                if n < batch:
+                    break
+                time.sleep(pause)
+        db.write(_finalizar, tabela, chave)
+        removidos[tabela] += 1
+    return removidos
+
+
+class Purger:
+    """Thread que purga as exclusões assim que avisada (``notify``) e, por garantia, a cada ``interval`` segundos."""
+
+    def __init__(self, interval=PURGE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="db-purge", daemon=True)
+            self._thread.start()
+        return self
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                removidos = purge_pending(stop=self._stop)
+                if any(removidos.values()):
+                    print("[DB] Purga: " + ", ".join(f"{t} {n}" for t, n in removidos.items() if n), flush=True)
+            except Exception as ex:
+                print(f"[ERRO] Purga falhou: {ex}", flush=True)
+            self._wake.wait(self.interval)
+
+
+_purger = None
+
+
+def start_purger(interval=PURGE_INTERVAL_SECONDS):
+    """Liga o purgador do processo (uma vez só)."""
+    global _purger
+    if _purger is None:
+        _purger = Purger(interval).start()
+    return _purger
+
+
+def notify():
+    """Avisa o purgador de que há exclusões novas; sem purgador ligado (CLI, scripts) não faz nada."""
+    if _purger is not None:
+        _purger.notify()
+
+
+@db.on_database_change
+def stop_purger():
+    global _purger
+    if _purger is not None:
+        _purger.stop()
+        _purger = None
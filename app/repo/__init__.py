@@ -0,0 +1,27 @@
+"""Camada de acesso a dados: um repositório por entidade, SQL centralizado aqui."""
+from app.repo.aio import AsyncRepository
+from app.repo.alunos import Aluno, AlunoNome, AlunoRepository
+from app.repo.exercicios import Exercicio, ExercicioEmUso, ExercicioRepository
+from app.repo.planos import Plano, PlanoItem, PlanoRepository
+from app.repo.progressao import ProgressaoExercicio, ProgressaoPonto, ProgressaoRepository
+from app.repo.sessoes import NovaSessao, SessaoItem, SessaoRepository, SessaoResumo
+from app.repo.stats import StatsRepository
+from app.repo import alunos as _alunos, exercicios as _exercicios, planos as _planos, sessoes as _sessoes
+from app.repo import progressao as _progressao, stats as _stats
+
+
+def all_queries():
+    """Todas as consultas dos repositórios como (nome, sql, parâmetros de exemplo)."""
+    return [q for mod in (_alunos, _exercicios, _planos, _progressao, _sessoes, _stats) for q in mod.QUERIES]
+
+
+__all__ = [
+    "AsyncRepository",
+    "Aluno", "AlunoNome", "AlunoRepository",
+    "Exercicio", "ExercicioEmUso", "ExercicioRepository",
+    "Plano", "PlanoItem", "PlanoRepository",
+    "ProgressaoExercicio", "ProgressaoPonto", "ProgressaoRepository",
+    "NovaSessao", "SessaoItem", "SessaoRepository", "SessaoResumo",
+    "StatsRepository",
+    "all_queries",
+]
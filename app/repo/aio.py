@@ -0,0 +1,49 @@
+"""Acesso assíncrono aos repositórios, para handlers ``async`` do Flet.
+
+Cada chamada roda num executor de tamanho fixo (``DB_ASYNC_WORKERS``), então o
+event loop nunca espera o SQLite. Leituras continuam limitadas pelo pool de
+conexões e gravações pela thread de escrita; o executor só evita que dezenas
+de clientes abram uma thread cada.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.config import DB_ASYNC_WORKERS
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_ASYNC_WORKERS, thread_name_prefix="db-async")
+    return _executor
+
+
+async def run(fn, *args, **kwargs):
+    """Executa ``fn(*args, **kwargs)`` no executor do banco e aguarda o resultado."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(fn, *args, **kwargs))
+
+
+class AsyncRepository:
+    """Versão aguardável de um repositório: ``await AsyncRepository(repo).search(...)``."""
+
+    def __init__(self, repo):
+        self._repo = repo
+
+    def __getattr__(self, name):
+        attr = getattr(self._repo, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await run(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
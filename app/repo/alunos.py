@@ -0,0 +1,137 @@
+from typing import NamedTuple, Optional
+
+from app import purge
+from app.config import ALUNO_PAGE_SIZE, SEARCH_LIMIT, SEARCH_RANK_WINDOW
+from app.repo.base import Repository, match_expression
+
+
+class Aluno(NamedTuple):
+    id_aluno: int
+    nome: str
+    data_nasc: str
+    altura_m: Optional[float]
+    peso_kg: Optional[float]
+
+
+class AlunoNome(NamedTuple):
+    id_aluno: int
+    nome: str
+
+
+# DELETADO = 0 em toda leitura: casa com o índice parcial idx_aluno_nome_ativo (migração 009)
+# Busca pelo índice FTS5 (sem acento), em duas camadas (Repository._ranked). DELETADO = 0 no mesmo
+# SELECT do MATCH e do LIMIT: excluídos não ocupam vaga. Palavras inteiras: as primeiras ``janela``
+# ocorrências ordenadas por ``rank``, como a de exercícios; um sobrenome comum não faz o bm25 rodar
+# no cadastro inteiro. Parâmetros: MATCH, janela, limite
+_SQL_SEARCH = (
+    "SELECT ID_ALUNO, NOME, DATA_NASC, ALTURA_M, PESO_KG FROM ("
+    "SELECT a.ID_ALUNO, a.NOME, a.DATA_NASC, a.ALTURA_M, a.PESO_KG, f.rank AS RANK FROM ALUNO_FTS f "
+    "JOIN ALUNO a ON a.ID_ALUNO = f.rowid WHERE ALUNO_FTS MATCH ? AND a.DELETADO = 0 LIMIT ?"
+    ") ORDER BY RANK, NOME LIMIT ?"
+)
+# Prefixos: sem ordenação, direto do índice de prefixos (prefix='1 2 3'), parando no limite; é o que
+# mantém barata a busca de 1-2 letras. Parâmetros: MATCH, limite
+_SQL_SEARCH_PREFIX = (
+    "SELECT a.ID_ALUNO, a.NOME, a.DATA_NASC, a.ALTURA_M, a.PESO_KG FROM ALUNO_FTS f "
+    "JOIN ALUNO a ON a.ID_ALUNO = f.rowid WHERE ALUNO_FTS MATCH ? AND a.DELETADO = 0 LIMIT ?"
+)
+_SQL_SEARCH_NAMES = (
+    "SELECT ID_ALUNO, NOME FROM ("
+    "SELECT a.ID_ALUNO, a.NOME, f.rank AS RANK FROM ALUNO_FTS f "
+    "JOIN ALUNO a ON a.ID_ALUNO = f.rowid WHERE ALUNO_FTS MATCH ? AND a.DELETADO = 0 LIMIT ?"
+    ") ORDER BY RANK, NOME LIMIT ?"
+)
+_SQL_SEARCH_NAMES_PREFIX = (
+    "SELECT a.ID_ALUNO, a.NOME FROM ALUNO_FTS f "
+    "JOIN ALUNO a ON a.ID_ALUNO = f.rowid WHERE ALUNO_FTS MATCH ? AND a.DELETADO = 0 LIMIT ?"
+)
+# Lista da tela paginada por chave (keyset) em (NOME, ID_ALUNO): o índice parcial já guarda o rowid
+# junto do nome, então cada página é uma busca no índice. Parâmetros: nome e id da linha de referência, limite.
+_SQL_PAGE = (
+    "SELECT ID_ALUNO, NOME, DATA_NASC, ALTURA_M, PESO_KG FROM ALUNO WHERE DELETADO = 0 "
+    "AND (NOME, ID_ALUNO) > (?, ?) ORDER BY NOME, ID_ALUNO LIMIT ?"
+)
+_SQL_PAGE_BEFORE = (
+    "SELECT ID_ALUNO, NOME, DATA_NASC, ALTURA_M, PESO_KG FROM ALUNO WHERE DELETADO = 0 "
+    "AND (NOME, ID_ALUNO) < (?, ?) ORDER BY NOME DESC, ID_ALUNO DESC LIMIT ?"
+)
+# Seletores de aluno sem filtro: só os primeiros em ordem alfabética, pelo mesmo keyset da lista
+_SQL_PAGE_NAMES = (
+    "SELECT ID_ALUNO, NOME FROM ALUNO WHERE DELETADO = 0 "
+    "AND (NOME, ID_ALUNO) > (?, ?) ORDER BY NOME, ID_ALUNO LIMIT ?"
+)
+# Cursor anterior a qualquer aluno: a primeira página usa o mesmo SQL das demais
+FIRST_PAGE = ("", 0)
+_SQL_COUNT = "SELECT TOTAL FROM STATS WHERE TABELA = 'ALUNO'"  # mantido por gatilho
+_SQL_INSERT = "INSERT INTO ALUNO (NOME, DATA_NASC, ALTURA_M, PESO_KG) VALUES (?,?,?,?)"
+# Exclusão lógica: sessões e a própria linha saem depois, pelo purgador (app/purge.py)
+_SQL_DELETE = "UPDATE ALUNO SET DELETADO = 1 WHERE ID_ALUNO = ? AND DELETADO = 0"
+
+QUERIES = [
+    ("alunos.search (filtro)", _SQL_SEARCH, ('"a"', SEARCH_RANK_WINDOW, SEARCH_LIMIT)),
+    ("alunos.search (prefixo)", _SQL_SEARCH_PREFIX, ('"a"*', SEARCH_LIMIT)),
+    ("alunos.search_page", _SQL_PAGE, (*FIRST_PAGE, ALUNO_PAGE_SIZE)),
+    ("alunos.search_page_before", _SQL_PAGE_BEFORE, ("m", 0, ALUNO_PAGE_SIZE)),
+    ("alunos.search_names", _SQL_PAGE_NAMES, (*FIRST_PAGE, SEARCH_LIMIT)),
+    ("alunos.search_names (filtro)", _SQL_SEARCH_NAMES, ('"a"', SEARCH_RANK_WINDOW, SEARCH_LIMIT)),
+    ("alunos.search_names (prefixo)", _SQL_SEARCH_NAMES_PREFIX, ('"a"*', SEARCH_LIMIT)),
+    ("alunos.count", _SQL_COUNT, ()),
+    ("alunos.insert", _SQL_INSERT, ("x", "2000-01-01", None, None)),
+    ("alunos.delete", _SQL_DELETE, (0,)),
+]
+
+
+class AlunoRepository(Repository):
+    def search(self, text="", limit=SEARCH_LIMIT):
+        """Até ``limit`` alunos com todas as palavras do filtro, ignorando acentos.
+
+        Quem tem as palavras inteiras vem antes de quem só casa por prefixo.
+        Sem filtro, os ``limit`` primeiros em ordem alfabética (a primeira
+        página de ``search_page``).
+        """
+        if match_expression(text):
+            return self._ranked(_SQL_SEARCH, _SQL_SEARCH_PREFIX, text, limit, Aluno)
+        return self._fetchall(_SQL_PAGE, (*FIRST_PAGE, limit), Aluno)
+
+    def search_page(self, text="", after=None, limit=ALUNO_PAGE_SIZE):
+        """Próxima página da lista de alunos, em ordem alfabética.
+
+        ``after`` é o cursor ``(nome, id_aluno)`` da última linha recebida
+        (``None`` na primeira página); o custo não depende de quantas páginas já
+        foram lidas. Uma página com menos de ``limit`` linhas é a última. Com
+        filtro, a busca por relevância (até ``SEARCH_LIMIT``) vem inteira na
+        primeira página e as seguintes vêm vazias.
+        """
+        if match_expression(text):
+            return [] if after else self.search(text)
+        return self._fetchall(_SQL_PAGE, (*(after or FIRST_PAGE), limit), Aluno)
+
+    def search_page_before(self, before, limit=ALUNO_PAGE_SIZE):
+        """Até ``limit`` alunos imediatamente antes do cursor ``before``, do mais próximo para o mais distante."""
+        return self._fetchall(_SQL_PAGE_BEFORE, (*before, limit), Aluno)
+
+    @staticmethod
+    def cursor(row):
+        """Cursor de paginação a partir de uma linha da lista."""
+        return (row.nome, row.id_aluno)
+
+    def search_names(self, text="", limit=SEARCH_LIMIT):
+        """Até ``limit`` (id, nome) para os seletores com busca; sem filtro, os primeiros em ordem alfabética."""
+        if match_expression(text):
+            return self._ranked(_SQL_SEARCH_NAMES, _SQL_SEARCH_NAMES_PREFIX, text, limit, AlunoNome)
+        return self._fetchall(_SQL_PAGE_NAMES, (*FIRST_PAGE, limit), AlunoNome)
+
+    def count(self):
+        return self._scalar(_SQL_COUNT)
+
+    def insert(self, nome, data_nasc, altura_m=None, peso_kg=None):
+        return self._write(lambda conn: conn.execute(_SQL_INSERT, (nome, data_nasc, altura_m, peso_kg)).lastrowid)
+
+    def insert_many(self, rows):
+        """Grava ``(nome, data_nasc, altura_m, peso_kg)`` num único executemany/transação."""
+        return self._write(lambda conn: conn.executemany(_SQL_INSERT, rows).rowcount)
+
+    def delete(self, id_aluno):
+        """Some das telas na hora; as sessões do aluno são apagadas em segundo plano."""
+        self._write(lambda conn: conn.execute(_SQL_DELETE, (id_aluno,)))
+        purge.notify()
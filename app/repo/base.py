@@ -0,0 +1,91 @@
+import re
+from contextlib import contextmanager
+
+from app import db
+from app.config import SEARCH_RANK_WINDOW
+from app.repo.cache import get_cache
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(text, prefix=True):
+    """Converte o texto digitado numa consulta FTS5 que exige todas as palavras.
+
+    "jose sil" vira '"jose"* "sil"*' (ou '"jose" "sil"' com ``prefix=False``).
+    Devolve None quando não sobra palavra.
+    """
+    words = _WORD_RE.findall(text or "")
+    if not words:
+        return None
+    star = "*" if prefix else ""
+    return " ".join(f'"{w}"{star}' for w in words)
+
+
+class Repository:
+    """Base dos repositórios.
+
+    O SQL de cada método é uma constante do módulo, então o texto é sempre o
+    mesmo e o cache de statements do sqlite3 reaproveita a preparação. Sem
+    ``conn`` explícita, leituras emprestam uma conexão do pool e gravações vão
+    para a thread de escrita (``db.write``); com ela, o repositório roda dentro
+    da transação de quem chamou e não faz commit.
+    """
+
+    def __init__(self, conn=None):
+        self._conn = conn
+
+    @contextmanager
+    def _connection(self):
+        if self._conn is not None:
+            yield self._conn
+        else:
+            with db.connection() as conn:
+                yield conn
+
+    def _write(self, fn, *args):
+        """Roda ``fn(conn, *args)`` como uma gravação atômica e devolve o resultado."""
+        if self._conn is not None:
+            return fn(self._conn, *args)
+        return db.write(fn, *args)
+
+    def _fetchall(self, sql, params=(), row_type=None):
+        with self._connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return list(map(row_type._make, rows)) if row_type is not None else rows
+
+    def _cached(self, tabelas, sql, params=(), row_type=None):
+        """``_fetchall`` pelo cache de resultados; ``tabelas`` são as que a consulta lê.
+
+        Dentro da transação de quem chamou (``conn`` explícita) o cache é
+        ignorado: ali pode haver gravações ainda não confirmadas.
+        """
+        if self._conn is not None:
+            return self._fetchall(sql, params, row_type)
+        return get_cache().get((sql, params), tabelas, lambda: self._fetchall(sql, params, row_type))
+
+    def _ranked(self, sql, sql_prefix, text, limit, row_type):
+        """Busca FTS em camadas: palavras inteiras primeiro, depois prefixos.
+
+        ``sql`` recebe (expressão MATCH, janela, limite) e ordena por ``rank``
+        (bm25) só as ``SEARCH_RANK_WINDOW`` primeiras ocorrências das palavras
+        inteiras. ``sql_prefix`` recebe (expressão MATCH, limite) e completa o
+        limite sem ordenar: ordenar todos os casamentos de "a" custaria dezenas
+        de ms com 100 mil alunos, a cada tecla.
+        """
+        found = self._fetchall(sql, (match_expression(text, prefix=False), SEARCH_RANK_WINDOW, limit), row_type)
+        if len(found) >= limit:
+            return found
+        seen = {row[0] for row in found}
+        # A camada de prefixo contém a anterior: pedir len(found) a mais garante o limite
+        for row in self._fetchall(sql_prefix, (match_expression(text), limit + len(found)), row_type):
+            if row[0] not in seen:
+                seen.add(row[0])
+                found.append(row)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def _scalar(self, sql, params=()):
+        with self._connection() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return row[0] if row else None
@@ -0,0 +1,98 @@
+"""Cache de resultados de consultas, LRU e limitado por linhas.
+
+A chave é (SQL, parâmetros). Cada entrada guarda as versões das tabelas
+que a consulta lê (``app.changes``), tiradas antes de executá-la. Na
+leitura, se alguma dessas tabelas mudou, a entrada é descartada e a
+consulta roda de novo. Assim a invalidação é exata por tabela, sem depender
+de quem gravou lembrar de limpar o cache.
+"""
+import threading
+from collections import OrderedDict
+
+from app import changes, db
+from app.config import QUERY_CACHE_ENTRIES, QUERY_CACHE_ROWS
+from app.tracing import tracer
+
+
+class QueryCache:
+    def __init__(self, max_entries=QUERY_CACHE_ENTRIES, max_rows=QUERY_CACHE_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # chave -> (snapshot, linhas)
+        self._rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_rows > 0
+
+    def get(self, key, tabelas, load):
+        """Devolve o resultado em cache de ``key`` ou chama ``load()`` e guarda o que voltar."""
+        if not self.enabled:
+            return load()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            if not changes.changed(entry[0]):
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self.hits += 1
+                return list(entry[1])
+            with self._lock:
+                self.stale += 1
+                self._drop(key)
+        marca = changes.snapshot(*tabelas)
+        rows = load()
+        with self._lock:
+            self.misses += 1
+            # Resultado maior que o cache inteiro não entra: só expulsaria todo o resto
+            if len(rows) <= self.max_rows:
+                self._drop(key)
+                self._entries[key] = (marca, tuple(rows))
+                self._rows += len(rows)
+                self._evict()
+        return rows
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._rows -= len(entry[1])
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+            _key, (_marca, rows) = self._entries.popitem(last=False)
+            self._rows -= len(rows)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries), "rows": self._rows,
+                "max_entries": self.max_entries, "max_rows": self.max_rows,
+                "hits": self.hits, "misses": self.misses, "stale": self.stale, "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 3) if total else None,
+            }
+
+
+_cache = QueryCache()
+tracer.extras["cache"] = _cache.stats
+
+
+def get_cache():
+    return _cache
+
+
+@db.on_database_change
+def _limpar():
+    _cache.clear()
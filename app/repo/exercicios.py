@@ -0,0 +1,77 @@
+import sqlite3
+from typing import NamedTuple
+
+from app import purge
+from app.repo.base import Repository, match_expression
+
+
+class ExercicioEmUso(sqlite3.IntegrityError):
+    """O exercício ainda está em algum plano ativo (o antigo ON DELETE RESTRICT)."""
+
+
+class Exercicio(NamedTuple):
+    id_exercicio: int
+    nome: str
+    grupo: str
+
+
+# DELETADO = 0: índice parcial idx_exercicio_grupo_nome_ativo (migração 009)
+_SQL_LIST = "SELECT ID_EXERCICIO, NOME, GRUPO FROM EXERCICIO WHERE DELETADO = 0 ORDER BY GRUPO, NOME"
+# Nome e grupo no índice FTS5; o rank pondera o nome com peso maior (migração 004)
+_SQL_SEARCH = (
+    "SELECT e.ID_EXERCICIO, e.NOME, e.GRUPO FROM EXERCICIO_FTS f "
+    "JOIN EXERCICIO e ON e.ID_EXERCICIO = f.rowid "
+    "WHERE EXERCICIO_FTS MATCH ? AND e.DELETADO = 0 ORDER BY f.rank, e.GRUPO, e.NOME"
+)
+_SQL_INSERT = "INSERT INTO EXERCICIO (NOME, GRUPO) VALUES (?,?)"
+# Exclusão lógica (só fora de planos ativos): o purgador apaga se nenhuma sessão citar o exercício
+_SQL_DELETE = "UPDATE EXERCICIO SET DELETADO = 1 WHERE ID_EXERCICIO = ? AND DELETADO = 0"
+# Planos ativos que usam o exercício (idx_plano_exercicio_exercicio); planos já excluídos não contam
+_SQL_EM_PLANOS = (
+    "SELECT COUNT(*) FROM PLANO_EXERCICIO pe JOIN PLANO p ON p.ID_PLANO = pe.ID_PLANO AND p.DELETADO = 0 "
+    "WHERE pe.ID_EXERCICIO = ?"
+)
+
+QUERIES = [
+    ("exercicios.search", _SQL_LIST, ()),
+    ("exercicios.search (filtro)", _SQL_SEARCH, ('"a"*',)),
+    ("exercicios.insert", _SQL_INSERT, ("x", "y")),
+    ("exercicios.delete", _SQL_DELETE, (0,)),
+    ("exercicios.delete (em planos)", _SQL_EM_PLANOS, (0,)),
+]
+
+
+class ExercicioRepository(Repository):
+    def search(self, text=""):
+        expr = match_expression(text)
+        if expr:
+            return self._fetchall(_SQL_SEARCH, (expr,), Exercicio)
+        return self.list_all()
+
+    def list_all(self):
+        # Catálogo pequeno e lido a cada edição de plano: fica no cache até EXERCICIO mudar
+        return self._cached(("EXERCICIO",), _SQL_LIST, (), Exercicio)
+
+    def insert(self, nome, grupo):
+        return self._write(lambda conn: conn.execute(_SQL_INSERT, (nome, grupo)).lastrowid)
+
+    def insert_many(self, rows):
+        """Grava ``(nome, grupo)`` num único executemany/transação."""
+        return self._write(lambda conn: conn.executemany(_SQL_INSERT, rows).rowcount)
+
+    def delete(self, id_exercicio):
+        """Exclui o exercício; se ele estiver em algum plano ativo, levanta ``ExercicioEmUso``.
+
+        A checagem e a marcação rodam no mesmo job da thread de escrita: nenhum
+        plano ganha o exercício entre uma e outra.
+        """
+        def excluir(conn):
+            planos = conn.execute(_SQL_EM_PLANOS, (id_exercicio,)).fetchone()[0]
+            if planos:
+                raise ExercicioEmUso(
+                    f"o exercício está em {planos} plano(s); remova-o dos planos antes de excluir"
+                )
+            conn.execute(_SQL_DELETE, (id_exercicio,))
+
+        self._write(excluir)
+        purge.notify()
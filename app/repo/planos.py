@@ -0,0 +1,86 @@
+from typing import NamedTuple
+
+from app import purge
+from app.repo.base import Repository
+
+
+class Plano(NamedTuple):
+    id_plano: int
+    nome: str
+
+
+class PlanoItem(NamedTuple):
+    ordem: int
+    id_exercicio: int
+    nome: str
+    grupo: str
+    series: int
+    reps: int
+
+
+# DELETADO = 0: índice parcial idx_plano_nome_ativo (migração 009). LIMIT -1 = todos
+_SQL_LIST = "SELECT ID_PLANO, NOME FROM PLANO WHERE DELETADO = 0 ORDER BY NOME LIMIT ?"
+_SQL_SEARCH = "SELECT ID_PLANO, NOME FROM PLANO WHERE DELETADO = 0 AND NOME LIKE ? ORDER BY NOME LIMIT ?"
+_SQL_COUNT = "SELECT TOTAL FROM STATS WHERE TABELA = 'PLANO'"  # mantido por gatilho
+_SQL_INSERT = "INSERT INTO PLANO (NOME) VALUES (?)"
+# Exclusão lógica: sessões, itens e vínculos saem em lotes pelo purgador (app/purge.py)
+_SQL_DELETE = "UPDATE PLANO SET DELETADO = 1 WHERE ID_PLANO = ? AND DELETADO = 0"
+_SQL_ITEMS = (
+    "SELECT pe.ORDEM, e.ID_EXERCICIO, e.NOME, e.GRUPO, pe.SERIES, pe.REPS "
+    "FROM PLANO_EXERCICIO pe JOIN EXERCICIO e ON e.ID_EXERCICIO = pe.ID_EXERCICIO "
+    "WHERE pe.ID_PLANO = ? AND e.DELETADO = 0 ORDER BY pe.ORDEM"
+)
+_SQL_NEXT_ORDEM = "SELECT COALESCE(MAX(ORDEM), 0) + 1 FROM PLANO_EXERCICIO WHERE ID_PLANO = ?"
+_SQL_UPSERT_ITEM = "INSERT OR REPLACE INTO PLANO_EXERCICIO (ID_PLANO, ID_EXERCICIO, ORDEM, SERIES, REPS) VALUES (?,?,?,?,?)"
+_SQL_DELETE_ITEM = "DELETE FROM PLANO_EXERCICIO WHERE ID_PLANO = ? AND ID_EXERCICIO = ?"
+
+QUERIES = [
+    ("planos.search", _SQL_LIST, (-1,)),
+    ("planos.search (filtro)", _SQL_SEARCH, ("%a%", -1)),
+    ("planos.count", _SQL_COUNT, ()),
+    ("planos.insert", _SQL_INSERT, ("x",)),
+    ("planos.delete", _SQL_DELETE, (0,)),
+    ("planos.items", _SQL_ITEMS, (0,)),
+    ("planos.add_item (ordem)", _SQL_NEXT_ORDEM, (0,)),
+    ("planos.add_item", _SQL_UPSERT_ITEM, (0, 0, 1, 3, 10)),
+    ("planos.remove_item", _SQL_DELETE_ITEM, (0, 0)),
+]
+
+
+class PlanoRepository(Repository):
+    def search(self, text="", limit=None):
+        """Planos cujo nome contém ``text``, em ordem alfabética; ``limit`` corta a lista (seletores)."""
+        if text:
+            return self._fetchall(_SQL_SEARCH, (f"%{text}%", -1 if limit is None else limit), Plano)
+        return self.list_all(limit)
+
+    def list_all(self, limit=None):
+        return self._cached(("PLANO",), _SQL_LIST, (-1 if limit is None else limit,), Plano)
+
+    def count(self):
+        return self._scalar(_SQL_COUNT)
+
+    def insert(self, nome):
+        return self._write(lambda conn: conn.execute(_SQL_INSERT, (nome,)).lastrowid)
+
+    def delete(self, id_plano):
+        """Marca o plano como excluído; um plano com milhares de sessões sai da tela na hora."""
+        self._write(lambda conn: conn.execute(_SQL_DELETE, (id_plano,)))
+        purge.notify()
+
+    def items(self, id_plano):
+        # Checklist do treino: relido a cada troca de plano, muda raramente
+        return self._cached(("PLANO_EXERCICIO", "EXERCICIO"), _SQL_ITEMS, (id_plano,), PlanoItem)
+
+    def add_item(self, id_plano, id_exercicio, series, reps, ordem=None):
+        """Inclui (ou substitui) o exercício no plano; sem ``ordem``, vai para o fim."""
+        def _add(conn):
+            pos = ordem
+            if pos is None:
+                pos = conn.execute(_SQL_NEXT_ORDEM, (id_plano,)).fetchone()[0]
+            conn.execute(_SQL_UPSERT_ITEM, (id_plano, id_exercicio, pos, series, reps))
+            return pos
+        return self._write(_add)
+
+    def remove_item(self, id_plano, id_exercicio):
+        self._write(lambda conn: conn.execute(_SQL_DELETE_ITEM, (id_plano, id_exercicio)))
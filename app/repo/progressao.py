@@ -0,0 +1,163 @@
+"""Progressão de carga por aluno e exercício (tabela PROGRESSAO, migração 010).
+
+Uma linha por (aluno, exercício, dia) com o maior peso, o volume
+(séries × reps × peso, somado entre as sessões do dia) e o 1RM estimado pela
+fórmula de Epley. Só entram itens feitos e com peso informado.
+
+A tabela é mantida pelo próprio app, na mesma transação que grava ou apaga a
+sessão: ao salvar, os dias tocados recebem um upsert incremental; ao apagar,
+as chaves afetadas são recalculadas a partir dos itens que sobraram (máximos
+não se desfazem por subtração). Mover sessões para o arquivo morto não mexe
+na progressão, que continua cobrindo o histórico inteiro.
+"""
+import json
+from typing import NamedTuple, Optional
+
+from app.repo.base import Repository
+
+
+class ProgressaoPonto(NamedTuple):
+    data_sessao: str
+    peso_max: float
+    volume: float
+    rm_estimado: float
+
+
+class ProgressaoExercicio(NamedTuple):
+    id_exercicio: int
+    nome: str
+    grupo: str
+    dias: int
+    ultima_data: str
+    rm_max: Optional[float]
+
+
+# Epley: 1RM = peso × (1 + reps/30); com uma repetição o próprio peso já é o 1RM
+_RM = "CASE WHEN si.REPS_MEDIA > 1 THEN si.PESO_MEDIA * (1 + si.REPS_MEDIA / 30.0) ELSE si.PESO_MEDIA END"
+_VOLUME = "COALESCE(si.SERIES_FEITAS, 0) * COALESCE(si.REPS_MEDIA, 0) * si.PESO_MEDIA"
+_CONTA = "si.FEITO = 1 AND si.PESO_MEDIA IS NOT NULL"
+
+# Soma num dia já registrado: maior peso e 1RM ficam com o máximo, o volume acumula
+_UPSERT = (
+    "ON CONFLICT (ID_ALUNO, ID_EXERCICIO, DATA_SESSAO) DO UPDATE SET "
+    "PESO_MAX = max(PESO_MAX, excluded.PESO_MAX), VOLUME = VOLUME + excluded.VOLUME, "
+    "RM_ESTIMADO = max(RM_ESTIMADO, excluded.RM_ESTIMADO)"
+)
+_INSERT = "INSERT INTO PROGRESSAO (ID_ALUNO, ID_EXERCICIO, DATA_SESSAO, PESO_MAX, VOLUME, RM_ESTIMADO) "
+_AGREGADO = f"SELECT s.ID_ALUNO, si.ID_EXERCICIO, s.DATA_SESSAO, MAX(si.PESO_MEDIA), SUM({_VOLUME}), MAX({_RM}) "
+_GRUPO = "GROUP BY s.ID_ALUNO, si.ID_EXERCICIO, s.DATA_SESSAO "
+
+_SQL_REGISTRA = (
+    _INSERT + _AGREGADO
+    + "FROM SESSAO s JOIN SESSAO_ITEM si ON si.ID_SESSAO = s.ID_SESSAO "
+    f"WHERE s.ID_SESSAO IN (SELECT value FROM json_each(?)) AND {_CONTA} " + _GRUPO
+    + _UPSERT
+)
+_SQL_CHAVES = (
+    "SELECT DISTINCT s.ID_ALUNO, si.ID_EXERCICIO, s.DATA_SESSAO "
+    "FROM {schema}.SESSAO s JOIN {schema}.SESSAO_ITEM si ON si.ID_SESSAO = s.ID_SESSAO "
+    "WHERE s.ID_SESSAO IN (SELECT value FROM json_each(?))"
+)
+# Chaves pedidas como lista JSON de [aluno, exercício, data]. CROSS JOIN fixa a ordem:
+# chave -> sessões do dia (idx_sessao_aluno) -> itens da sessão; sem isso o planejador
+# prefere varrer todos os itens do exercício
+_SQL_AGREGA = (
+    _AGREGADO
+    + "FROM json_each(?) k "
+    "CROSS JOIN {schema}.SESSAO s ON s.ID_ALUNO = json_extract(k.value, '$[0]') "
+    "AND s.DATA_SESSAO = json_extract(k.value, '$[2]') "
+    "CROSS JOIN {schema}.SESSAO_ITEM si ON si.ID_SESSAO = s.ID_SESSAO AND si.ID_EXERCICIO = json_extract(k.value, '$[1]') "
+    f"WHERE {_CONTA} " + _GRUPO
+)
+_SQL_AGREGA_TUDO = (
+    _AGREGADO + "FROM {schema}.SESSAO s JOIN {schema}.SESSAO_ITEM si ON si.ID_SESSAO = s.ID_SESSAO "
+    f"WHERE {_CONTA} " + _GRUPO
+)
+_SQL_GRAVA = (
+    "INSERT OR REPLACE INTO PROGRESSAO (ID_ALUNO, ID_EXERCICIO, DATA_SESSAO, PESO_MAX, VOLUME, RM_ESTIMADO) "
+    "VALUES (?,?,?,?,?,?)"
+)
+_SQL_SOMA = _INSERT + "VALUES (?,?,?,?,?,?) " + _UPSERT
+_SQL_REMOVE = "DELETE FROM PROGRESSAO WHERE ID_ALUNO = ? AND ID_EXERCICIO = ? AND DATA_SESSAO = ?"
+_SQL_REMOVE_ALUNO = "DELETE FROM PROGRESSAO WHERE ID_ALUNO = ?"
+
+_SQL_EXERCICIOS = (
+    "SELECT p.ID_EXERCICIO, e.NOME, e.GRUPO, COUNT(*), MAX(p.DATA_SESSAO), MAX(p.RM_ESTIMADO) "
+    "FROM PROGRESSAO p JOIN EXERCICIO e ON e.ID_EXERCICIO = p.ID_EXERCICIO "
+    "WHERE p.ID_ALUNO = ? GROUP BY p.ID_EXERCICIO ORDER BY e.GRUPO, e.NOME"
+)
+# Os últimos ``limite`` dias, devolvidos em ordem cronológica
+_SQL_SERIE = (
+    "SELECT * FROM (SELECT DATA_SESSAO, PESO_MAX, VOLUME, RM_ESTIMADO FROM PROGRESSAO "
+    "WHERE ID_ALUNO = ? AND ID_EXERCICIO = ? ORDER BY DATA_SESSAO DESC LIMIT ?) ORDER BY DATA_SESSAO"
+)
+
+QUERIES = [
+    ("progressao.exercises", _SQL_EXERCICIOS, (0,)),
+    ("progressao.series", _SQL_SERIE, (0, 0, 100)),
+]
+
+
+def registrar(conn, ids_sessao):
+    """Soma à progressão as sessões recém-gravadas, na mesma transação que as gravou."""
+    conn.execute(_SQL_REGISTRA, (json.dumps(list(ids_sessao)),))
+
+
+def chaves(conn, ids_sessao, schema="main"):
+    """Chaves (aluno, exercício, data) tocadas pelas sessões; leia antes de apagá-las."""
+    return conn.execute(_SQL_CHAVES.format(schema=schema), (json.dumps(list(ids_sessao)),)).fetchall()
+
+
+def agregados(conn, keys, schema="main"):
+    """Linhas de PROGRESSAO das chaves dadas, calculadas a partir dos itens de ``schema``."""
+    keys = list({tuple(k) for k in keys})
+    if not keys:
+        return []
+    return conn.execute(_SQL_AGREGA.format(schema=schema), (json.dumps(keys),)).fetchall()
+
+
+def agregados_todos(conn, schema):
+    """Todas as linhas de PROGRESSAO que os itens de ``schema`` produzem (arquivo morto)."""
+    return conn.execute(_SQL_AGREGA_TUDO.format(schema=schema)).fetchall()
+
+
+def somar(conn, rows):
+    """Junta linhas calculadas em outro lugar (arquivos) às que já estão na tabela."""
+    conn.executemany(_SQL_SOMA, rows)
+
+
+def recalcular(conn, keys, extra=()):
+    """Refaz as chaves a partir do banco principal (mais ``extra``) depois que sessões saíram.
+
+    Chaves que ficaram sem nenhum item são removidas da tabela.
+    """
+    keys = {tuple(k) for k in keys}
+    rows = agregados(conn, keys)
+    conn.executemany(_SQL_GRAVA, rows)
+    restantes = {tuple(r[:3]) for r in rows}
+    conn.executemany(_SQL_REMOVE, [k for k in keys if k not in restantes])
+    somar(conn, extra)
+
+
+def remover_aluno(conn, id_aluno):
+    conn.execute(_SQL_REMOVE_ALUNO, (id_aluno,))
+
+
+def reconstruir(conn, extra=()):
+    """Refaz a tabela inteira a partir do banco principal (mais ``extra``); devolve o nº de linhas."""
+    conn.execute("DELETE FROM PROGRESSAO")
+    conn.execute(_INSERT + _SQL_AGREGA_TUDO.format(schema="main"))
+    somar(conn, extra)
+    return conn.execute("SELECT COUNT(*) FROM PROGRESSAO").fetchone()[0]
+
+
+class ProgressaoRepository(Repository):
+    """Leituras da tela de progressão: só a tabela PROGRESSAO, nunca SESSAO_ITEM."""
+
+    def exercises(self, id_aluno):
+        """Exercícios com histórico de carga do aluno, com nº de dias, último treino e melhor 1RM."""
+        return self._fetchall(_SQL_EXERCICIOS, (id_aluno,), ProgressaoExercicio)
+
+    def series(self, id_aluno, id_exercicio, limit=100):
+        """Pontos (data, peso máximo, volume, 1RM estimado) dos últimos ``limit`` dias, do mais antigo ao mais novo."""
+        return self._fetchall(_SQL_SERIE, (id_aluno, id_exercicio, limit), ProgressaoPonto)
@@ -0,0 +1,233 @@
+import sqlite3
+from datetime import date
+from typing import NamedTuple, Optional, Sequence
+
+from app import db
+from app.config import REPORT_PAGE_SIZE
+from app.repo import progressao
+from app.repo.base import Repository, match_expression
+
+
+class SessaoResumo(NamedTuple):
+    id_sessao: int
+    data_sessao: str
+    aluno: str
+    plano: str
+
+
+class SessaoItem(NamedTuple):
+    nome: str
+    grupo: str
+    feito: int
+    series_feitas: Optional[int]
+    reps_media: Optional[int]
+    peso_media: Optional[float]
+    obs: Optional[str]
+
+
+# Sessões de aluno ou plano excluído somem já no join; o purgador as apaga depois.
+# Paginação por chave (keyset) em (DATA_SESSAO DESC, ID_SESSAO DESC), índice idx_sessao_data_id.
+# Parâmetros: data e id da última linha já exibida, limite.
+_SQL_PAGE = (
+    "SELECT s.ID_SESSAO, s.DATA_SESSAO, a.NOME, p.NOME FROM SESSAO s "
+    "JOIN ALUNO a ON a.ID_ALUNO = s.ID_ALUNO AND a.DELETADO = 0 "
+    "JOIN PLANO p ON p.ID_PLANO = s.ID_PLANO AND p.DELETADO = 0 "
+    "WHERE (s.DATA_SESSAO, s.ID_SESSAO) < (?, ?) "
+    "ORDER BY s.DATA_SESSAO DESC, s.ID_SESSAO DESC LIMIT ?"
+)
+_SQL_PAGE_SEARCH = (
+    "SELECT s.ID_SESSAO, s.DATA_SESSAO, a.NOME, p.NOME FROM SESSAO s "
+    "JOIN ALUNO a ON a.ID_ALUNO = s.ID_ALUNO AND a.DELETADO = 0 "
+    "JOIN PLANO p ON p.ID_PLANO = s.ID_PLANO AND p.DELETADO = 0 "
+    "WHERE s.ID_ALUNO IN (SELECT rowid FROM ALUNO_FTS WHERE ALUNO_FTS MATCH ?) "
+    "AND (s.DATA_SESSAO, s.ID_SESSAO) < (?, ?) "
+    "ORDER BY s.DATA_SESSAO DESC, s.ID_SESSAO DESC LIMIT ?"
+)
+# Exportação: sessão + itens em ordem de ID (sem ordenação temporária), LEFT JOIN mantém sessões sem itens.
+# Fica fora de QUERIES: a varredura completa de SESSAO é intencional e o consultor a apontaria.
+EXPORT_COLUMNS = (
+    "id_sessao", "data_sessao", "id_aluno", "aluno", "id_plano", "plano", "id_item", "id_exercicio",
+    "exercicio", "grupo", "feito", "series_feitas", "reps_media", "peso_media", "obs",
+)
+_EXPORT_SELECT = (
+    "SELECT s.ID_SESSAO, s.DATA_SESSAO, s.ID_ALUNO, a.NOME, s.ID_PLANO, p.NOME, si.ID_ITEM, si.ID_EXERCICIO, "
+    "e.NOME, e.GRUPO, si.FEITO, si.SERIES_FEITAS, si.REPS_MEDIA, si.PESO_MEDIA, si.OBS FROM SESSAO s "
+    "JOIN ALUNO a ON a.ID_ALUNO = s.ID_ALUNO AND a.DELETADO = 0 "
+    "JOIN PLANO p ON p.ID_PLANO = s.ID_PLANO AND p.DELETADO = 0 "
+    "LEFT JOIN SESSAO_ITEM si ON si.ID_SESSAO = s.ID_SESSAO "
+    "LEFT JOIN EXERCICIO e ON e.ID_EXERCICIO = si.ID_EXERCICIO "
+)
+_SQL_EXPORT = _EXPORT_SELECT + "ORDER BY s.ID_SESSAO, si.ID_ITEM"
+# "+s.ID_ALUNO" tira idx_sessao_aluno do plano: SESSAO é lida em ordem de ID_SESSAO e o
+# filtro FTS vira uma lista materializada; sem o "+" o SQLite busca por aluno e ordena
+# o resultado inteiro num B-tree temporário antes de entregar a primeira linha
+_SQL_EXPORT_SEARCH = (
+    _EXPORT_SELECT + "WHERE +s.ID_ALUNO IN (SELECT rowid FROM ALUNO_FTS WHERE ALUNO_FTS MATCH ?) "
+    "ORDER BY s.ID_SESSAO, si.ID_ITEM"
+)
+# Cursor anterior a qualquer sessão: a primeira página usa o mesmo SQL das demais
+FIRST_PAGE = ("9999-12-31", 2 ** 63 - 1)
+_SQL_ITEMS = (
+    "SELECT e.NOME, e.GRUPO, si.FEITO, si.SERIES_FEITAS, si.REPS_MEDIA, si.PESO_MEDIA, si.OBS "
+    "FROM SESSAO_ITEM si JOIN EXERCICIO e ON e.ID_EXERCICIO = si.ID_EXERCICIO "
+    "WHERE si.ID_SESSAO = ? ORDER BY si.ID_ITEM"
+)
+_SQL_COUNT = "SELECT TOTAL FROM STATS WHERE TABELA = 'SESSAO'"  # mantido por gatilho
+_SQL_INSERT = "INSERT INTO SESSAO (ID_ALUNO, ID_PLANO, DATA_SESSAO) VALUES (?,?,?)"
+# Aluno/plano excluído (DELETADO <> 0) não recebe sessão: o purgador pode já ter passado por ele
+_SQL_ALUNO_ATIVO = "SELECT 1 FROM ALUNO WHERE ID_ALUNO = ? AND DELETADO = 0"
+_SQL_PLANO_ATIVO = "SELECT 1 FROM PLANO WHERE ID_PLANO = ? AND DELETADO = 0"
+_SQL_INSERT_ITEM = (
+    "INSERT INTO SESSAO_ITEM (ID_SESSAO, ID_EXERCICIO, FEITO, SERIES_FEITAS, REPS_MEDIA, PESO_MEDIA, OBS) "
+    "VALUES (?,?,?,?,?,?,?)"
+)
+_SQL_DELETE = "DELETE FROM SESSAO WHERE ID_SESSAO = ?"
+
+QUERIES = [
+    ("sessoes.search_page", _SQL_PAGE, (*FIRST_PAGE, REPORT_PAGE_SIZE)),
+    ("sessoes.search_page (filtro)", _SQL_PAGE_SEARCH, ('"a"*', *FIRST_PAGE, REPORT_PAGE_SIZE)),
+    ("sessoes.items", _SQL_ITEMS, (0,)),
+    ("sessoes.count", _SQL_COUNT, ()),
+    ("sessoes.create", _SQL_INSERT, (0, 0, "2000-01-01")),
+    ("sessoes.create (aluno ativo)", _SQL_ALUNO_ATIVO, (0,)),
+    ("sessoes.create (plano ativo)", _SQL_PLANO_ATIVO, (0,)),
+    ("sessoes.create (item)", _SQL_INSERT_ITEM, (0, 0, 1, 3, 10, 20.0, None)),
+    ("sessoes.delete", _SQL_DELETE, (0,)),
+]
+
+
+class NovaSessao(NamedTuple):
+    """Sessão a gravar; ``itens`` são ``(id_exercicio, feito, series, reps, peso, obs)``."""
+    id_aluno: int
+    id_plano: int
+    data_sessao: str
+    itens: Sequence[tuple]
+
+
+def _validar(sessoes):
+    """Confere todas as sessões antes de gravar; junta os problemas num único ValueError."""
+    problemas = []
+    for n, (id_aluno, id_plano, data_sessao, itens) in enumerate(sessoes, 1):
+        try:
+            date.fromisoformat(data_sessao)
+        except (TypeError, ValueError):
+            problemas.append(f"sessão {n}: data inválida {data_sessao!r} (AAAA-MM-DD)")
+        for k, item in enumerate(itens, 1):
+            if len(item) != 6:
+                problemas.append(f"sessão {n}, item {k}: esperado 6 campos, veio {len(item)}")
+                continue
+            _, feito, series, reps, peso, _ = item
+            if feito not in (0, 1):
+                problemas.append(f"sessão {n}, item {k}: FEITO deve ser 0 ou 1")
+            for nome, v in (("séries", series), ("reps", reps), ("peso", peso)):
+                if v is None:
+                    continue
+                # bool é subclasse de int: True viraria 1 série sem aviso
+                if isinstance(v, bool) or not isinstance(v, (int, float)):
+                    problemas.append(f"sessão {n}, item {k}: {nome} deve ser numérico, veio {v!r}")
+                elif v < 0:
+                    problemas.append(f"sessão {n}, item {k}: {nome} negativo")
+    if problemas:
+        raise ValueError("; ".join(problemas))
+
+
+def _checar_ativos(conn, sessoes):
+    """Recusa sessões de aluno ou plano excluído: o purgador apagaria a sessão sem refazer a progressão."""
+    problemas = [f"aluno {i} excluído ou inexistente" for i in sorted({s.id_aluno for s in sessoes})
+                 if not conn.execute(_SQL_ALUNO_ATIVO, (i,)).fetchone()]
+    problemas += [f"plano {i} excluído ou inexistente" for i in sorted({s.id_plano for s in sessoes})
+                  if not conn.execute(_SQL_PLANO_ATIVO, (i,)).fetchone()]
+    if problemas:
+        raise sqlite3.IntegrityError("; ".join(problemas))
+
+
+class SessaoRepository(Repository):
+    def search(self, text="", limit=REPORT_PAGE_SIZE):
+        """As ``limit`` sessões mais recentes (do aluno filtrado); as demais vêm por ``search_page``."""
+        return self.search_page(text, None, limit)
+
+    def search_page(self, text="", after=None, limit=REPORT_PAGE_SIZE):
+        """Próxima página do relatório, das sessões mais recentes para as mais antigas.
+
+        ``after`` é o cursor ``(data_sessao, id_sessao)`` da última linha recebida
+        (``None`` na primeira página); o custo não depende de quantas páginas já
+        foram lidas. Uma página com menos de ``limit`` linhas é a última.
+        """
+        after = after or FIRST_PAGE
+        expr = match_expression(text)
+        if expr:
+            return self._fetchall(_SQL_PAGE_SEARCH, (expr, *after, limit), SessaoResumo)
+        return self._fetchall(_SQL_PAGE, (*after, limit), SessaoResumo)
+
+    @staticmethod
+    def cursor(row):
+        """Cursor de paginação a partir da última linha de uma página."""
+        return (row.data_sessao, row.id_sessao)
+
+    def iter_export(self, text="", batch_size=1000):
+        """Gera blocos de até ``batch_size`` linhas sessão+item (colunas em ``EXPORT_COLUMNS``).
+
+        Um único cursor percorre o join com ``fetchmany``: a memória não cresce
+        com o tamanho do histórico. A leitura usa uma conexão própria, só de
+        leitura e fora do pool (a exportação pode levar minutos), fechada quando
+        o gerador termina (ou é fechado).
+        """
+        expr = match_expression(text)
+        sql, params = (_SQL_EXPORT_SEARCH, (expr,)) if expr else (_SQL_EXPORT, ())
+        conn = self._conn or db.get_readonly_conn()
+        try:
+            cur = conn.execute(sql, params)
+            try:
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cur.close()
+        finally:
+            if conn is not self._conn:
+                conn.close()
+
+    def items(self, id_sessao):
+        return self._fetchall(_SQL_ITEMS, (id_sessao,), SessaoItem)
+
+    def count(self):
+        return self._scalar(_SQL_COUNT)
+
+    def create(self, id_aluno, id_plano, data_sessao, itens):
+        """Grava a sessão e seus itens ``(id_exercicio, feito, series, reps, peso, obs)``."""
+        return self.save_sessions([NovaSessao(id_aluno, id_plano, data_sessao, itens)])[0]
+
+    def save_sessions(self, sessoes):
+        """Grava várias sessões (``NovaSessao`` ou tuplas equivalentes) numa única transação.
+
+        Tudo é validado antes de abrir a transação; os itens de todas as
+        sessões vão num só ``executemany``. Devolve os IDs na ordem recebida.
+        Se qualquer linha falhar no banco, nada é gravado. Aluno ou plano
+        excluído (ou inexistente) levanta ``sqlite3.IntegrityError``.
+        """
+        sessoes = [NovaSessao(*s) for s in sessoes]
+        _validar(sessoes)
+
+        def _save(conn):
+            # No job da thread de escrita: nenhuma exclusão entra entre a checagem e o INSERT
+            _checar_ativos(conn, sessoes)
+            cur = conn.cursor()
+            ids, linhas = [], []
+            for s in sessoes:
+                cur.execute(_SQL_INSERT, (s.id_aluno, s.id_plano, s.data_sessao))
+                ids.append(cur.lastrowid)
+                linhas.extend((cur.lastrowid, *item) for item in s.itens)
+            cur.executemany(_SQL_INSERT_ITEM, linhas)
+            progressao.registrar(conn, ids)
+            return ids
+        return self._write(_save)
+
+    def delete(self, id_sessao):
+        """Apaga a sessão e recalcula a progressão dos dias que ela tocava."""
+        def _delete(conn):
+            keys = progressao.chaves(conn, [id_sessao])
+            conn.execute(_SQL_DELETE, (id_sessao,))
+            progressao.recalcular(conn, keys)
+        self._write(_delete)
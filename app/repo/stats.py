@@ -0,0 +1,18 @@
+from app.repo.base import Repository
+
+_SQL_TOTALS = "SELECT TABELA, TOTAL FROM STATS"
+
+QUERIES = [
+    ("stats.totals", _SQL_TOTALS, ()),
+]
+
+
+class StatsRepository(Repository):
+    """Contadores por tabela mantidos pelos gatilhos da migração 005."""
+
+    def totals(self):
+        """Dicionário ``{tabela: total}`` lido numa única consulta."""
+        return dict(self._fetchall(_SQL_TOTALS))
+
+    def total(self, tabela):
+        return self.totals().get(tabela, 0)
@@ -0,0 +1,283 @@
+"""Instrumentação das consultas: latência, linhas e quem chamou cada statement.
+
+``TracingConnection`` é passada como ``factory`` do ``sqlite3.connect`` em
+``db._connect``. Todo statement vira um registro com o tempo total (execute
+mais os fetch), as linhas lidas (ou afetadas) e a função que o disparou.
+Os registros alimentam um histograma por statement (p50/p95/p99) e, acima
+de ``DB_SLOW_MS``, o log de consultas lentas.
+
+O registro é fechado quando o cursor se esgota, é reutilizado, fechado ou
+coletado; quem lê só a primeira linha (``fetchone``) conta o tempo até ali.
+"""
+import atexit
+import json
+import math
+import re
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+from .config import DB_SLOW_LOG, DB_SLOW_MS, DB_TRACE_DUMP
+
+# Frames destes módulos são encanamento: o chamador é o primeiro frame fora deles
+_INFRA = {"app.tracing", "app.db", "app.repo.base", "app.repo.aio", "contextlib", "threading", "concurrent.futures.thread"}
+
+_SPACES_RE = re.compile(r"\s+")
+# Listas de placeholders montadas em tempo de execução (IN (?, ?, ?)) viram um statement só
+_PLACEHOLDERS_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+
+# Histograma logarítmico: 4 baldes por potência de 2, de 1 µs a ~1000 s
+_BUCKETS_PER_OCTAVE = 4
+_MAX_BUCKET = 30 * _BUCKETS_PER_OCTAVE
+
+QueryStats = namedtuple("QueryStats", "sql calls rows total_ms p50_ms p95_ms p99_ms max_ms callers")
+
+
+@lru_cache(maxsize=1024)  # o SQL dos repositórios é constante: normaliza uma vez por texto
+def normalize(sql):
+    return _PLACEHOLDERS_RE.sub("?, ...", _SPACES_RE.sub(" ", sql).strip())
+
+
+# Quantos frames acima do chamador procurar a view de origem
+_VIEW_DEPTH = 8
+_callers = {}
+
+
+def caller():
+    """'modulo:funcao:linha' de quem disparou o statement; a view que originou a chamada vem na frente."""
+    f = sys._getframe(1)
+    while f is not None and f.f_globals.get("__name__") in _INFRA:
+        f = f.f_back
+    if f is None:
+        return "?"
+    v = f
+    for _ in range(_VIEW_DEPTH):
+        if v is None or v.f_globals.get("__name__", "").startswith("app.ui."):
+            break
+        v = v.f_back
+    else:
+        v = None
+    key = (f.f_code, f.f_lineno, v.f_code if v is not None else None)
+    nome = _callers.get(key)
+    if nome is None:
+        nome = f"{f.f_globals.get('__name__', '?')}:{f.f_code.co_name}:{f.f_lineno}"
+        if v is not None and v is not f:
+            nome = f"{v.f_globals['__name__']}:{v.f_code.co_name} > {nome}"
+        _callers[key] = nome
+    return nome
+
+
+class Histogram:
+    """Contagem por faixas logarítmicas de latência; percentis com erro de até ~19%."""
+
+    __slots__ = ("counts", "calls", "rows", "total", "max", "callers")
+
+    def __init__(self):
+        self.counts = [0] * (_MAX_BUCKET + 1)
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.callers = {}
+
+    def add(self, seconds, rows, quem):
+        us = seconds * 1e6
+        i = 0 if us <= 1 else min(_MAX_BUCKET, int(math.log2(us) * _BUCKETS_PER_OCTAVE) + 1)
+        self.counts[i] += 1
+        self.calls += 1
+        self.rows += rows
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.callers[quem] = self.callers.get(quem, 0) + 1
+
+    def percentile(self, p):
+        """Limite superior (ms) da faixa onde cai o percentil ``p`` (0-100)."""
+        alvo = max(1, math.ceil(self.calls * p / 100.0))
+        acumulado = 0
+        for i, n in enumerate(self.counts):
+            acumulado += n
+            if acumulado >= alvo:
+                return min(2 ** (i / _BUCKETS_PER_OCTAVE), self.max * 1e6) / 1000.0
+        return self.max * 1000.0
+
+
+class Tracer:
+    """Agrega os registros de todas as conexões do processo."""
+
+    def __init__(self, slow_ms=DB_SLOW_MS, slow_log=DB_SLOW_LOG):
+        self.slow_ms = slow_ms
+        self.slow_log = slow_log
+        self._lock = threading.Lock()
+        self._stats = {}
+        # Seções extras do relatório: nome -> função que devolve um dict (ex.: cache de consultas)
+        self.extras = {}
+
+    def record(self, sql, seconds, rows, quem):
+        key = normalize(sql)
+        with self._lock:
+            hist = self._stats.get(key)
+            if hist is None:
+                hist = self._stats[key] = Histogram()
+            hist.add(seconds, rows, quem)
+        if self.slow_ms is not None and seconds * 1000.0 >= self.slow_ms:
+            self._slow(key, seconds, rows, quem)
+
+    def _slow(self, sql, seconds, rows, quem):
+        linha = f"{datetime.now():%Y-%m-%d %H:%M:%S}  {seconds * 1000:9.1f} ms  {rows:>8} linhas  {quem}  {sql}\n"
+        print(f"[DB] Consulta lenta ({seconds * 1000:.0f} ms, {quem}): {sql[:120]}", flush=True)
+        if self.slow_log:
+            try:
+                with self._lock, open(self.slow_log, "a", encoding="utf-8") as fh:
+                    fh.write(linha)
+            except OSError:
+                pass
+
+    def report(self, top=None):
+        """``QueryStats`` por statement, do maior tempo total para o menor."""
+        with self._lock:
+            itens = [
+                QueryStats(
+                    sql, h.calls, h.rows, h.total * 1000.0,
+                    h.percentile(50), h.percentile(95), h.percentile(99), h.max * 1000.0,
+                    sorted(h.callers, key=h.callers.get, reverse=True),
+                )
+                for sql, h in self._stats.items()
+            ]
+        itens.sort(key=lambda q: q.total_ms, reverse=True)
+        return itens[:top] if top else itens
+
+    def dump(self, path):
+        """Grava o relatório em JSON (lido por ``python -m app consultas``)."""
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "gerado_em": datetime.now().isoformat(timespec="seconds"),
+                    "consultas": [q._asdict() for q in self.report()],
+                    **{nome: fn() for nome, fn in self.extras.items()},
+                },
+                fh, ensure_ascii=False, indent=1,
+            )
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+tracer = Tracer()
+
+
+class TracingCursor(sqlite3.Cursor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trace = None
+
+    def _start(self, sql, inicio):
+        self._finish()
+        if self.description is None:
+            # INSERT/UPDATE/DELETE/DDL: terminou no execute
+            tracer.record(sql, time.perf_counter() - inicio, max(self.rowcount, 0), caller())
+        else:
+            self._trace = [sql, time.perf_counter() - inicio, 0, caller()]
+        return self
+
+    def _finish(self):
+        trace, self._trace = self._trace, None
+        if trace is not None:
+            tracer.record(*trace)
+
+    def _fetched(self, inicio, n, fim):
+        trace = self._trace
+        if trace is not None:
+            trace[1] += time.perf_counter() - inicio
+            trace[2] += n
+            if fim:
+                self._finish()
+
+    def execute(self, sql, parameters=()):
+        inicio = time.perf_counter()
+        super().execute(sql, parameters)
+        return self._start(sql, inicio)
+
+    def executemany(self, sql, seq_of_parameters):
+        inicio = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        return self._start(sql, inicio)
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(inicio, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        inicio = time.perf_counter()
+        size = self.arraysize if size is None else size
+        rows = super().fetchmany(size)
+        self._fetched(inicio, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(inicio, len(rows), True)
+        return rows
+
+    def __next__(self):
+        inicio = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(inicio, 0, True)
+            raise
+        self._fetched(inicio, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class TracingConnection(sqlite3.Connection):
+    """Conexão cujos cursores registram cada statement no ``tracer``."""
+
+    def cursor(self, factory=TracingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+_dump = {"atexit": None, "sinal": None}  # caminhos já instalados (uma vez por processo)
+_dump_lock = threading.Lock()
+
+
+def install_dump(path=DB_TRACE_DUMP):
+    """Grava o relatório em ``path`` ao sair do processo e, onde existe, ao receber SIGUSR1.
+
+    Idempotente: cada página do Flet chama de novo e nada é registrado duas
+    vezes. O sinal só pode ser instalado na thread principal (o Flet roda o
+    ``main`` da página numa thread de trabalho); por isso os pontos de entrada
+    chamam esta função antes de ``ft.app``.
+    """
+    with _dump_lock:
+        if _dump["atexit"] is None:
+            atexit.register(tracer.dump, path)
+            _dump["atexit"] = path
+        if (_dump["sinal"] is None and hasattr(signal, "SIGUSR1")
+                and threading.current_thread() is threading.main_thread()):
+            signal.signal(signal.SIGUSR1, lambda *_: tracer.dump(path))
+            _dump["sinal"] = path
+        return _dump["atexit"]
@@ -1,3 +1,4 @@
+import asyncio
 import flet as ft
 from app.config import Theme
 
@@ -138,3 +139,214 @@ def snack(page: ft.Page, msg: str, error: bool = False):
     )
     page.snack_bar.open = True
     page.update()
+
+
+def dispatch(page: ft.Page, fn, *args):
+    # Chama fn; se for corrotina, agenda no event loop da página em vez de bloquear
+    if asyncio.iscoroutinefunction(fn):
+        return page.run_task(fn, *args)
+    return fn(*args)
+
+
+def loading_bar(width=None) -> ft.ProgressBar:
+    # Barra indeterminada exibida enquanto a tela espera o banco
+    return ft.ProgressBar(width=width, visible=False)
+
+
+def import_dialog(page: ft.Page, kind: str, on_done=None):
+    # Diálogo de importação de CSV (alunos/exercícios): escolhe o arquivo, mostra progresso e erros.
+    # No desktop o arquivo é lido de onde estiver; no modo web ele é enviado (upload) para IMPORT_DIR
+    # e só arquivos de lá são importados: o cliente nunca aponta um caminho do servidor.
+    import os
+    from datetime import datetime
+    from app.config import IMPORT_DIR
+    from app.importer import import_csv, summary, MAX_ERRORS_KEPT
+    from app.utils import arquivo_em
+
+    web = bool(page.web)
+    titulo = "Importar alunos (CSV)" if kind == "alunos" else "Importar exercícios (CSV)"
+    colunas = "nome; data_nasc (DD/MM/AAAA); altura_m; peso_kg" if kind == "alunos" else "nome; grupo"
+    caminho = ft.TextField(label="Arquivo CSV", expand=1,
+                           helper_text="Envie o arquivo (pasta ao lado) ou informe um nome já enviado" if web else None)
+    progresso = ft.ProgressBar(visible=False)
+    info = ft.Text(f"Colunas: {colunas}", size=12)
+    erros = ft.ListView(spacing=2, height=180)
+
+    def escolhido(e: ft.FilePickerResultEvent):
+        if not e.files:
+            return
+        if not web and e.files[0].path:
+            caminho.value = e.files[0].path
+            page.update()
+            return
+        # Web: o nome no servidor é do app, não do cliente
+        os.makedirs(IMPORT_DIR, exist_ok=True)
+        nome = f"{kind}_{datetime.now():%Y%m%d_%H%M%S}.csv"
+        try:
+            url = page.get_upload_url(nome, 600)
+        except Exception as ex:
+            info.value = f"Envio indisponível: {ex}"; page.update(); return
+        caminho.value = ""
+        info.value = f"Enviando {e.files[0].name}..."
+        btn_importar.disabled = True
+        page.update()
+        picker.data = nome
+        picker.upload([ft.FilePickerUploadFile(e.files[0].name, upload_url=url)])
+
+    def enviado(e: ft.FilePickerUploadEvent):
+        if e.error:
+            info.value = f"Falha no envio: {e.error}"
+            btn_importar.disabled = False
+        elif e.progress is not None and e.progress >= 1:
+            caminho.value = picker.data
+            info.value = f"Arquivo enviado. Colunas: {colunas}"
+            btn_importar.disabled = False
+        page.update()
+
+    picker = ft.FilePicker(on_result=escolhido, on_upload=enviado)
+    page.overlay.append(picker)
+
+    def fechar(_=None):
+        dlg.open = False
+        if picker in page.overlay:
+            page.overlay.remove(picker)
+        page.update()
+
+    def importar(_):
+        if not (caminho.value or "").strip():
+            info.value = "Informe o arquivo."; page.update(); return
+        try:
+            origem = arquivo_em(IMPORT_DIR, caminho.value) if web else caminho.value.strip()
+        except ValueError as ex:
+            info.value = str(ex); page.update(); return
+        btn_importar.disabled = True
+        progresso.visible = True
+        erros.controls.clear()
+        info.value = "Importando..."
+        page.update()
+
+        def andamento(lidas, inseridas, total_erros):
+            info.value = f"{lidas} lidas, {inseridas} gravadas, {total_erros} com erro..."
+            page.update()
+
+        try:
+            result = import_csv(origem, kind, progress=andamento)
+        except Exception as ex:
+            info.value = f"Falha na importação: {ex}"
+        else:
+            info.value = summary(result)
+            for linha, msg in result.erros[:MAX_ERRORS_KEPT]:
+                erros.controls.append(ft.Text(f"Linha {linha}: {msg}", size=12, color=ft.Colors.RED_300))
+            if on_done and result.inseridas:
+                on_done()
+        finally:
+            btn_importar.disabled = False
+            progresso.visible = False
+            page.update()
+
+    btn_importar = ft.ElevatedButton("Importar", icon=ft.Icons.UPLOAD_FILE, on_click=importar)
+    dlg = ft.AlertDialog(
+        modal=True,
+        title=ft.Text(titulo),
+        content=ft.Container(
+            width=min(560, max(300, int(page.width or 360) - 32)),
+            content=ft.Column(
+                tight=True,
+                spacing=10,
+                controls=[
+                    ft.Row([
+                        caminho,
+                        ft.IconButton(icon=ft.Icons.FOLDER_OPEN, tooltip="Escolher arquivo",
+                                      on_click=lambda e: picker.pick_files(allowed_extensions=["csv", "txt"])),
+                    ]),
+                    info,
+                    progresso,
+                    erros,
+                ],
+            ),
+        ),
+        actions=[btn_importar, ft.TextButton("Fechar", on_click=fechar)],
+    )
+    page.dialog = dlg
+    dlg.open = True
+    page.update()
+
+
+def export_dialog(page: ft.Page, filtro: str = ""):
+    # Diálogo de exportação do histórico (sessões + itens) para CSV/JSONL, com gzip opcional
+    from datetime import datetime
+    from app.config import EXPORT_DIR
+    from app.exporter import export_sessions, summary
+    from app.utils import arquivo_em
+
+    extensoes = {"csv": ".csv", "csv.gz": ".csv.gz", "jsonl": ".jsonl", "jsonl.gz": ".jsonl.gz"}
+    nome_base = f"sessoes_{datetime.now():%Y%m%d_%H%M}"
+    formato = ft.Dropdown(
+        label="Formato", width=200, value="csv",
+        options=[
+            ft.dropdown.Option(key="csv", text="CSV"),
+            ft.dropdown.Option(key="csv.gz", text="CSV (gzip)"),
+            ft.dropdown.Option(key="jsonl", text="JSON Lines"),
+            ft.dropdown.Option(key="jsonl.gz", text="JSON Lines (gzip)"),
+        ],
+    )
+    # Só o nome: o arquivo sempre vai para EXPORT_DIR (no modo web quem digita é o cliente)
+    caminho = ft.TextField(label="Nome do arquivo", value=nome_base + ".csv", expand=1,
+                           helper_text=f"Salvo em {EXPORT_DIR}")
+    progresso = ft.ProgressBar(visible=False)
+    info = ft.Text(f"Filtro do relatório: {filtro}" if filtro else "Todas as sessões, com os itens de cada uma.", size=12)
+
+    def trocar_formato(_):
+        base = caminho.value or nome_base
+        for ext in sorted(extensoes.values(), key=len, reverse=True):
+            if base.endswith(ext):
+                base = base[: -len(ext)]
+                break
+        caminho.value = base + extensoes[formato.value]
+        page.update()
+
+    formato.on_change = trocar_formato
+
+    def fechar(_=None):
+        dlg.open = False
+        page.update()
+
+    def exportar(_):
+        if not (caminho.value or "").strip():
+            info.value = "Informe o nome do arquivo."; page.update(); return
+        try:
+            destino = arquivo_em(EXPORT_DIR, caminho.value)
+        except ValueError as ex:
+            info.value = str(ex); page.update(); return
+        btn_exportar.disabled = True
+        progresso.visible = True
+        info.value = "Exportando..."
+        page.update()
+
+        def andamento(linhas):
+            info.value = f"{linhas} linhas exportadas..."
+            page.update()
+
+        try:
+            result = export_sessions(destino, text=filtro, progress=andamento)
+            info.value = summary(result)
+        except Exception as ex:
+            info.value = f"Falha na exportação: {ex}"
+        finally:
+            btn_exportar.disabled = False
+            progresso.visible = False
+            page.update()
+
+    btn_exportar = ft.ElevatedButton("Exportar", icon=ft.Icons.DOWNLOAD, on_click=exportar)
+    dlg = ft.AlertDialog(
+        modal=True,
+        title=ft.Text("Exportar histórico de sessões"),
+        content=ft.Container(
+            width=min(560, max(300, int(page.width or 360) - 32)),
+            content=ft.Column(tight=True, spacing=10, controls=[formato, ft.Row([caminho]), info, progresso]),
+        ),
+        actions=[btn_exportar, ft.TextButton("Fechar", on_click=fechar)],
+    )
+    page.dialog = dlg
+    dlg.open = True
+    page.update()
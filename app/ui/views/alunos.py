@@ -1,11 +1,27 @@
+import threading
+
 import flet as ft
-from app.ui.components import with_bg, set_appbar, snack
-from app.config import Theme
-from app.db import get_conn
+from app.ui.components import with_bg, set_appbar, snack, dispatch, loading_bar, import_dialog
+from app.config import Theme, ALUNO_LIST_WINDOW, ALUNO_PAGE_SIZE, SEARCH_LIMIT
+from app.repo import AlunoRepository, AsyncRepository
 from app.utils import validar_data_brasil, sqlite_para_brasileiro, calcular_imc
 
+# Altura fixa de cada linha (card + margem): o ListView monta só o que está visível
+# e, ao descartar linhas da janela, a rolagem é corrigida pela altura exata
+ALTURA_LINHA = 76
+
 
 def show_alunos(page: ft.Page, on_back):
+    _montar(page, on_back)()
+
+
+async def show_alunos_async(page: ft.Page, on_back):
+    # Mesma tela, mas as consultas rodam fora do event loop com indicador de carregamento
+    carregar = _montar(page, on_back, assincrono=True)
+    await carregar()
+
+
+def _montar(page: ft.Page, on_back, assincrono=False):
     page.clean()
     set_appbar(page, "Alunos", ft.Colors.GREEN_700, show_back=True, on_back=lambda e=None: on_back())
 
@@ -20,7 +36,9 @@ def show_alunos(page: ft.Page, on_back):
 
     busca = ft.TextField(label="Buscar", prefix_icon=ft.Icons.SEARCH, expand=1)
     status = ft.Text("", color=ft.Colors.BLUE_200)
-    lista = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO)
+    carregando = loading_bar(width=240)
+    # Janela deslizante: no máximo ALUNO_LIST_WINDOW linhas montadas, buscadas por chave conforme a rolagem
+    lista = ft.ListView(item_extent=ALTURA_LINHA, on_scroll_interval=100)
 
     def validar_data(_):
         ok, _iso = validar_data_brasil(data.value)
@@ -29,8 +47,12 @@ def show_alunos(page: ft.Page, on_back):
 
     data.on_blur = validar_data
 
-    conn = get_conn()
-    cur = conn.cursor()
+    repo = AlunoRepository()
+    arepo = AsyncRepository(repo) if assincrono else None
+    # cursor/topo = (nome, id) da última/primeira linha montada; topo None = nada descartado acima.
+    # seq descarta respostas de buscas substituídas
+    estado = {"seq": 0, "filtro": "", "cursor": None, "topo": None, "fim": True, "ocupado": False}
+    trava = threading.Lock()  # versão síncrona: os handlers rodam em threads do Flet
 
     def salvar(_):
         if not (nome.value or "").strip():
@@ -50,63 +72,190 @@ def show_alunos(page: ft.Page, on_back):
                 raise ValueError("Peso inválido")
         except Exception:
             snack(page, "Peso deve ser número positivo (ex.: 75.5).", error=True); peso.focus(); return
-        cur.execute("INSERT INTO ALUNO (NOME, DATA_NASC, ALTURA_M, PESO_KG) VALUES (?,?,?,?)", (nome.value.strip(), iso, alt, pes))
-        conn.commit()
+        dados = (nome.value.strip(), iso, alt, pes)
+        if arepo is not None:
+            page.run_task(salvar_async, dados)
+            return
+        repo.insert(*dados)
+        salvo()
+
+    async def salvar_async(dados):
+        try:
+            await arepo.insert(*dados)
+        except Exception as ex:
+            snack(page, f"Erro: {ex}", error=True); return
+        salvo()
+
+    def salvo():
         snack(page, "Aluno cadastrado!")
         nome.value = ""; data.value = ""; altura.value = ""; peso.value = ""; page.update()
-        carregar(busca.value)
+        dispatch(page, carregar, busca.value)
 
-    def carregar(filtro=""):
+    def reiniciar(f):
+        estado.update(seq=estado["seq"] + 1, filtro=f, cursor=None, topo=None, fim=False)
         lista.controls.clear()
-        if filtro:
-            cur.execute("SELECT ID_ALUNO, NOME, DATA_NASC, ALTURA_M, PESO_KG FROM ALUNO WHERE NOME LIKE ? ORDER BY NOME", (f"%{filtro}%",))
+
+    def carregar(f=""):
+        with trava:
+            reiniciar(f)
+            inicio(None if (f or "").strip() else repo.count(), repo.search_page(f))
+
+    def pagina(consulta, aplicar):
+        # Rolagem: se outra página já está vindo, este evento é descartado
+        if not trava.acquire(blocking=False):
+            return
+        try:
+            aplicar(consulta())
+        finally:
+            trava.release()
+
+    def mais():
+        if not estado["fim"]:
+            pagina(lambda: repo.search_page(estado["filtro"], estado["cursor"]), anexar)
+
+    def menos():
+        if estado["topo"] is not None:
+            pagina(lambda: repo.search_page_before(estado["topo"]), preceder)
+
+    async def carregar_async(f=""):
+        reiniciar(f)
+
+        async def primeira():
+            total = None if (f or "").strip() else await arepo.count()
+            return total, await arepo.search_page(f)
+
+        await pagina_async(estado["seq"], primeira, lambda r: inicio(*r))
+
+    async def mais_async():
+        if not (estado["fim"] or estado["ocupado"]):
+            await pagina_async(estado["seq"], lambda: arepo.search_page(estado["filtro"], estado["cursor"]), anexar)
+
+    async def menos_async():
+        if not (estado["topo"] is None or estado["ocupado"]):
+            await pagina_async(estado["seq"], lambda: arepo.search_page_before(estado["topo"]), preceder)
+
+    async def pagina_async(seq, consulta, aplicar):
+        estado["ocupado"] = True
+        carregando.visible = True
+        if not lista.controls:
+            status.value = "Carregando..."
+        page.update()
+        try:
+            rows = await consulta()
+        except Exception as ex:
+            if seq == estado["seq"]:
+                snack(page, f"Erro ao carregar alunos: {ex}", error=True)
+            return
+        finally:
+            if seq == estado["seq"]:
+                estado["ocupado"] = False
+                carregando.visible = False
+        if seq == estado["seq"]:
+            aplicar(rows)
+
+    def rolar(e: ft.OnScrollEvent):
+        if e.pixels >= e.max_scroll_extent - 200:
+            mais()
+        elif e.pixels <= e.min_scroll_extent + 200:
+            menos()
+
+    async def rolar_async(e: ft.OnScrollEvent):
+        if e.pixels >= e.max_scroll_extent - 200:
+            await mais_async()
+        elif e.pixels <= e.min_scroll_extent + 200:
+            await menos_async()
+
+    if assincrono:
+        carregar = carregar_async
+        lista.on_scroll = rolar_async
+    else:
+        lista.on_scroll = rolar
+
+    def inicio(total, rows):
+        # total: contagem do cadastro (sem filtro) ou None (busca, limitada a SEARCH_LIMIT)
+        if not rows:
+            status.value = "Nenhum aluno."
+        elif total is not None:
+            status.value = f"Total: {total}"
+        elif len(rows) >= SEARCH_LIMIT:
+            status.value = f"Mostrando os {len(rows)} mais relevantes – refine a busca."
         else:
-            cur.execute("SELECT ID_ALUNO, NOME, DATA_NASC, ALTURA_M, PESO_KG FROM ALUNO ORDER BY NOME")
-        rows = cur.fetchall()
-        status.value = f"Total: {len(rows)}" if rows else "Nenhum aluno."
-        for aid, anome, dn, alt, pes in rows:
-            data_br = sqlite_para_brasileiro(dn)
-            imc_val, imc_cat, imc_cor = calcular_imc(pes, alt)
-
-            def make_delete_button(aluno_id, aluno_nome):
-                return ft.Container(
-                    padding=6,
-                    content=ft.IconButton(
-                        icon=ft.Icons.DELETE,
-                        icon_color=ft.Colors.RED_400,
-                        icon_size=22,
-                        tooltip="Excluir",
-                        on_click=lambda e: confirmar_exclusao(aluno_id, aluno_nome),
-                    ),
-                )
-
-            linha = ft.Card(
-                elevation=2,
-                content=ft.Container(
-                    padding=12,
-                    content=ft.Row(
-                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                        wrap=True,
-                        run_spacing=6,
-                        controls=[
-                            ft.Text(f"ID: {aid}", width=60 if is_small else 70, weight=ft.FontWeight.BOLD),
-                            ft.Text(anome, expand=True),
-                            ft.Text(f"Nasc: {data_br}", width=120 if is_small else 130),
-                            ft.Text(f"Alt: {'-' if alt is None else f'{alt}m'}", width=80 if is_small else 90),
-                            ft.Text(f"Peso: {'-' if pes is None else f'{pes}kg'}", width=90 if is_small else 100),
-                            ft.Container(
-                                padding=ft.padding.symmetric(horizontal=8, vertical=4),
-                                border_radius=8,
-                                bgcolor=imc_cor,
-                                content=ft.Text(f"IMC: {imc_val} ({imc_cat})", size=11, color=ft.Colors.WHITE),
-                            ),
-                            make_delete_button(aid, anome),
-                        ],
-                    ),
-                ),
-            )
-            lista.controls.append(linha)
+            status.value = f"Total: {len(rows)}"
+        anexar(rows)
+
+    def anexar(rows):
+        # Página seguinte no fim da lista; o excesso sai pelo topo
+        if rows:
+            estado["cursor"] = repo.cursor(rows[-1])
+        estado["fim"] = len(rows) < ALUNO_PAGE_SIZE
+        lista.controls.extend(linha(a) for a in rows)
+        excesso = len(lista.controls) - ALUNO_LIST_WINDOW
+        if excesso > 0:
+            del lista.controls[:excesso]
+            estado["topo"] = lista.controls[0].data
         page.update()
+        if excesso > 0:
+            # O conteúdo subiu excesso linhas: a rolagem acompanha e a tela não pula
+            lista.scroll_to(delta=-excesso * ALTURA_LINHA, duration=0)
+
+    def preceder(rows):
+        # Página anterior (veio em ordem decrescente) no topo da lista; o excesso sai pelo fim
+        rows = rows[::-1]
+        estado["topo"] = repo.cursor(rows[0]) if len(rows) == ALUNO_PAGE_SIZE else None
+        lista.controls[:0] = [linha(a) for a in rows]
+        excesso = len(lista.controls) - ALUNO_LIST_WINDOW
+        if excesso > 0:
+            del lista.controls[-excesso:]
+            estado.update(cursor=lista.controls[-1].data, fim=False)
+        page.update()
+        if rows:
+            lista.scroll_to(delta=len(rows) * ALTURA_LINHA, duration=0)
+
+    def linha(aluno):
+        aid, anome, dn, alt, pes = aluno
+        data_br = sqlite_para_brasileiro(dn)
+        imc_val, imc_cat, imc_cor = calcular_imc(pes, alt)
+        detalhes = f"Nasc: {data_br}   Alt: {'-' if alt is None else f'{alt}m'}   Peso: {'-' if pes is None else f'{pes}kg'}"
+        # Duas linhas de texto em vez de uma Row com quebra: altura fixa em qualquer largura
+        return ft.Card(
+            data=repo.cursor(aluno),
+            elevation=2,
+            margin=ft.margin.only(bottom=6),
+            content=ft.Container(
+                padding=ft.padding.symmetric(horizontal=12, vertical=6),
+                content=ft.Row(
+                    spacing=10,
+                    controls=[
+                        ft.Text(f"ID: {aid}", width=60 if is_small else 70, weight=ft.FontWeight.BOLD),
+                        ft.Column(
+                            spacing=2,
+                            expand=True,
+                            alignment=ft.MainAxisAlignment.CENTER,
+                            controls=[
+                                ft.Text(anome, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+                                ft.Text(detalhes, size=12, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS,
+                                        color=ft.Colors.BLUE_GREY_300),
+                            ],
+                        ),
+                        ft.Container(
+                            padding=ft.padding.symmetric(horizontal=8, vertical=4),
+                            border_radius=8,
+                            bgcolor=imc_cor,
+                            tooltip=imc_cat,
+                            content=ft.Text(f"IMC: {imc_val}" if is_small else f"IMC: {imc_val} ({imc_cat})",
+                                            size=11, color=ft.Colors.WHITE),
+                        ),
+                        ft.IconButton(
+                            icon=ft.Icons.DELETE,
+                            icon_color=ft.Colors.RED_400,
+                            icon_size=22,
+                            tooltip="Excluir",
+                            on_click=lambda e: confirmar_exclusao(aid, anome),
+                        ),
+                    ],
+                ),
+            ),
+        )
 
     def confirmar_exclusao(_id, _nome):
         def fechar_confirmacao(confirmar=False):
@@ -129,31 +278,54 @@ def show_alunos(page: ft.Page, on_back):
         page.update()
 
     def del_aluno(_id):
+        if arepo is not None:
+            page.run_task(del_aluno_async, _id)
+            return
         try:
-            cur.execute("DELETE FROM ALUNO WHERE ID_ALUNO= ?", (_id,))
-            conn.commit()
+            repo.delete(_id)
             snack(page, "Aluno removido.")
             carregar(busca.value)
         except Exception as ex:
             snack(page, f"Erro: {ex}", error=True)
 
-    busca.on_change = lambda e: carregar(busca.value)
-    busca.on_submit = lambda e: carregar(busca.value)
+    async def del_aluno_async(_id):
+        try:
+            await arepo.delete(_id)
+        except Exception as ex:
+            snack(page, f"Erro: {ex}", error=True); return
+        snack(page, "Aluno removido.")
+        await carregar(busca.value)
+
+    async def buscar_async(e):
+        await carregar(busca.value)
+
+    if assincrono:
+        busca.on_change = buscar_async
+        busca.on_submit = buscar_async
+    else:
+        busca.on_change = lambda e: carregar(busca.value)
+        busca.on_submit = lambda e: carregar(busca.value)
 
     # Altura da lista proporcional à tela para caber bem no Android
     ph = int(page.height or 640)
     list_h = max(240, min(520, ph - 300))
 
+    # Importação em massa (CSV); ao terminar, recarrega a lista
+    btn_importar = ft.OutlinedButton(
+        "Importar CSV", icon=ft.Icons.UPLOAD_FILE,
+        on_click=lambda e: import_dialog(page, "alunos", on_done=lambda: dispatch(page, carregar, busca.value)),
+    )
+
     # Layout do formulário mais amigável para telas pequenas
     if is_small:
         form_controls: list[ft.Control] = [
             nome,
             ft.Row([data, altura, peso], spacing=8, run_spacing=8, wrap=True, alignment=ft.MainAxisAlignment.CENTER),
-            ft.Row([ft.ElevatedButton("Salvar", icon=ft.Icons.SAVE, on_click=salvar)], alignment=ft.MainAxisAlignment.CENTER),
+            ft.Row([ft.ElevatedButton("Salvar", icon=ft.Icons.SAVE, on_click=salvar), btn_importar], alignment=ft.MainAxisAlignment.CENTER, spacing=8),
         ]
     else:
         form_controls = [
-            ft.Row([nome, data, altura, peso, ft.ElevatedButton("Salvar", icon=ft.Icons.SAVE, on_click=salvar)], alignment=ft.MainAxisAlignment.CENTER, spacing=10, run_spacing=10, wrap=True)
+            ft.Row([nome, data, altura, peso, ft.ElevatedButton("Salvar", icon=ft.Icons.SAVE, on_click=salvar), btn_importar], alignment=ft.MainAxisAlignment.CENTER, spacing=10, run_spacing=10, wrap=True)
         ]
 
     page.add(
@@ -168,6 +340,7 @@ def show_alunos(page: ft.Page, on_back):
                     *form_controls,
                     ft.Row([busca], alignment=ft.MainAxisAlignment.CENTER),
                     status,
+                    carregando,
                     ft.Container(
                         content=lista,
                         height=list_h,
@@ -180,4 +353,4 @@ def show_alunos(page: ft.Page, on_back):
         )
     )
 
-    carregar()
+    return carregar
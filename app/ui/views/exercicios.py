@@ -1,6 +1,6 @@
 import flet as ft
-from app.ui.components import with_bg, set_appbar, snack
-from app.db import get_conn
+from app.ui.components import with_bg, set_appbar, snack, import_dialog
+from app.repo import ExercicioEmUso, ExercicioRepository
 
 
 def show_exercicios(page: ft.Page, on_back):
@@ -18,27 +18,19 @@ def show_exercicios(page: ft.Page, on_back):
     status = ft.Text("", color=ft.Colors.BLUE_200)
     lista = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO)
 
-    conn = get_conn()
-    cur = conn.cursor()
+    repo = ExercicioRepository()
 
     def salvar(_):
         if not (nome.value or "").strip() or not (grupo.value or "").strip():
             snack(page, "Preencha nome e grupo.", True); return
-        cur.execute("INSERT INTO EXERCICIO (NOME, GRUPO) VALUES (?,?)", (nome.value.strip(), grupo.value.strip()))
-        conn.commit(); snack(page, "Exercício criado.")
+        repo.insert(nome.value.strip(), grupo.value.strip())
+        snack(page, "Exercício criado.")
         nome.value = ""; grupo.value = ""; page.update()
         carregar(busca.value)
 
     def carregar(filtro=""):
         lista.controls.clear()
-        if filtro:
-            cur.execute(
-                "SELECT ID_EXERCICIO, NOME, GRUPO FROM EXERCICIO WHERE NOME LIKE ? OR GRUPO LIKE ? ORDER BY GRUPO, NOME",
-                (f"%{filtro}%", f"%{filtro}%"),
-            )
-        else:
-            cur.execute("SELECT ID_EXERCICIO, NOME, GRUPO FROM EXERCICIO ORDER BY GRUPO, NOME")
-        rows = cur.fetchall()
+        rows = repo.search(filtro)
         status.value = f"Total: {len(rows)}" if rows else "Nenhum exercício."
         for eid, enome, egrupo in rows:
             def make_delete_button(exercicio_id, exercicio_nome):
@@ -95,8 +87,10 @@ def show_exercicios(page: ft.Page, on_back):
 
     def del_exercicio(_id):
         try:
-            cur.execute("DELETE FROM EXERCICIO WHERE ID_EXERCICIO= ?", (_id,))
-            conn.commit(); snack(page, "Exercício removido."); carregar(busca.value)
+            repo.delete(_id)
+            snack(page, "Exercício removido."); carregar(busca.value)
+        except ExercicioEmUso as ex:
+            snack(page, f"Não excluído: {ex}.", True)
         except Exception as ex:
             snack(page, f"Erro: {ex}", True)
 
@@ -107,16 +101,22 @@ def show_exercicios(page: ft.Page, on_back):
     ph = int(page.height or 640)
     list_h = max(240, min(520, ph - 300))
 
+    # Importação em massa (CSV); ao terminar, recarrega a lista
+    btn_importar = ft.OutlinedButton(
+        "Importar CSV", icon=ft.Icons.UPLOAD_FILE,
+        on_click=lambda e: import_dialog(page, "exercicios", on_done=lambda: carregar(busca.value)),
+    )
+
     if is_small:
         # Campos empilhados para evitar sobreposição
         top_controls: list[ft.Control] = [
             nome,
             ft.Row([grupo], alignment=ft.MainAxisAlignment.CENTER),
-            ft.Row([ft.ElevatedButton("Salvar", icon=ft.Icons.SAVE, on_click=salvar)], alignment=ft.MainAxisAlignment.CENTER),
+            ft.Row([ft.ElevatedButton("Salvar", icon=ft.Icons.SAVE, on_click=salvar), btn_importar], alignment=ft.MainAxisAlignment.CENTER, spacing=8),
         ]
     else:
         top_controls = [
-            ft.Row([nome, grupo, ft.ElevatedButton("Salvar", icon=ft.Icons.SAVE, on_click=salvar)], alignment=ft.MainAxisAlignment.CENTER, spacing=10, run_spacing=10, wrap=True)
+            ft.Row([nome, grupo, ft.ElevatedButton("Salvar", icon=ft.Icons.SAVE, on_click=salvar), btn_importar], alignment=ft.MainAxisAlignment.CENTER, spacing=10, run_spacing=10, wrap=True)
         ]
 
     page.add(
@@ -1,17 +1,14 @@
 import flet as ft
 from app.ui.components import with_bg, set_appbar
 from app.config import Theme
-from app.db import get_conn
+from app.repo import StatsRepository
 
 
 def _contagem():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM ALUNO;"); a = cur.fetchone()[0]
-    cur.execute("SELECT COUNT(*) FROM PLANO;"); p = cur.fetchone()[0]
-    cur.execute("SELECT COUNT(*) FROM SESSAO;"); s = cur.fetchone()[0]
-    conn.close()
-    return a, p, s
+    # Contadores mantidos por gatilho em STATS: uma leitura, sem COUNT(*)
+    totais = StatsRepository().totals()
+    sessoes = totais.get("SESSAO", 0) + totais.get("SESSAO_ARQUIVO", 0)  # inclui o arquivo morto
+    return totais.get("ALUNO", 0), totais.get("PLANO", 0), sessoes
 
 
 def show_home(
@@ -21,6 +18,7 @@ def show_home(
     on_go_planos,
     on_go_treino,
     on_go_relatorios,
+    on_go_progressao=None,
 ):
     page.clean()
     a, p, s = _contagem()
@@ -95,6 +93,13 @@ def show_home(
                                 on_click=lambda e: on_go_relatorios(),
                                 style=ft.ButtonStyle(bgcolor=ft.Colors.GREY_400, color=ft.Colors.BLACK)
                             ),
+                            ft.ElevatedButton(
+                                "Progressão de Carga", icon=ft.Icons.SHOW_CHART,
+                                width=(btn_w if not is_small else btn_w_small),
+                                on_click=lambda e: on_go_progressao(),
+                                style=ft.ButtonStyle(bgcolor=ft.Colors.TEAL_600, color=ft.Colors.WHITE),
+                                visible=on_go_progressao is not None,
+                            ),
                         ],
                     ),
                 ],
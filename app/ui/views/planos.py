@@ -1,6 +1,6 @@
 import flet as ft
 from app.ui.components import with_bg, set_appbar, snack
-from app.db import get_conn
+from app.repo import ExercicioRepository, PlanoRepository
 
 
 def show_planos(page: ft.Page, on_back):
@@ -17,16 +17,15 @@ def show_planos(page: ft.Page, on_back):
     status = ft.Text("", color=ft.Colors.BLUE_200)
     lista = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO)
 
-    conn = get_conn()
-    cur = conn.cursor()
+    repo = PlanoRepository()
 
     def salvar(_):
         nome = (nome_plano.value or "").strip()
         if not nome:
             snack(page, "Informe o nome do plano.", True); nome_plano.focus(); return
         try:
-            cur.execute("INSERT INTO PLANO (NOME) VALUES (?)", (nome,))
-            conn.commit(); snack(page, "Plano criado.")
+            repo.insert(nome)
+            snack(page, "Plano criado.")
             nome_plano.value = ""; page.update()
             carregar(busca.value)
         except Exception as ex:
@@ -34,11 +33,7 @@ def show_planos(page: ft.Page, on_back):
 
     def carregar(filtro=""):
         lista.controls.clear()
-        if filtro:
-            cur.execute("SELECT ID_PLANO, NOME FROM PLANO WHERE NOME LIKE ? ORDER BY NOME", (f"%{filtro}%",))
-        else:
-            cur.execute("SELECT ID_PLANO, NOME FROM PLANO ORDER BY NOME")
-        rows = cur.fetchall()
+        rows = repo.search(filtro)
         status.value = f"Total: {len(rows)}" if rows else "Nenhum plano."
         for pid, pnome in rows:
             def make_menu(plano_id, plano_nome):
@@ -111,22 +106,10 @@ def show_planos(page: ft.Page, on_back):
 
     def del_plano(_id):
         try:
-            # Remover dependências manualmente para bancos antigos sem CASCADE
-            # 1) Remover itens de sessões que pertencem a sessões do plano
-            cur.execute("SELECT ID_SESSAO FROM SESSAO WHERE ID_PLANO=?", (_id,))
-            sess_ids = [row[0] for row in cur.fetchall()]
-            if sess_ids:
-                # Monta placeholders para IN
-                placeholders = ",".join(["?"] * len(sess_ids))
-                cur.execute(f"DELETE FROM SESSAO_ITEM WHERE ID_SESSAO IN ({placeholders})", sess_ids)
-                cur.execute(f"DELETE FROM SESSAO WHERE ID_SESSAO IN ({placeholders})", sess_ids)
-            # 2) Remover relações do plano com exercícios
-            cur.execute("DELETE FROM PLANO_EXERCICIO WHERE ID_PLANO=?", (_id,))
-            # 3) Remover o plano em si
-            cur.execute("DELETE FROM PLANO WHERE ID_PLANO= ?", (_id,))
-            conn.commit(); snack(page, "Plano removido."); carregar(busca.value)
+            # Só marca como excluído; sessões, itens e vínculos saem depois pelo purgador
+            repo.delete(_id)
+            snack(page, "Plano removido."); carregar(busca.value)
         except Exception as ex:
-            conn.rollback()
             snack(page, f"Erro: {ex}", True)
 
     def editar_plano_exercicios(_id_plano: int, _nome: str):
@@ -140,8 +123,7 @@ def show_planos(page: ft.Page, on_back):
 
         def load_exercicios():
             lista_exercicios.options.clear()
-            cur.execute("SELECT ID_EXERCICIO, NOME, GRUPO FROM EXERCICIO ORDER BY GRUPO, NOME")
-            rows = cur.fetchall()
+            rows = ExercicioRepository().list_all()
             for eid, enome, egrupo in rows:
                 # Use explicit kwargs to avoid any API incompatibilities
                 lista_exercicios.options.append(ft.dropdown.Option(key=str(eid), text=f"{egrupo} - {enome}"))
@@ -150,13 +132,7 @@ def show_planos(page: ft.Page, on_back):
 
         def load_itens():
             itens.controls.clear()
-            cur.execute(
-                "SELECT pe.ID_EXERCICIO, e.NOME, e.GRUPO, pe.SERIES, pe.REPS, pe.ORDEM "
-                "FROM PLANO_EXERCICIO pe JOIN EXERCICIO e ON e.ID_EXERCICIO = pe.ID_EXERCICIO "
-                "WHERE pe.ID_PLANO=? ORDER BY pe.ORDEM",
-                (_id_plano,),
-            )
-            for eid, enome, egrupo, s, r, ordem in cur.fetchall():
+            for ordem, eid, enome, egrupo, s, r in repo.items(_id_plano):
                 def make_remove_button(exercicio_id):
                     return ft.Container(
                         padding=6,
@@ -189,8 +165,7 @@ def show_planos(page: ft.Page, on_back):
             page.update()
 
         def rm_item(_eid):
-            cur.execute("DELETE FROM PLANO_EXERCICIO WHERE ID_PLANO=? AND ID_EXERCICIO=?", (_id_plano, _eid))
-            conn.commit()
+            repo.remove_item(_id_plano, _eid)
             snack(page, "Exercício removido do plano.")
             load_itens()
 
@@ -202,13 +177,7 @@ def show_planos(page: ft.Page, on_back):
                 if s <= 0 or r <= 0: raise ValueError
             except Exception:
                 snack(page, "Séries e reps devem ser inteiros positivos.", True); return
-            cur.execute("SELECT COALESCE(MAX(ORDEM),0)+1 FROM PLANO_EXERCICIO WHERE ID_PLANO=?", (_id_plano,))
-            ordem = cur.fetchone()[0]
-            cur.execute(
-                "INSERT OR REPLACE INTO PLANO_EXERCICIO (ID_PLANO, ID_EXERCICIO, ORDEM, SERIES, REPS) VALUES (?,?,?,?,?)",
-                (_id_plano, int(lista_exercicios.value), ordem, s, r),
-            )
-            conn.commit()
+            repo.add_item(_id_plano, int(lista_exercicios.value), s, r)
             snack(page, "Exercício adicionado ao plano.")
             load_itens()
 
@@ -0,0 +1,162 @@
+import flet as ft
+from app.ui.components import with_bg, set_appbar, snack
+from app.config import SEARCH_LIMIT
+from app.repo import AlunoRepository, ProgressaoRepository
+
+
+def show_progressao(page: ft.Page, on_back):
+    page.clean()
+    # AppBar adaptativa ao tema (bgcolor automático)
+    set_appbar(page, "Progressão de Carga", None, show_back=True, on_back=lambda e=None: on_back())
+
+    pw = int(page.width or 0)
+    is_small = pw <= 420
+
+    busca_aluno = ft.TextField(label="Buscar aluno", prefix_icon=ft.Icons.SEARCH, expand=1)
+    dd_aluno = ft.Dropdown(label="Aluno", width=200 if is_small else 300)
+    dd_exercicio = ft.Dropdown(label="Exercício", width=220 if is_small else 320)
+    status = ft.Text("", color=ft.Colors.BLUE_200)
+    resumo = ft.Text("", size=14)
+    lista = ft.Column(spacing=4, scroll=ft.ScrollMode.AUTO)
+
+    ph = int(page.height or 640)
+    chart_h = max(180, min(320, ph - 420))
+    grafico = ft.LineChart(
+        height=chart_h,
+        expand=True,
+        interactive=True,
+        tooltip_bgcolor=ft.Colors.with_opacity(0.85, ft.Colors.BLUE_GREY_800),
+        left_axis=ft.ChartAxis(labels_size=44, title=ft.Text("kg", size=12)),
+        bottom_axis=ft.ChartAxis(show_labels=False),
+        horizontal_grid_lines=ft.ChartGridLines(width=0.5, color=ft.Colors.with_opacity(0.2, ft.Colors.ON_SURFACE)),
+    )
+
+    alunos = AlunoRepository()
+    repo = ProgressaoRepository()
+
+    def load_alunos(f=""):
+        dd_aluno.options.clear()
+        # Seletor com busca: no máximo SEARCH_LIMIT opções, o resto aparece ao digitar
+        rows = alunos.search_names(f, SEARCH_LIMIT)
+        busca_aluno.helper_text = f"Mostrando {SEARCH_LIMIT}; digite para achar outros" if len(rows) >= SEARCH_LIMIT else None
+        for aid, an in rows:
+            dd_aluno.options.append(ft.dropdown.Option(key=str(aid), text=f"{an} (ID {aid})"))
+        dd_aluno.value = str(rows[0][0]) if rows else None
+        load_exercicios()
+
+    def load_exercicios():
+        dd_exercicio.options.clear()
+        dd_exercicio.value = None
+        rows = repo.exercises(int(dd_aluno.value)) if dd_aluno.value else []
+        for ex in rows:
+            rm = f" – 1RM {ex.rm_max:.1f} kg" if ex.rm_max is not None else ""
+            dd_exercicio.options.append(
+                ft.dropdown.Option(key=str(ex.id_exercicio), text=f"{ex.grupo} - {ex.nome} ({ex.dias}x){rm}")
+            )
+        if rows:
+            dd_exercicio.value = str(rows[0].id_exercicio)
+            status.value = f"{len(rows)} exercícios com carga registrada."
+        elif dd_aluno.value:
+            status.value = "Nenhuma sessão com peso registrado para este aluno."
+        else:
+            status.value = "Nenhum aluno encontrado."
+        load_serie()
+
+    def load_serie():
+        lista.controls.clear()
+        grafico.data_series = []
+        resumo.value = ""
+        if dd_aluno.value and dd_exercicio.value:
+            try:
+                pontos = repo.series(int(dd_aluno.value), int(dd_exercicio.value))
+            except Exception as ex:
+                snack(page, f"Erro ao carregar progressão: {ex}", True)
+                pontos = []
+            preencher(pontos)
+        page.update()
+
+    def preencher(pontos):
+        if not pontos:
+            return
+        # Eixo X é a ordem dos treinos; a data aparece no tooltip e na lista
+        rm = [ft.LineChartDataPoint(i, p.rm_estimado, tooltip=f"{p.data_sessao}\n1RM {p.rm_estimado:.1f} kg")
+              for i, p in enumerate(pontos)]
+        peso = [ft.LineChartDataPoint(i, p.peso_max, tooltip=f"Máx. {p.peso_max:.1f} kg")
+                for i, p in enumerate(pontos)]
+        grafico.data_series = [
+            ft.LineChartData(data_points=rm, color=ft.Colors.ORANGE_400, stroke_width=3, curved=True),
+            ft.LineChartData(data_points=peso, color=ft.Colors.BLUE_300, stroke_width=2, curved=True),
+        ]
+        grafico.min_x, grafico.max_x = 0, max(1, len(pontos) - 1)
+        grafico.min_y = 0
+        grafico.max_y = max(p.rm_estimado for p in pontos) * 1.1
+        primeiro, ultimo = pontos[0], pontos[-1]
+        ganho = ultimo.rm_estimado - primeiro.rm_estimado
+        resumo.value = (
+            f"{len(pontos)} treinos de {primeiro.data_sessao} a {ultimo.data_sessao} · "
+            f"1RM estimado {ultimo.rm_estimado:.1f} kg ({ganho:+.1f} kg)"
+        )
+        for p in reversed(pontos):
+            lista.controls.append(
+                ft.Row(
+                    spacing=8,
+                    controls=[
+                        ft.Text(p.data_sessao, width=100, weight=ft.FontWeight.BOLD),
+                        ft.Text(f"Máx. {p.peso_max:.1f} kg", width=110),
+                        ft.Text(f"Volume {p.volume:.0f} kg", width=130),
+                        ft.Text(f"1RM {p.rm_estimado:.1f} kg", expand=True),
+                    ],
+                )
+            )
+
+    busca_aluno.on_change = lambda e: load_alunos(busca_aluno.value)
+    busca_aluno.on_submit = lambda e: load_alunos(busca_aluno.value)
+    dd_aluno.on_change = lambda e: load_exercicios()
+    dd_exercicio.on_change = lambda e: load_serie()
+
+    list_h = max(160, min(360, ph - chart_h - 300))
+
+    if is_small:
+        header_controls: list[ft.Control] = [
+            busca_aluno,
+            ft.Row([dd_aluno, dd_exercicio], spacing=8, run_spacing=8, wrap=True, alignment=ft.MainAxisAlignment.CENTER),
+        ]
+    else:
+        header_controls = [
+            ft.Row([busca_aluno, dd_aluno, dd_exercicio], alignment=ft.MainAxisAlignment.CENTER, spacing=10, wrap=True, run_spacing=10)
+        ]
+
+    page.add(
+        with_bg(
+            page,
+            ft.Column(
+                spacing=12,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                controls=[
+                    ft.Text("Progressão de Carga", size=22, weight=ft.FontWeight.BOLD),
+                    ft.Divider(),
+                    *header_controls,
+                    status,
+                    ft.Row(
+                        alignment=ft.MainAxisAlignment.CENTER,
+                        spacing=16,
+                        controls=[
+                            ft.Text("● 1RM estimado (Epley)", color=ft.Colors.ORANGE_400, size=12),
+                            ft.Text("● Peso máximo", color=ft.Colors.BLUE_300, size=12),
+                        ],
+                    ),
+                    ft.Container(content=grafico, padding=ft.padding.only(right=16, top=8)),
+                    resumo,
+                    ft.Container(
+                        content=lista,
+                        height=list_h,
+                        border=ft.border.all(1, ft.Colors.BLUE_200),
+                        border_radius=10,
+                        padding=6,
+                    ),
+                ],
+            )
+        )
+    )
+
+    load_alunos()
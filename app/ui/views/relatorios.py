@@ -1,10 +1,24 @@
+import threading
+
 import flet as ft
-from app.ui.components import with_bg, set_appbar, snack
-from app.db import get_conn
+from app.config import REPORT_PAGE_SIZE
+from app.ui.components import with_bg, set_appbar, snack, dispatch, loading_bar, export_dialog
+from app.archive import ArchiveReader
+from app.repo import AsyncRepository, SessaoRepository
 from app.utils import sqlite_para_brasileiro
 
 
 def show_relatorios(page: ft.Page, on_back):
+    _montar(page, on_back)()
+
+
+async def show_relatorios_async(page: ft.Page, on_back):
+    # Mesma tela, mas as consultas rodam fora do event loop com indicador de carregamento
+    carregar = _montar(page, on_back, assincrono=True)
+    await carregar()
+
+
+def _montar(page: ft.Page, on_back, assincrono=False):
     page.clean()
     # AppBar adaptativa ao tema (bgcolor automático)
     set_appbar(page, "Relatório de Sessões", None, show_back=True, on_back=lambda e=None: on_back())
@@ -18,44 +32,102 @@ def show_relatorios(page: ft.Page, on_back):
         width=None,
         expand=1,
     )
-    lista = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO)
+    # ListView com rolagem infinita: a próxima página vem quando o fim da lista aparece
+    lista = ft.ListView(spacing=6, on_scroll_interval=100)
     status = ft.Text("", color=ft.Colors.BLUE_200)
+    carregando = loading_bar(width=240)
 
-    conn = get_conn()
-    cur = conn.cursor()
+    repo = SessaoRepository()
+    arepo = AsyncRepository(repo) if assincrono else None
+    # cursor = (data, id) da última sessão exibida; seq descarta respostas de buscas substituídas
+    estado = {"seq": 0, "filtro": "", "cursor": None, "fim": True, "exibidos": 0, "ocupado": False}
+    trava = threading.Lock()  # versão síncrona: os handlers rodam em threads do Flet
 
-    def carregar(f=""):
+    def reiniciar(f):
+        estado.update(seq=estado["seq"] + 1, filtro=f, cursor=None, fim=False, exibidos=0)
         lista.controls.clear()
-        if f:
-            cur.execute(
-                """
-                SELECT s.ID_SESSAO, s.DATA_SESSAO, a.NOME, p.NOME
-                FROM SESSAO s
-                JOIN ALUNO a ON a.ID_ALUNO = s.ID_ALUNO
-                JOIN PLANO p ON p.ID_PLANO = s.ID_PLANO
-                WHERE a.NOME LIKE ?
-                ORDER BY s.DATA_SESSAO DESC, s.ID_SESSAO DESC
-                """,
-                (f"%{f}%",),
-            )
+
+    def carregar(f=""):
+        with trava:
+            reiniciar(f)
+            anexar(repo.search_page(f))
+
+    def mais():
+        if estado["fim"] or not trava.acquire(blocking=False):
+            return
+        try:
+            if not estado["fim"]:
+                anexar(repo.search_page(estado["filtro"], estado["cursor"]))
+        finally:
+            trava.release()
+
+    async def carregar_async(f=""):
+        reiniciar(f)
+        await proxima_async(estado["seq"])
+
+    async def mais_async():
+        if estado["fim"] or estado["ocupado"]:
+            return
+        await proxima_async(estado["seq"])
+
+    async def proxima_async(seq):
+        estado["ocupado"] = True
+        carregando.visible = True
+        if not estado["exibidos"]:
+            status.value = "Carregando..."
+        page.update()
+        try:
+            rows = await arepo.search_page(estado["filtro"], estado["cursor"])
+        except Exception as ex:
+            if seq == estado["seq"]:
+                snack(page, f"Erro ao carregar sessões: {ex}", True)
+            return
+        finally:
+            if seq == estado["seq"]:
+                estado["ocupado"] = False
+                carregando.visible = False
+        if seq == estado["seq"]:
+            anexar(rows)
+
+    def rolar(e: ft.OnScrollEvent):
+        if e.pixels >= e.max_scroll_extent - 200:
+            mais()
+
+    async def rolar_async(e: ft.OnScrollEvent):
+        if e.pixels >= e.max_scroll_extent - 200:
+            await mais_async()
+
+    if assincrono:
+        carregar = carregar_async
+        lista.on_scroll = rolar_async
+    else:
+        lista.on_scroll = rolar
+
+    def trocar_fonte(e):
+        # Arquivo morto só é consultado quando pedido: o padrão lê apenas o banco principal
+        nonlocal repo, arepo
+        repo = ArchiveReader() if incluir_arquivo.value else SessaoRepository()
+        arepo = AsyncRepository(repo) if assincrono else None
+        dispatch(page, carregar, busca_aluno.value)
+
+    incluir_arquivo = ft.Switch(label="Incluir arquivo morto", value=False, on_change=trocar_fonte)
+
+    def anexar(rows):
+        if rows:
+            estado["cursor"] = repo.cursor(rows[-1])
+        estado["fim"] = len(rows) < REPORT_PAGE_SIZE
+        estado["exibidos"] += len(rows)
+        n = estado["exibidos"]
+        if not n:
+            status.value = "Nenhuma sessão."
         else:
-            cur.execute(
-                """
-                SELECT s.ID_SESSAO, s.DATA_SESSAO, a.NOME, p.NOME
-                FROM SESSAO s
-                JOIN ALUNO a ON a.ID_ALUNO = s.ID_ALUNO
-                JOIN PLANO p ON p.ID_PLANO = s.ID_PLANO
-                ORDER BY s.DATA_SESSAO DESC, s.ID_SESSAO DESC
-                """
-            )
-        rows = cur.fetchall()
-        status.value = f"Total: {len(rows)}" if rows else "Nenhuma sessão."
+            status.value = f"Exibindo {n} sessões" + ("" if estado["fim"] else " – role para carregar mais")
         for sid, d, an, pn in rows:
             data_br = sqlite_para_brasileiro(d)
 
             def make_buttons(sessao_id, info_str):
                 return [
-                    ft.TextButton("Detalhes", on_click=lambda e: detalhar(sessao_id)),
+                    ft.TextButton("Detalhes", on_click=lambda e: dispatch(page, detalhar, sessao_id)),
                     ft.Container(
                         padding=6,
                         content=ft.IconButton(
@@ -90,19 +162,26 @@ def show_relatorios(page: ft.Page, on_back):
         page.update()
 
     def detalhar(_sid):
+        mostrar_detalhes(_sid, repo.items(_sid))
+
+    async def detalhar_async(_sid):
+        carregando.visible = True
+        page.update()
+        try:
+            rows = await arepo.items(_sid)
+        except Exception as ex:
+            snack(page, f"Erro ao carregar sessão: {ex}", True); return
+        finally:
+            carregando.visible = False
+        mostrar_detalhes(_sid, rows)
+
+    if assincrono:
+        detalhar = detalhar_async
+
+    def mostrar_detalhes(_sid, rows):
         dialog = ft.AlertDialog(modal=True)
         corpo = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO, height=360)
 
-        cur.execute(
-            """
-            SELECT e.NOME, e.GRUPO, si.FEITO, si.SERIES_FEITAS, si.REPS_MEDIA, si.PESO_MEDIA, si.OBS
-            FROM SESSAO_ITEM si
-            JOIN EXERCICIO e ON e.ID_EXERCICIO = si.ID_EXERCICIO
-            WHERE si.ID_SESSAO=? ORDER BY si.ID_ITEM
-            """,
-            (_sid,),
-        )
-        rows = cur.fetchall()
         if not rows:
             corpo.controls.append(ft.Text("Sem itens."))
         for enome, egrupo, feito, s, r, p, obs in rows:
@@ -181,17 +260,33 @@ def show_relatorios(page: ft.Page, on_back):
         page.update()
 
     def excluir(_sid):
+        if arepo is not None:
+            page.run_task(excluir_async, _sid)
+            return
         try:
-            cur.execute("DELETE FROM SESSAO WHERE ID_SESSAO=?", (_sid,))
-            conn.commit()
+            repo.delete(_sid)
             snack(page, "Sessão excluída.")
             carregar(busca_aluno.value)
         except Exception as ex:
-            conn.rollback()
             snack(page, f"Erro ao excluir sessão: {ex}", True)
 
-    busca_aluno.on_change = lambda e: carregar(busca_aluno.value)
-    busca_aluno.on_submit = lambda e: carregar(busca_aluno.value)
+    async def excluir_async(_sid):
+        try:
+            await arepo.delete(_sid)
+        except Exception as ex:
+            snack(page, f"Erro ao excluir sessão: {ex}", True); return
+        snack(page, "Sessão excluída.")
+        await carregar(busca_aluno.value)
+
+    async def buscar_async(e):
+        await carregar(busca_aluno.value)
+
+    if assincrono:
+        busca_aluno.on_change = buscar_async
+        busca_aluno.on_submit = buscar_async
+    else:
+        busca_aluno.on_change = lambda e: carregar(busca_aluno.value)
+        busca_aluno.on_submit = lambda e: carregar(busca_aluno.value)
 
     page.add(
         with_bg(
@@ -202,10 +297,22 @@ def show_relatorios(page: ft.Page, on_back):
                 controls=[
                     ft.Text("Relatório de Sessões", size=22, weight=ft.FontWeight.BOLD),
                     ft.Divider(),
-                    ft.Row([busca_aluno], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row(
+                        [
+                            busca_aluno,
+                            ft.OutlinedButton(
+                                "Exportar", icon=ft.Icons.DOWNLOAD,
+                                on_click=lambda e: export_dialog(page, busca_aluno.value or ""),
+                            ),
+                            incluir_arquivo,
+                        ],
+                        alignment=ft.MainAxisAlignment.CENTER,
+                        wrap=True,
+                    ),
                     status,
+                    carregando,
                     ft.Container(
-                        # Removido ft.Scrollbar: não existe no Flet atual; Column já rola com scroll=AUTO
+                        # ListView rola sozinha e dispara on_scroll para buscar a próxima página
                         content=lista,
                         height=420,
                         border=ft.border.all(1, ft.Colors.BLUE_GREY_200),
@@ -217,4 +324,4 @@ def show_relatorios(page: ft.Page, on_back):
         )
     )
 
-    carregar()
+    return carregar
@@ -1,11 +1,28 @@
 import flet as ft
 from datetime import datetime
-from app.ui.components import with_bg, set_appbar, snack
-from app.db import get_conn
+from app.config import SEARCH_LIMIT
+from app.ui.components import with_bg, set_appbar, snack, dispatch, loading_bar
+from app.repo import AlunoRepository, AsyncRepository, PlanoRepository, SessaoRepository
 from app.utils import validar_data_brasil
 
 
+def _limitado(rows):
+    # Dica no campo de busca quando o seletor mostra só as primeiras SEARCH_LIMIT opções
+    return f"Mostrando {SEARCH_LIMIT}; digite para achar outros" if len(rows) >= SEARCH_LIMIT else None
+
+
 def show_treino(page: ft.Page, on_back):
+    load_alunos, load_planos = _montar(page, on_back)
+    load_alunos(); load_planos()
+
+
+async def show_treino_async(page: ft.Page, on_back):
+    # Mesma tela, mas as consultas rodam fora do event loop com indicador de carregamento
+    load_alunos, load_planos = _montar(page, on_back, assincrono=True)
+    await load_alunos(); await load_planos()
+
+
+def _montar(page: ft.Page, on_back, assincrono=False):
     page.clean()
     # AppBar adaptativa ao tema (bgcolor automático)
     set_appbar(page, "Iniciar Treino – Checklist", None, show_back=True, on_back=lambda e=None: on_back())
@@ -15,23 +32,53 @@ def show_treino(page: ft.Page, on_back):
     is_small = pw <= 420
 
     busca_aluno = ft.TextField(label="Buscar aluno", prefix_icon=ft.Icons.SEARCH, expand=1)
+    busca_plano = ft.TextField(label="Buscar plano", prefix_icon=ft.Icons.SEARCH, expand=1)
     dd_aluno = ft.Dropdown(label="Aluno", width=200 if is_small else 300)
     dd_plano = ft.Dropdown(label="Plano", width=180 if is_small else 240)
     data_tf = ft.TextField(label="Data (DD/MM/YYYY)", width=120 if is_small else 140, value=datetime.now().strftime("%d/%m/%Y"), max_length=10)
 
     lista_check = ft.Column(scroll=ft.ScrollMode.AUTO, height=320)
     status = ft.Text("", color=ft.Colors.ORANGE_200)
+    carregando = loading_bar(width=240)
 
-    conn = get_conn()
-    cur = conn.cursor()
+    alunos = AlunoRepository()
+    planos = PlanoRepository()
+    sessoes = SessaoRepository()
+    a_alunos = AsyncRepository(alunos) if assincrono else None
+    a_planos = AsyncRepository(planos) if assincrono else None
+    a_sessoes = AsyncRepository(sessoes) if assincrono else None
+    # Pedidos em andamento: respostas de consultas já substituídas são descartadas
+    estado = {"alunos": 0, "checklist": 0, "pendentes": 0}
+
+    async def aguardar(chave, consulta, *args):
+        # Roda a consulta fora do event loop; devolve None se ficou obsoleta ou falhou
+        estado[chave] = estado.get(chave, 0) + 1
+        seq = estado[chave]
+        estado["pendentes"] += 1
+        carregando.visible = True
+        page.update()
+        try:
+            rows = await consulta(*args)
+        except Exception as ex:
+            snack(page, f"Erro ao carregar dados: {ex}", True)
+            return None
+        finally:
+            estado["pendentes"] -= 1
+            carregando.visible = estado["pendentes"] > 0
+        return rows if seq == estado[chave] else None
 
+    # Seletores com busca: no máximo SEARCH_LIMIT opções, o resto aparece ao digitar
     def load_alunos(f=""):
+        preencher_alunos(alunos.search_names(f, SEARCH_LIMIT))
+
+    async def load_alunos_async(f=""):
+        rows = await aguardar("alunos", a_alunos.search_names, f, SEARCH_LIMIT)
+        if rows is not None:
+            preencher_alunos(rows)
+
+    def preencher_alunos(rows):
         dd_aluno.options.clear()
-        if f:
-            cur.execute("SELECT ID_ALUNO, NOME FROM ALUNO WHERE NOME LIKE ? ORDER BY NOME", (f"%{f}%",))
-        else:
-            cur.execute("SELECT ID_ALUNO, NOME FROM ALUNO ORDER BY NOME")
-        rows = cur.fetchall()
+        busca_aluno.helper_text = _limitado(rows)
         if not rows:
             status.value = "Nenhum aluno cadastrado. Cadastre em 'Alunos'."
             dd_aluno.value = None
@@ -42,36 +89,45 @@ def show_treino(page: ft.Page, on_back):
         dd_aluno.value = str(rows[0][0]) if rows else None
         page.update()
 
-    def load_planos():
+    def load_planos(f=""):
+        if preencher_planos(planos.search(f, SEARCH_LIMIT), f):
+            load_checklist()
+
+    async def load_planos_async(f=""):
+        rows = await aguardar("planos", a_planos.search, f, SEARCH_LIMIT)
+        if rows is not None and preencher_planos(rows, f):
+            await load_checklist_async()
+
+    def preencher_planos(rows, f=""):
         dd_plano.options.clear()
-        cur.execute("SELECT ID_PLANO, NOME FROM PLANO ORDER BY NOME")
-        rows = cur.fetchall()
+        busca_plano.helper_text = _limitado(rows)
         for pid, pn in rows:
             dd_plano.options.append(ft.dropdown.Option(key=str(pid), text=pn))
         dd_plano.value = str(rows[0][0]) if rows else None
         page.update()
-        if dd_plano.value:
-            load_checklist()
-        else:
-            status.value = "Nenhum plano cadastrado. Crie um em 'Planos de Treino'."
+        if not dd_plano.value:
+            status.value = "Nenhum plano encontrado." if f else "Nenhum plano cadastrado. Crie um em 'Planos de Treino'."
             page.update()
+        return bool(dd_plano.value)
 
     def load_checklist():
-        lista_check.controls.clear()
         if not dd_plano.value:
+            preencher_checklist(None); return
+        preencher_checklist(planos.items(int(dd_plano.value)))
+
+    async def load_checklist_async():
+        if not dd_plano.value:
+            estado["checklist"] += 1
+            preencher_checklist(None); return
+        rows = await aguardar("checklist", a_planos.items, int(dd_plano.value))
+        if rows is not None:
+            preencher_checklist(rows)
+
+    def preencher_checklist(rows):
+        lista_check.controls.clear()
+        if rows is None:
             status.value = "Selecione um plano."
             page.update(); return
-        pid = int(dd_plano.value)
-        cur.execute(
-            """
-            SELECT pe.ORDEM, e.ID_EXERCICIO, e.NOME, e.GRUPO, pe.SERIES, pe.REPS
-            FROM PLANO_EXERCICIO pe
-            JOIN EXERCICIO e ON e.ID_EXERCICIO = pe.ID_EXERCICIO
-            WHERE pe.ID_PLANO=? ORDER BY pe.ORDEM
-            """,
-            (pid,),
-        )
-        rows = cur.fetchall()
         if not rows:
             status.value = "Este plano não possui exercícios. Adicione em 'Planos de Treino' (ícone de lista)."
             page.update(); return
@@ -109,49 +165,74 @@ def show_treino(page: ft.Page, on_back):
         ok, iso = validar_data_brasil(data_tf.value)
         if not ok:
             snack(page, "Data inválida.", True); data_tf.focus(); return
+        # montar itens a partir da checklist: valida todos os cards antes de gravar
+        itens, invalidos = [], []
+        for card in lista_check.controls:
+            m = getattr(card, "_meta", None)
+            if not m:
+                continue
+            feito = 1 if m["chk"].value else 0
+            try:
+                s = int(m["series"].value) if m["series"].value else None
+                r = int(m["reps"].value) if m["reps"].value else None
+                # aceitar vírgula ou ponto para decimais
+                peso_str = m["peso"].value.strip() if m["peso"].value else ""
+                if peso_str:
+                    peso_str = peso_str.replace(".", "").replace(",", ".") if peso_str.count(",") == 1 and peso_str.count(".") > 1 else peso_str.replace(",", ".")
+                p = float(peso_str) if peso_str else None
+                if any(v is not None and v < 0 for v in (s, r, p)):
+                    raise ValueError
+            except Exception:
+                invalidos.append(m["chk"].label.split(" • ", 1)[0]); continue
+            obs = (m["obs"].value or "").strip() or None
+            itens.append((m["id_exercicio"], feito, s, r, p, obs))
+        if invalidos:
+            snack(page, f"Valores numéricos inválidos (séries/reps/peso) nos exercícios: {', '.join(invalidos)}.", True); return
         # criar sessão
+        dados = (int(dd_aluno.value), int(dd_plano.value), iso, itens)
+        if a_sessoes is not None:
+            page.run_task(gravar_sessao_async, dados)
+            return
         try:
-            cur.execute(
-                "INSERT INTO SESSAO (ID_ALUNO, ID_PLANO, DATA_SESSAO) VALUES (?,?,?)",
-                (int(dd_aluno.value), int(dd_plano.value), iso),
-            )
-            id_sessao = cur.lastrowid
-            total = 0
-            for card in lista_check.controls:
-                m = getattr(card, "_meta", None)
-                if not m:
-                    continue
-                feito = 1 if m["chk"].value else 0
-                try:
-                    s = int(m["series"].value) if m["series"].value else None
-                    r = int(m["reps"].value) if m["reps"].value else None
-                    # aceitar vírgula ou ponto para decimais
-                    peso_str = m["peso"].value.strip() if m["peso"].value else ""
-                    if peso_str:
-                        peso_str = peso_str.replace(".", "").replace(",", ".") if peso_str.count(",") == 1 and peso_str.count(".") > 1 else peso_str.replace(",", ".")
-                    p = float(peso_str) if peso_str else None
-                except Exception:
-                    conn.rollback()
-                    snack(page, "Valores numéricos inválidos (séries/reps/peso).", True); return
-                obs = (m["obs"].value or "").strip() or None
-                cur.execute(
-                    """
-                    INSERT INTO SESSAO_ITEM (ID_SESSAO, ID_EXERCICIO, FEITO, SERIES_FEITAS, REPS_MEDIA, PESO_MEDIA, OBS)
-                    VALUES (?,?,?,?,?,?,?)
-                    """,
-                    (id_sessao, m["id_exercicio"], feito, s, r, p, obs),
-                )
-                total += 1
-            conn.commit()
-            snack(page, f"Sessão registrada com {total} exercícios.")
-            lista_check.controls.clear(); status.value = ""; page.update()
+            sessoes.create(*dados)
+            sessao_salva(len(itens))
         except Exception as ex:
-            conn.rollback()
             snack(page, f"Erro ao salvar sessão: {ex}", True)
 
-    busca_aluno.on_change = lambda e: load_alunos(busca_aluno.value)
-    busca_aluno.on_submit = lambda e: load_alunos(busca_aluno.value)
-    dd_plano.on_change = lambda e: load_checklist()
+    async def gravar_sessao_async(dados):
+        try:
+            await a_sessoes.create(*dados)
+        except Exception as ex:
+            snack(page, f"Erro ao salvar sessão: {ex}", True); return
+        sessao_salva(len(dados[3]))
+
+    def sessao_salva(n):
+        snack(page, f"Sessão registrada com {n} exercícios.")
+        lista_check.controls.clear(); status.value = ""; page.update()
+
+    if assincrono:
+        load_alunos, load_planos, load_checklist = load_alunos_async, load_planos_async, load_checklist_async
+
+        async def buscar_async(e):
+            await load_alunos(busca_aluno.value)
+
+        async def buscar_plano_async(e):
+            await load_planos(busca_plano.value)
+
+        async def plano_async(e):
+            await load_checklist()
+
+        busca_aluno.on_change = buscar_async
+        busca_aluno.on_submit = buscar_async
+        busca_plano.on_change = buscar_plano_async
+        busca_plano.on_submit = buscar_plano_async
+        dd_plano.on_change = plano_async
+    else:
+        busca_aluno.on_change = lambda e: load_alunos(busca_aluno.value)
+        busca_aluno.on_submit = lambda e: load_alunos(busca_aluno.value)
+        busca_plano.on_change = lambda e: load_planos(busca_plano.value)
+        busca_plano.on_submit = lambda e: load_planos(busca_plano.value)
+        dd_plano.on_change = lambda e: load_checklist()
 
     # Altura da lista proporcional
     ph = int(page.height or 640)
@@ -159,13 +240,13 @@ def show_treino(page: ft.Page, on_back):
 
     if is_small:
         header_controls: list[ft.Control] = [
-            busca_aluno,
+            ft.Row([busca_aluno, busca_plano], spacing=8),
             ft.Row([dd_aluno, dd_plano], spacing=8, run_spacing=8, wrap=True, alignment=ft.MainAxisAlignment.CENTER),
             ft.Row([data_tf], alignment=ft.MainAxisAlignment.CENTER),
         ]
     else:
         header_controls = [
-            ft.Row([busca_aluno, dd_aluno, dd_plano, data_tf], alignment=ft.MainAxisAlignment.CENTER, spacing=10, wrap=True, run_spacing=10)
+            ft.Row([busca_aluno, dd_aluno, busca_plano, dd_plano, data_tf], alignment=ft.MainAxisAlignment.CENTER, spacing=10, wrap=True, run_spacing=10)
         ]
 
     page.add(
@@ -179,6 +260,7 @@ def show_treino(page: ft.Page, on_back):
                     ft.Divider(),
                     *header_controls,
                     status,
+                    carregando,
                     ft.Container(
                         # Removido ft.Scrollbar: componente inexistente no Flet atual; Column já tem scroll=AUTO
                         content=lista_check,
@@ -191,7 +273,7 @@ def show_treino(page: ft.Page, on_back):
                         alignment=ft.MainAxisAlignment.CENTER,
                         spacing=12,
                         controls=[
-                            ft.ElevatedButton("Carregar exercícios", icon=ft.Icons.LIST, on_click=lambda e: load_checklist()),
+                            ft.ElevatedButton("Carregar exercícios", icon=ft.Icons.LIST, on_click=lambda e: dispatch(page, load_checklist)),
                             ft.ElevatedButton("Salvar sessão", icon=ft.Icons.SAVE, on_click=salvar_sessao),
                         ],
                     ),
@@ -200,4 +282,4 @@ def show_treino(page: ft.Page, on_back):
         )
     )
 
-    load_alunos(); load_planos()
+    return load_alunos, load_planos
@@ -1,3 +1,5 @@
+import os
+
 import flet as ft
 from datetime import datetime
 
@@ -42,3 +44,12 @@ def calcular_imc(peso, altura):
         return f"{imc:.2f}", "Obesidade III", ft.Colors.RED_800
     except Exception:
         return "-", "Erro", ft.Colors.GREY_400
+
+
+def arquivo_em(diretorio: str, nome: str) -> str:
+    # Caminho de um arquivo direto em ``diretorio`` a partir de um nome digitado na tela.
+    # No modo web quem digita é o cliente: nada de pastas, ".." ou caminho absoluto.
+    nome = (nome or "").strip()
+    if not nome or nome in (".", "..") or nome != os.path.basename(nome) or any(c in nome for c in "/\\:"):
+        raise ValueError(f"nome de arquivo inválido: {nome!r} (só o nome, sem pastas)")
+    return os.path.join(diretorio, nome)
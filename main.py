@@ -1,5 +1,9 @@
 import flet as ft
 from app.app import main as app_main
+from app.config import DB_TRACE, IMPORT_DIR
+from app.tracing import install_dump
 
 if __name__ == '__main__':
-    ft.app(target=app_main)
+    if DB_TRACE:
+        install_dump()  # thread principal: atexit e SIGUSR1 uma vez por processo
+    ft.app(target=app_main, upload_dir=IMPORT_DIR)
@@ -7,6 +7,8 @@ from typing import Optional
 
 import flet as ft
 from app.app import main as app_main
+from app.config import DB_TRACE, IMPORT_DIR
+from app.tracing import install_dump
 
 
 def _pick_port(pref_ports=(8550, 8080, 8000, 3000)) -> int:
@@ -236,6 +238,9 @@ if __name__ == "__main__":
         print("[INFO] Bind direto no IP LAN ativado (FLET_BIND_TO_IP=1).")
     print("[INFO] Pressione Ctrl+C para parar o servidor.\n")
 
+    if DB_TRACE:
+        install_dump()  # uma vez, na thread principal (cada celular conectado roda app_main de novo)
+
     # Inicia o app Flet como Web Server acessível na LAN
     try:
         ft.app(
@@ -243,6 +248,7 @@ if __name__ == "__main__":
             view=ft.AppView.WEB_BROWSER,
             host=bind_host,
             port=port,
+            upload_dir=IMPORT_DIR,  # importação de CSV pelo navegador (envio do arquivo)
             # Força HTML renderer para máxima compatibilidade com Android
             web_renderer=ft.WebRenderer.HTML,
         )